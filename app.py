@@ -1,34 +1,282 @@
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import (Flask, Request, Response, render_template, request, redirect, url_for, flash, g, jsonify,
+                   session, stream_with_context)
 from datetime import datetime
-import mysql.connector
+from config import AutosaveConfig, DatabaseConfig
+from services.attempt_clock import attempt_clock
+from services.exam_cache import exam_cache
+from services.grading import AnswerKey
+from services.item_analysis import item_analysis
+from services.ranking import rankings
+from services.ledger import ledger, answer_digest
+from services.submission_writer import submission_writer
+from services.user_cache import user_cache
+from services.login_tracker import last_login_recorder
+from services.autosave import autosave, AttemptSealedError
+from services.proctoring_events import event_store, EVENT_CODES, IngestBacklogError
 import json
+import os
+import queue
+import re
+import uuid
+
+
+class ExamRequest(Request):
+    # Large question banks post thousands of q{i}_* fields in one form
+    max_form_parts = int(os.getenv('MAX_FORM_PARTS', 50000))
+    max_form_memory_size = int(os.getenv('MAX_FORM_MEMORY_SIZE', 16 * 1024 * 1024))
+
 
 app = Flask(__name__)
 app.secret_key = 'exam_secret_key'
+app.request_class = ExamRequest
 
 # MySQL Connection
-db = mysql.connector.connect(
-    host="localhost",
-    user="root",
-    password="66520",  # Replace with your MySQL password
-    database="exam_proctoring_system"
-)
-cursor = db.cursor(dictionary=True)
+# Each request borrows its own pooled connection (see get_db) and hands it
+# back in release_db, so routes never share a cursor or a result set.
+def get_db():
+    if 'db' not in g:
+        g.db = DatabaseConfig.get_pool().acquire()
+    return g.db
+
+
+def get_cursor():
+    return get_db().cursor(dictionary=True, buffered=True)
+
+
+@app.teardown_appcontext
+def release_db(exception):
+    db = g.pop('db', None)
+    if db is not None:
+        DatabaseConfig.get_pool().release(db)
 
 # Template filter
 @app.template_filter('from_json')
 def from_json_filter(s):
+    if isinstance(s, list):
+        return s  # already decoded by load_exam
     try:
         return json.loads(s)
     except:
         return []
 
+
+def decode_json_list(value):
+    try:
+        return json.loads(value) if value else []
+    except (TypeError, ValueError):
+        return []
+
+
+# Question form parsing
+QUESTION_FIELD = re.compile(r'^q(\d+)_([a-z]+?)(\d*)$')
+
+
+def parse_questions(form):
+    """Collect the q{i}_* fields of an exam form in a single pass over the submitted keys.
+
+    Returns one dict per question that has text, ordered by its form index.
+    """
+    fields = {}
+    for key in form.keys():
+        match = QUESTION_FIELD.match(key)
+        if not match:
+            continue
+        index, name, number = match.groups()
+        entry = fields.setdefault(int(index), {'option': {}, 'correct': set()})
+        if name == 'option' and number:
+            entry['option'][int(number)] = form.get(key)
+        elif name == 'correct' and number:
+            entry['correct'].add(int(number))
+        elif not number:
+            entry[name] = form.get(key)
+
+    questions = []
+    for index in sorted(fields):
+        entry = fields[index]
+        q_text = entry.get('text')
+        if not q_text:
+            continue
+
+        q_type = entry.get('type')
+        options = []
+        correct = []
+
+        if q_type == 'mcq':
+            for j in sorted(entry['option']):
+                opt = entry['option'][j]
+                if opt:
+                    options.append(opt)
+                    if j in entry['correct']:
+                        correct.append(opt)
+        elif q_type == 'truefalse':
+            ans = entry.get('truefalse')
+            options = ["True", "False"]
+            correct = [ans] if ans else []
+
+        questions.append({
+            'index': index,
+            'id': int(entry['id']) if entry.get('id', '').isdigit() else None,
+            'q_text': q_text,
+            'q_type': q_type,
+            'marks': int(entry.get('marks', 1)),
+            'negative': int(entry.get('negative', 0)),
+            'difficulty': blank_to_none(entry.get('difficulty')),
+            'options': options,
+            'correct': correct,
+        })
+    return questions
+
+
+def blank_to_none(value):
+    """An optional text field: empty, and the 'None' an old edit page rendered for NULL, both mean no value"""
+    value = (value or '').strip()
+    return value if value and value != 'None' else None
+
+
+def question_values(q):
+    """Column values for a parsed question, in INSERT/UPDATE order"""
+    return (q['q_text'], q['q_type'], q['marks'], q['negative'], q['difficulty'],
+            json.dumps(q['options']), json.dumps(q['correct']))
+
+
+def diff_questions(existing, submitted):
+    """Split submitted questions into (inserts, updates, deleted ids) against the stored ones.
+
+    Submitted questions carry the id of the row they edit (q{i}_id); stored
+    questions whose id is no longer submitted are deleted.
+    """
+    stored = {q['id']: q for q in existing}
+    inserts = []
+    updates = []
+    kept = set()
+    for q in submitted:
+        current = stored.get(q['id'])
+        if current is None or q['id'] in kept:
+            inserts.append(q)
+            continue
+        kept.add(q['id'])
+        current_values = (current['q_text'], current['q_type'], current['marks'], current['negative'],
+                          current['difficulty'] or None, current['options'], current['correct'])
+        new_values = (q['q_text'], q['q_type'], q['marks'], q['negative'],
+                      q['difficulty'], q['options'], q['correct'])
+        if new_values != current_values:
+            updates.append(q)
+    deletes = [qid for qid in stored if qid not in kept]
+    return inserts, updates, deletes
+
+
+# Exam + questions + compiled answer key, read through the in-process cache
+def load_exam(exam_id):
+    cursor = get_cursor()
+    cursor.execute("SELECT * FROM exams WHERE id=%s", (exam_id,))
+    exam = cursor.fetchone()
+    if not exam:
+        return None
+
+    cursor.execute("SELECT * FROM questions WHERE exam_id=%s", (exam_id,))
+    questions = cursor.fetchall()
+    for q in questions:
+        q['options'] = decode_json_list(q.get('options'))
+        q['correct'] = decode_json_list(q.get('correct'))
+    return exam, questions, AnswerKey.compile(questions)
+
+
+def get_exam(exam_id):
+    """Return (exam, questions, answer_key) for exam_id, or None. The result is shared: do not mutate it."""
+    return exam_cache.get(exam_id, load_exam)
+
+# Exam listing: keyset pages over (sort column, id), so every page costs the same
+EXAM_PAGE_SIZE = 50
+EXAM_COUNT_TTL = 30
+EXAM_LIST_COLUMNS = "id, title, start_time, end_time, duration"
+# status -> (sort column, direction, condition); live/past walk end_time so
+# their range scans start at "now" instead of at the oldest exam
+EXAM_FILTERS = {
+    'all': ('start_time', 'DESC', None),
+    'upcoming': ('start_time', 'ASC', "start_time > %(now)s"),
+    'live': ('end_time', 'ASC', "start_time <= %(now)s AND end_time >= %(now)s"),
+    'past': ('end_time', 'DESC', "end_time < %(now)s"),
+}
+_exam_counts = {}
+
+
+def count_exams(status, now):
+    """Number of exams matching a filter, cached for EXAM_COUNT_TTL seconds"""
+    cached = _exam_counts.get(status)
+    if cached and cached[1] > now.timestamp():
+        return cached[0]
+    condition = EXAM_FILTERS[status][2]
+    cursor = get_cursor()
+    cursor.execute("SELECT COUNT(*) AS n FROM exams" + (f" WHERE {condition}" if condition else ""),
+                   {'now': now})
+    count = cursor.fetchone()['n']
+    _exam_counts[status] = (count, now.timestamp() + EXAM_COUNT_TTL)
+    return count
+
+
+def invalidate_exam_counts():
+    _exam_counts.clear()
+
+
+def encode_cursor(exam, column):
+    value = exam[column]
+    return f"{value.isoformat() if hasattr(value, 'isoformat') else value}_{exam['id']}"
+
+
+def decode_cursor(token):
+    """(datetime, id) from a page cursor, or None if it is missing or malformed"""
+    try:
+        value, exam_id = token.rsplit('_', 1)
+        return datetime.fromisoformat(value), int(exam_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def exam_list_query(status, after, now, page_size=EXAM_PAGE_SIZE):
+    """(query, params) for one page of exams; fetches one extra row to detect a next page"""
+    column, direction, condition = EXAM_FILTERS[status]
+    conditions = [condition] if condition else []
+    params = {'now': now, 'limit': page_size + 1}
+    if after:
+        op = '>' if direction == 'ASC' else '<'
+        conditions.append(f"({column} {op} %(key)s OR ({column} = %(key)s AND id {op} %(id)s))")
+        params['key'], params['id'] = after
+    query = f"SELECT {EXAM_LIST_COLUMNS} FROM exams"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {column} {direction}, id {direction} LIMIT %(limit)s"
+    return query, params
+
+
+def list_exams(status, after, now, page_size=EXAM_PAGE_SIZE):
+    """One page of exams for a filter; returns (exams, cursor for the next page or None)"""
+    column = EXAM_FILTERS[status][0]
+    query, params = exam_list_query(status, after, now, page_size)
+    cursor = get_cursor()
+    cursor.execute(query, params)
+    exams = cursor.fetchall()
+    # One extra row tells us whether another page exists
+    next_cursor = encode_cursor(exams[page_size - 1], column) if len(exams) > page_size else None
+    return exams[:page_size], next_cursor
+
+
 # Home Page
 @app.route('/')
 def home():
-    cursor.execute("SELECT * FROM exams")
-    exams = cursor.fetchall()
-    return render_template('home.html', exams=exams)
+    status = request.args.get('status', 'all')
+    if status not in EXAM_FILTERS:
+        status = 'all'
+    page = request.args.get('page', 1, type=int)
+    after = decode_cursor(request.args.get('after'))
+    if after is None:
+        page = 1
+    now = datetime.now().replace(microsecond=0)
+
+    exams, next_cursor = list_exams(status, after, now)
+    total = count_exams(status, now)
+    pages = max(1, -(-total // EXAM_PAGE_SIZE))
+    return render_template('home.html', exams=exams, status=status, filters=list(EXAM_FILTERS),
+                           page=page, pages=pages, total=total, next_cursor=next_cursor)
 
 # Create Exam
 @app.route('/create_exam', methods=['GET', 'POST'])
@@ -48,50 +296,32 @@ def create_exam():
 
             duration = int((end_dt - start_dt).total_seconds() / 60)
 
-            # Insert exam
+            db = get_db()
+            cursor = get_cursor()
+
+            questions = parse_questions(request.form)
+
+            # Insert exam and all of its questions in one transaction
             cursor.execute(
                 "INSERT INTO exams (title, start_time, end_time, duration) VALUES (%s, %s, %s, %s)",
                 (title, start_dt, end_dt, duration)
             )
-            db.commit()
             exam_id = cursor.lastrowid
 
-            # Insert questions
-            for i in range(1, 1000):
-                q_text = request.form.get(f'q{i}_text')
-                if not q_text:
-                    continue
-
-                q_type = request.form.get(f'q{i}_type')
-                q_marks = int(request.form.get(f'q{i}_marks', 1))
-                q_negative = int(request.form.get(f'q{i}_negative', 0))
-                q_difficulty = request.form.get(f'q{i}_difficulty') or None
-
-                options = []
-                correct = []
-
-                if q_type == 'mcq':
-                    for j in range(1, 5):
-                        opt = request.form.get(f'q{i}_option{j}')
-                        if opt:
-                            options.append(opt)
-                            if f'q{i}_correct{j}' in request.form:
-                                correct.append(opt)
-                elif q_type == 'truefalse':
-                    ans = request.form.get(f'q{i}_truefalse')
-                    options = ["True", "False"]
-                    correct = [ans] if ans else []
-
-                cursor.execute(
+            if questions:
+                cursor.executemany(
                     "INSERT INTO questions (exam_id, q_text, q_type, marks, negative, difficulty, options, correct) "
                     "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
-                    (exam_id, q_text, q_type, q_marks, q_negative, q_difficulty,
-                     json.dumps(options), json.dumps(correct))
+                    [(exam_id,) + question_values(q) for q in questions]
                 )
             db.commit()
+            invalidate_exam_counts()
             flash("✅ Exam created successfully!", "success")
             return redirect(url_for('home'))
         except Exception as e:
+            db = g.get('db')
+            if db is not None:
+                db.rollback()
             flash(f"Error creating exam: {e}", "error")
             return redirect(url_for('create_exam'))
 
@@ -101,16 +331,15 @@ def create_exam():
 # Edit Exam
 @app.route('/edit_exam/<int:exam_id>', methods=['GET', 'POST'])
 def edit_exam(exam_id):
-    cursor.execute("SELECT * FROM exams WHERE id=%s", (exam_id,))
-    exam = cursor.fetchone()
-    if not exam:
+    cached = get_exam(exam_id)
+    if not cached:
         flash("Exam not found.", "error")
         return redirect(url_for('home'))
-
-    cursor.execute("SELECT * FROM questions WHERE exam_id=%s", (exam_id,))
-    questions = cursor.fetchall()
+    exam, questions, _ = cached
 
     if request.method == 'POST':
+        db = get_db()
+        cursor = get_cursor()
         try:
             title = request.form['title']
             start_time = request.form['start_time']
@@ -123,49 +352,54 @@ def edit_exam(exam_id):
                 flash("Start time must be before end time.", "error")
                 return redirect(url_for('edit_exam', exam_id=exam_id))
 
+            # Diff against the stored rows, not a possibly stale cache entry
+            exam, questions, _ = load_exam(exam_id) or cached
+
             duration = int((end_dt - start_dt).total_seconds() / 60)
 
-            # Update exam info
-            cursor.execute(
-                "UPDATE exams SET title=%s, start_time=%s, end_time=%s, duration=%s WHERE id=%s",
-                (title, start_dt, end_dt, duration, exam_id)
-            )
-            db.commit()
+            submitted = parse_questions(request.form)
+            inserts, updates, deletes = diff_questions(questions, submitted)
+            exam_changed = (title, start_dt, end_dt) != (exam['title'], exam['start_time'], exam['end_time'])
 
-            # Update questions
-            for i, q in enumerate(questions, start=1):
-                q_text = request.form.get(f'q{i}_text')
-                if not q_text:
-                    continue
-                q_type = request.form.get(f'q{i}_type')
-                q_marks = int(request.form.get(f'q{i}_marks', 1))
-                q_negative = int(request.form.get(f'q{i}_negative', 0))
-                q_difficulty = request.form.get(f'q{i}_difficulty') or None
-
-                options = []
-                correct = []
-
-                if q_type == 'mcq':
-                    for j in range(1, 5):
-                        opt = request.form.get(f'q{i}_option{j}')
-                        if opt:
-                            options.append(opt)
-                            if f'q{i}_correct{j}' in request.form:
-                                correct.append(opt)
-                elif q_type == 'truefalse':
-                    ans = request.form.get(f'q{i}_truefalse')
-                    options = ["True", "False"]
-                    correct = [ans] if ans else []
+            if not (exam_changed or inserts or updates or deletes):
+                flash("No changes to save.", "success")
+                return redirect(url_for('home'))
 
+            # Apply only what changed, one statement per kind, in one transaction
+            if exam_changed:
+                cursor.execute(
+                    "UPDATE exams SET title=%s, start_time=%s, end_time=%s, duration=%s WHERE id=%s",
+                    (title, start_dt, end_dt, duration, exam_id)
+                )
+            if inserts:
+                cursor.executemany(
+                    "INSERT INTO questions (exam_id, q_text, q_type, marks, negative, difficulty, options, correct) "
+                    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+                    [(exam_id,) + question_values(q) for q in inserts]
+                )
+            if updates:
+                cursor.executemany(
+                    "INSERT INTO questions (id, exam_id, q_text, q_type, marks, negative, difficulty, options, correct) "
+                    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s) "
+                    "ON DUPLICATE KEY UPDATE q_text=VALUES(q_text), q_type=VALUES(q_type), marks=VALUES(marks), "
+                    "negative=VALUES(negative), difficulty=VALUES(difficulty), options=VALUES(options), "
+                    "correct=VALUES(correct)",
+                    [(q['id'], exam_id) + question_values(q) for q in updates]
+                )
+            if deletes:
+                placeholders = ", ".join(["%s"] * len(deletes))
                 cursor.execute(
-                    "UPDATE questions SET q_text=%s, q_type=%s, marks=%s, negative=%s, difficulty=%s, options=%s, correct=%s WHERE id=%s",
-                    (q_text, q_type, q_marks, q_negative, q_difficulty,
-                     json.dumps(options), json.dumps(correct), q['id'])
+                    f"DELETE FROM questions WHERE exam_id=%s AND id IN ({placeholders})",
+                    (exam_id, *deletes)
                 )
             db.commit()
+            exam_cache.invalidate(exam_id)
+            item_analysis.invalidate(exam_id)
+            invalidate_exam_counts()
             flash("✅ Exam updated successfully!", "success")
             return redirect(url_for('home'))
         except Exception as e:
+            db.rollback()
             flash(f"Error updating exam: {e}", "error")
             return redirect(url_for('edit_exam', exam_id=exam_id))
 
@@ -175,75 +409,377 @@ def edit_exam(exam_id):
 # View Exam
 @app.route('/view_exam/<int:exam_id>')
 def view_exam(exam_id):
-    cursor.execute("SELECT * FROM exams WHERE id=%s", (exam_id,))
-    exam = cursor.fetchone()
-    cursor.execute("SELECT * FROM questions WHERE exam_id=%s", (exam_id,))
-    questions = cursor.fetchall()
-    return render_template('view_exam.html', exam=exam, questions=questions)
+    cached = get_exam(exam_id)
+    if not cached:
+        flash("Exam not found.", "error")
+        return redirect(url_for('home'))
+    exam, questions, _ = cached
+    # ?recompute=1 rebuilds the running statistics from every stored submission
+    item_stats = item_analysis.report(exam_id, questions, recompute=request.args.get('recompute') == '1')
+    return render_template('view_exam.html', exam=exam, questions=questions, item_stats=item_stats,
+                           distribution=rankings.distribution(exam_id))
 
 
 # Instructions Page
 @app.route('/instructions/<int:exam_id>')
 def instructions(exam_id):
-    cursor.execute("SELECT * FROM exams WHERE id=%s", (exam_id,))
-    exam = cursor.fetchone()
-    if not exam:
+    cached = get_exam(exam_id)
+    if not cached:
         flash("Exam not found.", "error")
         return redirect(url_for('home'))
+    exam, _, _ = cached
     return render_template('instructions.html', exam=exam)
 
 
 # Take Exam
 @app.route('/take_exam/<int:exam_id>', methods=['GET', 'POST'])
 def take_exam(exam_id):
-    cursor.execute("SELECT * FROM exams WHERE id=%s", (exam_id,))
-    exam = cursor.fetchone()
-    if not exam:
+    cached = get_exam(exam_id)
+    if not cached:
         flash("Exam not found.", "error")
         return redirect(url_for('home'))
-
-    cursor.execute("SELECT * FROM questions WHERE exam_id=%s", (exam_id,))
-    questions = cursor.fetchall()
+    exam, questions, answer_key = cached
 
     duration_seconds = (exam.get('duration') or 0) * 60
 
+    attempt_id = session.get('attempts', {}).get(str(exam_id))
+    digital_id = session.get('digital_id_hash')
+
     if request.method == 'POST':
-        score = 0
-        total = 0
-        results = []
-
-        for q in questions:
-            correct_answers = json.loads(q['correct']) if q.get('correct') else []
-            user_answer = request.form.get(f'question_{q["id"]}')
-            marks = q.get('marks') or 0
-            negative = q.get('negative') or 0
-            total += marks
-
-            if user_answer and user_answer in correct_answers:
-                score += marks
-                result = {"question": q['q_text'], "your_answer": user_answer, "status": "✅ Correct"}
-            elif user_answer:
-                score -= negative
-                result = {"question": q['q_text'], "your_answer": user_answer, "status": "❌ Wrong"}
-            else:
-                result = {"question": q['q_text'], "your_answer": "Not answered", "status": "⚠️ Skipped"}
-            results.append(result)
+        # Only an attempt started from the exam page, and still within its time, can be submitted
+        try:
+            state = attempt_clock.check(attempt_id, exam_id, digital_id) if attempt_id else 'unstarted'
+        except RuntimeError:
+            return "The server could not check your attempt. Please submit again in a moment.", 503
+        if state == 'unstarted':
+            flash("No attempt of this exam is in progress. Start the exam to submit answers.", "error")
+            return redirect(url_for('take_exam', exam_id=exam_id))
+        if state == 'expired':
+            # Too late for this form: the answers saved before the deadline are what count
+            attempt_clock.expire_now(attempt_id)
+            session['attempts'].pop(str(exam_id), None)
+            session.modified = True
+            flash("Time is up for this attempt. Your last saved answers were submitted.", "error")
+            return redirect(url_for('home'))
+        # Seal the autosaved attempt first so a second submit cannot grade it again; the seal is
+        # only persisted once the submission is queued, and undone if it never was
+        final = {field: request.form.get(field) for field in answer_key.fields if request.form.get(field)}
+        if autosave.seal(attempt_id, exam_id, digital_id, final) is None:
+            flash("This exam attempt has already been submitted.", "error")
+            return redirect(url_for('home'))
+        try:
+            score, total, results, receipt = record_submission(exam_id, digital_id, answer_key, request.form,
+                                                               attempt_id)
+        except queue.Full:
+            autosave.reopen(attempt_id)
+            return "The server is busy saving submissions. Please submit again in a moment.", 503
+        except Exception:
+            autosave.reopen(attempt_id)
+            raise
+        attempt_clock.finish(attempt_id)
+        session['attempts'].pop(str(exam_id), None)
+        session.modified = True
 
         flash(f"Exam Submitted! You scored {score} out of {total}.", "success")
-        return render_template('result.html', exam=exam, results=results, score=score, total=total)
+        return render_template('result.html', exam=exam, results=results, score=score, total=total,
+                               receipt=receipt, standing=rankings.standing(exam_id, score))
+
+    if attempt_id is None:
+        # One attempt per exam per browser session; reloading the page resumes it
+        attempt_id = uuid.uuid4().hex
+        session.setdefault('attempts', {})[str(exam_id)] = attempt_id
+        session.modified = True
+
+    try:
+        deadline, sealed = attempt_clock.start_attempt(attempt_id, exam_id, digital_id, duration_seconds,
+                                                       exam.get('end_time'))
+    except RuntimeError:
+        return "The server could not start your attempt. Please try again in a moment.", 503
+    if sealed:
+        session['attempts'].pop(str(exam_id), None)
+        session.modified = True
+        flash("This exam attempt has already been submitted.", "error")
+        return redirect(url_for('home'))
+    if deadline is not None:
+        # The page counts down from the time actually left, not the full duration
+        duration_seconds = max(int((deadline - datetime.now()).total_seconds()), 0)
+
+    context = dict(exam=exam, questions=questions, duration_seconds=duration_seconds, attempt_id=attempt_id,
+                   event_codes=EVENT_CODES)
+    if request.args.get('stream', '1' if STREAM_EXAM_PAGES else '0') == '1':
+        return stream_page('take_exam.html', **context)
+    return render_template('take_exam.html', **context)
+
+
+def record_submission(exam_id, digital_id, answer_key, form, attempt_id=None):
+    """Grade `form`, queue the submission and append it to the ledger.
+
+    The sealed autosave attempt `attempt_id` is confirmed as soon as the writer
+    accepts the row, so a failure after that point cannot submit it twice.
+    Returns (score, total, results, receipt); raises queue.Full when the writer is backed up.
+    """
+    score, total, results = answer_key.score(form)
+    answers = {qid: form.get(field) for qid, field in zip(answer_key.question_ids, answer_key.fields)
+               if form.get(field)}
+    submitted_at = datetime.now()
+    submission_uuid = uuid.uuid4().hex
+    # Persisted in the background by the group-commit writer
+    submission_writer.submit((
+        submission_uuid, exam_id, digital_id,
+        json.dumps(answers), score, total, submitted_at
+    ))
+    if attempt_id:
+        autosave.confirm(attempt_id)
+    item_analysis.record(exam_id, answers, submitted_at)
+    rankings.record(exam_id, score, submitted_at)
+    # Tamper-evident record of the graded result, its candidate and its submissions row
+    receipt = ledger.append(submission_uuid, digital_id, exam_id, answer_digest(answers), score)
+    return score, total, results, receipt
+
+
+def submit_expired_attempt(attempt_id, exam_id, digital_id):
+    """Attempt clock handler: submit the last saved answers of an attempt that ran out of time"""
+    answers = autosave.seal(attempt_id, exam_id, digital_id)
+    if answers is None:
+        return True  # submitted by the candidate in the meantime
+    with app.app_context():
+        cached = get_exam(exam_id)
+    if not cached:
+        return True
+    try:
+        record_submission(exam_id, digital_id, cached[2], answers, attempt_id)
+    except Exception as e:
+        # reopen() leaves a seal alone once the row was queued; otherwise the clock retries later
+        print(f"Error submitting expired attempt {attempt_id}: {e}")
+        autosave.reopen(attempt_id)
+        return False
+    return True
+
 
-    return render_template('take_exam.html', exam=exam, questions=questions, duration_seconds=duration_seconds)
+attempt_clock.on_expire(submit_expired_attempt)
+
+
+@app.before_request
+def start_services():
+    # Per-process ticker; after a (re)start it also reloads open deadlines, retrying until storage answers
+    attempt_clock.start()
+    # Exam rankings are rebuilt from stored scores in the background, once per process
+    rankings.start()
+
+
+# Answer autosave: the exam page posts {"seq": n, "answers": {field: value}} deltas
+def session_attempt(attempt_id):
+    """exam_id of an attempt that belongs to this browser session, or None"""
+    for exam_id, owned in session.get('attempts', {}).items():
+        if owned == attempt_id:
+            return int(exam_id)
+    return None
+
+
+@app.route('/api/attempts/<attempt_id>/answers', methods=['GET', 'POST'])
+def attempt_answers(attempt_id):
+    exam_id = session_attempt(attempt_id)
+    if exam_id is None:
+        return jsonify({'error': 'Unknown attempt'}), 403
+    digital_id = session.get('digital_id_hash')
+
+    if request.method == 'GET':
+        try:
+            return jsonify(autosave.snapshot(attempt_id, exam_id, digital_id))
+        except RuntimeError:
+            return jsonify({'error': 'Storage unavailable'}), 503
+
+    cached = get_exam(exam_id)
+    if not cached:
+        return jsonify({'error': 'Exam not found'}), 404
+    answer_key = cached[2]
+
+    # sendBeacon posts text/plain, so parse the body regardless of content type
+    payload = request.get_json(force=True, silent=True)
+    if not isinstance(payload, dict) or not isinstance(payload.get('answers'), dict) \
+            or not isinstance(payload.get('seq'), int):
+        return jsonify({'error': 'Expected {"seq": int, "answers": {...}}'}), 400
+    fields = set(answer_key.fields)
+    delta = payload['answers']
+    for field, value in delta.items():
+        if field not in fields:
+            return jsonify({'error': f'Unknown field {field}'}), 400
+        if value is not None and (not isinstance(value, str) or len(value) > AutosaveConfig.AUTOSAVE_MAX_ANSWER_LENGTH):
+            return jsonify({'error': f'Invalid value for {field}'}), 400
+
+    if attempt_clock.expired(attempt_id):
+        return jsonify({'error': 'Time is up for this attempt'}), 409
+    try:
+        applied, seq = autosave.save(attempt_id, exam_id, digital_id, delta, payload['seq'])
+    except AttemptSealedError:
+        return jsonify({'error': 'Attempt already submitted'}), 409
+    except RuntimeError:
+        return jsonify({'error': 'Storage unavailable, keep the answers and retry'}), 503
+    return jsonify({'applied': applied, 'seq': seq})
+
+
+# Proctoring events: the exam page posts {"base": ms timestamp, "events": [[code, ms offset], ...]}
+@app.route('/api/attempts/<attempt_id>/events', methods=['POST'])
+def attempt_events(attempt_id):
+    exam_id = session_attempt(attempt_id)
+    if exam_id is None:
+        return jsonify({'error': 'Unknown attempt'}), 403
+    if attempt_clock.expired(attempt_id):
+        return jsonify({'error': 'Time is up for this attempt'}), 409
+
+    # sendBeacon posts text/plain, so parse the body regardless of content type
+    payload = request.get_json(force=True, silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Expected {"batch": id, "base": int, "events": [[code, offset], ...]}'}), 400
+    try:
+        accepted = event_store.append(exam_id, attempt_id, payload.get('batch'), payload.get('base'),
+                                      payload.get('events'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except IngestBacklogError:
+        return jsonify({'error': 'Too many events queued, retry shortly'}), 503
+    return jsonify({'accepted': accepted}), 202
+
+
+@app.route('/api/exams/<int:exam_id>/events/summary')
+def exam_event_summaries(exam_id):
+    return jsonify(event_store.exam_summaries(exam_id))
+
+
+@app.route('/api/exams/<int:exam_id>/attempts/<attempt_id>/events/summary')
+def attempt_event_summary(exam_id, attempt_id):
+    summary = event_store.summary(exam_id, attempt_id)
+    if summary is None:
+        return jsonify({'error': 'No events recorded for this attempt'}), 404
+    return jsonify(summary)
+
+
+# Chunked question delivery: pages of the cached exam as JSON, without answers
+QUESTION_PAGE_SIZE = 20
+MAX_QUESTION_PAGE_SIZE = 100
+
+
+def public_question(q, number):
+    """The parts of a question a candidate may see"""
+    return {
+        'id': q['id'],
+        'number': number,
+        'q_text': q['q_text'],
+        'q_type': q['q_type'],
+        'marks': q.get('marks'),
+        'negative': q.get('negative'),
+        'options': q['options'],
+    }
+
+
+@app.route('/api/exams/<int:exam_id>/questions')
+def exam_questions(exam_id):
+    cached = get_exam(exam_id)
+    if not cached:
+        return jsonify({'error': 'Exam not found'}), 404
+    _, questions, _ = cached
+
+    per_page = min(max(request.args.get('per_page', QUESTION_PAGE_SIZE, type=int), 1), MAX_QUESTION_PAGE_SIZE)
+    page = max(request.args.get('page', 1, type=int), 1)
+    start = (page - 1) * per_page
+    return jsonify({
+        'exam_id': exam_id,
+        'page': page,
+        'per_page': per_page,
+        'pages': max(1, -(-len(questions) // per_page)),
+        'total_questions': len(questions),
+        'questions': [public_question(q, start + i + 1) for i, q in enumerate(questions[start:start + per_page])],
+    })
+
+
+# Streamed rendering: the browser gets the head and first questions while the rest renders
+STREAM_EXAM_PAGES = os.getenv('STREAM_EXAM_PAGES', '0') == '1'
+STREAM_BUFFER = 64
+
+
+def stream_page(template_name, **context):
+    app.update_template_context(context)
+    stream = app.jinja_env.get_template(template_name).stream(context)
+    # Group Jinja's many small fragments into fewer, larger writes
+    stream.enable_buffering(STREAM_BUFFER)
+    return Response(stream_with_context(stream), mimetype='text/html')
 
 
 # Delete Exam
 @app.route('/delete_exam/<int:exam_id>', methods=['POST'])
 def delete_exam(exam_id):
+    db = get_db()
+    cursor = get_cursor()
     cursor.execute("DELETE FROM exams WHERE id=%s", (exam_id,))
     cursor.execute("DELETE FROM questions WHERE exam_id=%s", (exam_id,))
     db.commit()
+    exam_cache.invalidate(exam_id)
+    item_analysis.invalidate(exam_id)
+    rankings.forget(exam_id)
+    invalidate_exam_counts()
     flash("Exam deleted successfully!", "success")
     return redirect(url_for('home'))
 
 
+# Live standing of a score among an exam's submissions
+@app.route('/api/exams/<int:exam_id>/ranking')
+def exam_ranking(exam_id):
+    score = request.args.get('score', type=int)
+    if not rankings.ready():
+        return jsonify({'error': 'Rankings are still loading'}), 503, {'Retry-After': '5'}
+    if score is None:
+        distribution = rankings.distribution(exam_id)
+        if distribution is None:
+            return jsonify({'error': 'No submissions for this exam'}), 404
+        return jsonify(distribution)
+    standing = rankings.standing(exam_id, score)
+    if standing is None:
+        return jsonify({'error': 'No submissions for this exam'}), 404
+    return jsonify(standing)
+
+
+# Ledger inclusion proof for one graded result
+@app.route('/ledger/proof/<int:seq>')
+def ledger_proof(seq):
+    proof = ledger.proof(seq)
+    if proof is None:
+        return jsonify({'error': 'Record not found'}), 404
+    if proof.get('pending'):
+        # Recorded, but its block is not sealed yet
+        return jsonify(proof), 202, {'Retry-After': str(proof['retry_after'])}
+    return jsonify(proof)
+
+
+# Runtime statistics
+@app.route('/stats')
+def stats():
+    return jsonify({
+        'db_pool': DatabaseConfig.pool_stats(),
+        'exam_cache': exam_cache.stats(),
+        'user_cache': user_cache.stats(),
+        'login_tracker': last_login_recorder.stats(),
+        'submission_writer': submission_writer.stats(),
+        'ledger': ledger.stats(),
+        'autosave': autosave.stats(),
+        'attempt_clock': attempt_clock.stats(),
+        'proctoring': event_store.stats(),
+        'rankings': rankings.stats(),
+    })
+
+
+# Concurrency
+# Serve from ONE process, with a thread per request:
+#   APP_THREADED=1 python app.py
+# Several background services keep state in this process: the submission
+# writer, login tracker, autosave buffer and proctoring event buffers queue
+# writes in memory, and the ledger is a single-writer file. The built-in
+# server's forking mode (processes=N) runs each request in a child that
+# exits with os._exit, so anything queued there is lost and each child
+# appends to the ledger from its own stale offsets. It is not supported.
+# Size DB_POOL_SIZE to at least the number of concurrent requests; use
+# benchmarks/load_test.py to measure throughput.
 if __name__ == '__main__':
-    app.run(debug=True)
+    if os.getenv('APP_PROCESSES', '1') != '1':
+        raise SystemExit("APP_PROCESSES is no longer supported: the write-behind services and the ledger "
+                         "need a single process. Use APP_THREADED=1.")
+    app.run(debug=True, threaded=os.getenv('APP_THREADED', '1') == '1')
@@ -0,0 +1,81 @@
+# benchmarks/autosave_load_test.py
+# Simulates many concurrent exam attempts autosaving against AutosaveBuffer
+# and the configured database: each attempt sends a one-answer delta every
+# --interval seconds for --duration seconds.
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.autosave import AutosaveBuffer
+
+
+def run(attempts, interval, duration, threads, flush_interval, batch_size, exam_id):
+    buffer = AutosaveBuffer(flush_interval, batch_size, idle_ttl=3600)
+    ids = [uuid.uuid4().hex for _ in range(attempts)]
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def candidate_group(group):
+        rng = random.Random()
+        seqs = dict.fromkeys(group, 0)
+        local = []
+        # Spread each attempt's first save across the interval
+        next_save = {attempt_id: time.monotonic() + rng.random() * interval for attempt_id in group}
+        while time.monotonic() < deadline:
+            now = time.monotonic()
+            due = [attempt_id for attempt_id, at in next_save.items() if at <= now]
+            for attempt_id in due:
+                seqs[attempt_id] += 1
+                delta = {f"question_{rng.randint(1, 100)}": rng.choice("ABCD")}
+                started = time.perf_counter()
+                buffer.save(attempt_id, exam_id, None, delta, seqs[attempt_id])
+                local.append(time.perf_counter() - started)
+                next_save[attempt_id] = now + interval
+            time.sleep(0.005)
+        with lock:
+            latencies.extend(local)
+
+    groups = [ids[i::threads] for i in range(threads)]
+    workers = [threading.Thread(target=candidate_group, args=(group,)) for group in groups]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    flush_started = time.perf_counter()
+    buffer.shutdown()
+    final_flush = time.perf_counter() - flush_started
+    elapsed = time.perf_counter() - started
+
+    stats = buffer.stats()
+    latencies.sort()
+    print(f"Attempts:        {attempts} saving every {interval}s for {duration}s ({threads} client threads)")
+    print(f"Saves applied:   {stats['saves']} ({stats['saves'] / elapsed:,.0f}/s, "
+          f"target {attempts / interval:,.0f}/s)")
+    print(f"Save latency:    p50 {statistics.median(latencies) * 1e6:.0f} us   "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1e6:.0f} us")
+    print(f"Snapshots written: {stats['written']} in {stats['flushes']} flushes "
+          f"({stats['written'] / max(stats['saves'], 1):.2f} rows per save), errors {stats['errors']}")
+    print(f"Final flush:     {final_flush * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Autosave load test")
+    parser.add_argument("--attempts", type=int, default=10000)
+    parser.add_argument("--interval", type=float, default=3.0, help="seconds between saves per attempt")
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--flush-interval", type=float, default=2.0)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--exam-id", type=int, default=1)
+    args = parser.parse_args()
+    run(args.attempts, args.interval, args.duration, args.threads, args.flush_interval, args.batch_size,
+        args.exam_id)
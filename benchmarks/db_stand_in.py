@@ -0,0 +1,179 @@
+# benchmarks/db_stand_in.py
+# SQLite-backed stand-in for the MySQL server, for running the app and its
+# services locally without one (benchmarks only). The schema comes from
+# migrations.py, and the MySQL dialect the code uses is translated on the fly.
+# Errors are raised as mysql.connector errors, so the app handles them as usual.
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector.errors as mysql_errors
+from config import DatabaseConfig
+from migrations import MIGRATIONS
+
+# MySQL-only statements with no SQLite equivalent the benchmarks depend on
+UNSUPPORTED_DDL = re.compile(r'^\s*(DELETE \w+ FROM|ALTER TABLE \w+ ADD CONSTRAINT)', re.IGNORECASE)
+
+_DDL_REWRITES = [
+    (re.compile(r'\bINT PRIMARY KEY AUTO_INCREMENT\b', re.IGNORECASE), 'INTEGER PRIMARY KEY AUTOINCREMENT'),
+    (re.compile(r'\bENUM\([^)]*\)', re.IGNORECASE), 'TEXT'),
+    (re.compile(r'\bJSON\b'), 'TEXT'),
+    (re.compile(r',\s*INDEX (\w+) \(([^)]*)\)', re.IGNORECASE), ''),
+]
+_INLINE_INDEX = re.compile(r'INDEX (\w+) \(([^)]*)\)', re.IGNORECASE)
+_TABLE_NAME = re.compile(r'CREATE TABLE IF NOT EXISTS (\w+)', re.IGNORECASE)
+
+_translated = {}
+
+
+def _adapt_datetime(value):
+    return value.isoformat(' ')
+
+
+def _convert_datetime(value):
+    return datetime.fromisoformat(value.decode())
+
+
+sqlite3.register_adapter(datetime, _adapt_datetime)
+for _type in ('DATETIME', 'TIMESTAMP'):
+    sqlite3.register_converter(_type, _convert_datetime)
+
+
+def translate(sql):
+    """The SQLite form of one MySQL statement (cached per statement text)"""
+    translated = _translated.get(sql)
+    if translated is not None:
+        return translated
+    out = re.sub(r'%\((\w+)\)s', r':\1', sql).replace('%s', '?')
+    out = re.sub(r'\bNOW\(\)', "datetime('now', 'localtime')", out)
+    out = re.sub(r'\bTRUE\b', '1', out)
+    out = re.sub(r'\bFALSE\b', '0', out)
+    out = out.replace('INSERT IGNORE', 'INSERT OR IGNORE')
+    if 'ON DUPLICATE KEY UPDATE' in out:
+        out = out.replace('ON DUPLICATE KEY UPDATE', 'ON CONFLICT DO UPDATE SET')
+        out = re.sub(r'VALUES\((\w+)\)', r'excluded.\1', out)
+    _translated[sql] = out
+    return out
+
+
+def schema_statements():
+    """migrations.py translated to SQLite DDL, in order"""
+    statements = []
+    for _, _, migration in MIGRATIONS:
+        for sql in migration:
+            if UNSUPPORTED_DDL.match(sql):
+                continue
+            inline = _INLINE_INDEX.findall(sql) if 'CREATE TABLE' in sql.upper() else []
+            for pattern, replacement in _DDL_REWRITES:
+                sql = pattern.sub(replacement, sql)
+            statements.append(translate(sql))
+            table = _TABLE_NAME.search(sql)
+            for name, columns in inline:
+                statements.append(f"CREATE INDEX IF NOT EXISTS {name} ON {table.group(1)} ({columns})")
+    return statements
+
+
+def _mysql_error(e):
+    if isinstance(e, sqlite3.IntegrityError):
+        return mysql_errors.IntegrityError(msg=str(e), errno=1062)
+    return mysql_errors.DatabaseError(msg=str(e))
+
+
+class StandInCursor:
+    def __init__(self, connection, dictionary):
+        self._cursor = connection.cursor()
+        self._dictionary = dictionary
+        self.lastrowid = None
+        self.rowcount = -1
+
+    def _params(self, params):
+        if params is None:
+            return ()
+        return params if isinstance(params, dict) else tuple(params)
+
+    def execute(self, sql, params=None):
+        try:
+            self._cursor.execute(translate(sql), self._params(params))
+        except sqlite3.Error as e:
+            raise _mysql_error(e) from e
+        self.lastrowid = self._cursor.lastrowid
+        self.rowcount = self._cursor.rowcount
+
+    def executemany(self, sql, rows):
+        try:
+            self._cursor.executemany(translate(sql), [self._params(row) for row in rows])
+        except sqlite3.Error as e:
+            raise _mysql_error(e) from e
+        self.lastrowid = self._cursor.lastrowid
+        self.rowcount = self._cursor.rowcount
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return {column[0]: value for column, value in zip(self._cursor.description, row)}
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def __iter__(self):
+        for row in self._cursor:
+            yield self._row(row)
+
+    def close(self):
+        self._cursor.close()
+
+
+class StandInConnection:
+    """The subset of a mysql.connector connection that the app uses"""
+
+    def __init__(self, path):
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False,
+                                           detect_types=sqlite3.PARSE_DECLTYPES)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._open = True
+
+    def cursor(self, dictionary=False, buffered=None, **kwargs):
+        return StandInCursor(self._connection, dictionary)
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def ping(self, reconnect=False):
+        if not self._open:
+            raise mysql_errors.InterfaceError(msg="Connection closed")
+
+    def is_connected(self):
+        return self._open
+
+    def close(self):
+        self._open = False
+        self._connection.close()
+
+
+def create(path):
+    """Create a database file with the current schema"""
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode = WAL")
+    for statement in schema_statements():
+        connection.execute(statement)
+    connection.commit()
+    connection.close()
+
+
+def install(path):
+    """Point DatabaseConfig (and so the app and every service) at the SQLite file"""
+    DatabaseConfig._connect = staticmethod(lambda: StandInConnection(path))
+    DatabaseConfig._pool = None
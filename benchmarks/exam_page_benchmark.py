@@ -0,0 +1,50 @@
+# benchmarks/exam_page_benchmark.py
+# Time-to-first-byte, total time and response size of the exam page against
+# a running app: the monolithic render, the streamed render and the first
+# JSON page of questions.
+#   python app.py    then    python benchmarks/exam_page_benchmark.py --exam 1
+import argparse
+import http.client
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+def fetch(base, path):
+    """(ttfb, total, bytes) for one GET"""
+    url = urlsplit(base)
+    connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=60)
+    started = time.perf_counter()
+    connection.request("GET", path)
+    response = connection.getresponse()
+    first = response.read1(1) if hasattr(response, 'read1') else response.read(1)
+    ttfb = time.perf_counter() - started
+    size = len(first) + len(response.read())
+    total = time.perf_counter() - started
+    connection.close()
+    if response.status != 200:
+        raise RuntimeError(f"{path} returned HTTP {response.status}")
+    return ttfb, total, size
+
+
+def measure(label, base, path, repeat):
+    fetch(base, path)  # warm the exam cache
+    samples = [fetch(base, path) for _ in range(repeat)]
+    ttfb = statistics.median(sample[0] for sample in samples)
+    total = statistics.median(sample[1] for sample in samples)
+    size = samples[-1][2]
+    print(f"{label:<26} TTFB {ttfb * 1000:8.2f} ms   total {total * 1000:8.2f} ms   {size / 1024:9.1f} KiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exam page TTFB and size benchmark")
+    parser.add_argument("--base", default="http://127.0.0.1:5000")
+    parser.add_argument("--exam", type=int, required=True, help="id of an exam with many questions")
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    measure("monolithic render", args.base, f"/take_exam/{args.exam}?stream=0", args.repeat)
+    measure("streamed render", args.base, f"/take_exam/{args.exam}?stream=1", args.repeat)
+    measure(f"JSON page ({args.per_page} questions)", args.base,
+            f"/api/exams/{args.exam}/questions?page=1&per_page={args.per_page}", args.repeat)
@@ -0,0 +1,97 @@
+# benchmarks/grading_benchmark.py
+# Compare the original per-submission json.loads grading loop with the
+# compiled AnswerKey, one submission at a time and in batches.
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.grading import AnswerKey
+
+
+def make_questions(count):
+    questions = []
+    for qid in range(1, count + 1):
+        options = [f"option {qid}-{j}" for j in range(4)]
+        questions.append({
+            'id': qid,
+            'q_text': f"Question {qid}",
+            'marks': random.randint(1, 4),
+            'negative': random.randint(0, 1),
+            'options': json.dumps(options),
+            'correct': json.dumps([random.choice(options)]),
+        })
+    return questions
+
+
+def make_submissions(questions, count):
+    submissions = []
+    for _ in range(count):
+        answers = {}
+        for q in questions:
+            if random.random() < 0.9:
+                answers[f"question_{q['id']}"] = random.choice(json.loads(q['options']))
+        submissions.append(answers)
+    return submissions
+
+
+def legacy_score(questions, form):
+    """The grading loop take_exam used before AnswerKey"""
+    score = 0
+    total = 0
+    results = []
+    for q in questions:
+        correct_answers = json.loads(q['correct']) if q.get('correct') else []
+        user_answer = form.get(f'question_{q["id"]}')
+        marks = q.get('marks') or 0
+        negative = q.get('negative') or 0
+        total += marks
+        if user_answer and user_answer in correct_answers:
+            score += marks
+            result = {"question": q['q_text'], "your_answer": user_answer, "status": "✅ Correct"}
+        elif user_answer:
+            score -= negative
+            result = {"question": q['q_text'], "your_answer": user_answer, "status": "❌ Wrong"}
+        else:
+            result = {"question": q['q_text'], "your_answer": "Not answered", "status": "⚠️ Skipped"}
+        results.append(result)
+    return score, total, results
+
+
+def timed(label, fn, count):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    rate = f"{count / elapsed:12,.0f} submissions/s" if count else ""
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms   {rate}")
+    return result
+
+
+def run_benchmark(question_count, submission_count):
+    random.seed(42)
+    questions = make_questions(question_count)
+    submissions = make_submissions(questions, submission_count)
+
+    print(f"Grading {submission_count} submissions of {question_count} questions\n")
+    legacy = timed("legacy json.loads loop", lambda: [legacy_score(questions, s)[0] for s in submissions],
+                   submission_count)
+
+    decoded = [dict(q, correct=json.loads(q['correct'])) for q in questions]
+    key = timed("compile AnswerKey", lambda: AnswerKey.compile(decoded), None)
+    single = timed("AnswerKey.score", lambda: [key.score(s)[0] for s in submissions], submission_count)
+    batch = timed("AnswerKey.score_batch", lambda: key.score_batch(submissions).tolist(), submission_count)
+
+    assert legacy == single == batch, "scoring mismatch"
+    print("\n✓ All three implementations agree")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grading engine benchmark")
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--submissions", type=int, default=5000)
+    args = parser.parse_args()
+    run_benchmark(args.questions, args.submissions)
@@ -0,0 +1,89 @@
+# benchmarks/item_analysis_benchmark.py
+# Item statistics over --submissions synthetic submissions to a
+# --questions-question MCQ exam, computed both ways: one ItemStats.add() per
+# submission (the live path) and vectorized add_matrix() blocks (the backfill
+# path). Candidates answer with a seeded ability model, so questions differ
+# in facility and discrimination. Both modes must agree.
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.item_analysis import ItemStats, SKIPPED
+
+OPTIONS = ["A", "B", "C", "D"]
+
+
+def synthetic_exam(questions):
+    return [{'id': qid, 'options': OPTIONS, 'correct': ["A"], 'marks': 4, 'negative': 1}
+            for qid in range(1, questions + 1)]
+
+
+def synthetic_codes(rng, rows, questions, difficulty, slope):
+    """Choice codes: P(correct) rises with ability; wrong answers split over B-D; some skips"""
+    ability = rng.normal(size=(rows, 1))
+    p_correct = 1 / (1 + np.exp(-slope * (ability - difficulty)))
+    draw = rng.random((rows, questions))
+    codes = np.where(draw < p_correct, 0, rng.integers(1, len(OPTIONS), size=(rows, questions)))
+    codes[rng.random((rows, questions)) < 0.05] = SKIPPED
+    return codes.astype(np.int16)
+
+
+def to_answers(codes):
+    return [{str(qid): OPTIONS[code] for qid, code in enumerate(row.tolist(), start=1) if code >= 0}
+            for row in codes]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental vs vectorized item analysis")
+    parser.add_argument("--submissions", type=int, default=1000000)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--chunk", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=23)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    questions = synthetic_exam(args.questions)
+    difficulty = rng.normal(size=args.questions)
+    slope = rng.uniform(0.3, 2.5, size=args.questions)
+
+    incremental = ItemStats(questions)
+    vectorized = ItemStats(questions)
+    add_time = matrix_time = 0.0
+    done = 0
+    while done < args.submissions:
+        rows = min(args.chunk, args.submissions - done)
+        codes = synthetic_codes(rng, rows, args.questions, difficulty, slope)
+
+        # Live path: graded submissions arrive as answer dicts one at a time
+        answers = to_answers(codes)
+        started = time.perf_counter()
+        for submission in answers:
+            incremental.add(submission)
+        add_time += time.perf_counter() - started
+
+        # Backfill path: the same rows as one block of choice codes
+        started = time.perf_counter()
+        vectorized.add_matrix(codes)
+        matrix_time += time.perf_counter() - started
+        done += rows
+
+    started = time.perf_counter()
+    report = vectorized.report()
+    report_time = time.perf_counter() - started
+    assert incremental.report() == report, "incremental and vectorized statistics differ"
+
+    n = args.submissions
+    print(f"{n:,} submissions x {args.questions} questions")
+    print(f"incremental add():     {add_time:8.2f} s   {add_time / n * 1e6:7.2f} us/submission")
+    print(f"vectorized add_matrix: {matrix_time:8.2f} s   {matrix_time / n * 1e6:7.2f} us/submission "
+          f"({add_time / matrix_time:.0f}x)")
+    print(f"report():              {report_time * 1000:8.2f} ms")
+    ranked = sorted(report.items(), key=lambda item: item[1]['discrimination'])
+    for label, (qid, stats) in (("least discriminating", ranked[0]), ("most discriminating", ranked[-1])):
+        print(f"{label:<21} Q{qid}: p={stats['p_value']:.2f} r_pb={stats['discrimination']:.2f} "
+              f"skip={stats['skip_rate']:.2%} chosen={ {k: round(v, 2) for k, v in stats['distractors'].items()} }")
@@ -0,0 +1,50 @@
+# benchmarks/ledger_benchmark.py
+# Append throughput of the submission ledger, plus proof generation and
+# verification cost, in a throwaway directory.
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ledger import Ledger, answer_digest, verify_proof
+
+
+def run_benchmark(records, block_size, proofs):
+    with tempfile.TemporaryDirectory() as directory:
+        ledger = Ledger(directory, block_size)
+        digests = [answer_digest({str(q): random.choice("ABCD") for q in range(1, 51)}) for _ in range(1000)]
+
+        started = time.perf_counter()
+        for n in range(records):
+            ledger.append(f"{n:032x}", f"{n % 5000:064x}", n % 50 + 1, digests[n % len(digests)],
+                          random.randint(0, 100))
+        ledger.seal()
+        elapsed = time.perf_counter() - started
+        stats = ledger.stats()
+        print(f"Appended {records} records into {stats['blocks']} blocks of {block_size}")
+        print(f"Append throughput: {records / elapsed:,.0f} records/s ({elapsed:.2f}s)")
+
+        sample = random.sample(range(records), min(proofs, records))
+        started = time.perf_counter()
+        generated = [ledger.proof(seq) for seq in sample]
+        proof_time = time.perf_counter() - started
+        started = time.perf_counter()
+        assert all(verify_proof(proof) for proof in generated), "proof verification failed"
+        verify_time = time.perf_counter() - started
+        print(f"Proof size:        {len(generated[0]['path'])} hashes")
+        print(f"Proof generation:  {proof_time / len(sample) * 1000:.3f} ms/proof")
+        print(f"Proof verify:      {verify_time / len(sample) * 1000:.3f} ms/proof")
+        ledger.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ledger append/proof benchmark")
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--block-size", type=int, default=1024)
+    parser.add_argument("--proofs", type=int, default=1000)
+    args = parser.parse_args()
+    run_benchmark(args.records, args.block_size, args.proofs)
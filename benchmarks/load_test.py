@@ -0,0 +1,46 @@
+# benchmarks/load_test.py
+# Fire concurrent GET requests at a running app:
+#   APP_THREADED=1 python app.py      then  python benchmarks/load_test.py
+import argparse
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def fetch(url):
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            response.read()
+            ok = response.status == 200
+    except Exception:
+        ok = False
+    return ok, time.perf_counter() - started
+
+
+def run_load_test(url, requests, concurrency):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(fetch, [url] * requests))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for ok, latency in results if ok)
+    failures = sum(1 for ok, _ in results if not ok)
+    print(f"URL:          {url}")
+    print(f"Requests:     {requests} ({concurrency} concurrent)")
+    print(f"Failures:     {failures}")
+    print(f"Throughput:   {requests / elapsed:.1f} req/s")
+    if latencies:
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+        print(f"Latency p50:  {statistics.median(latencies) * 1000:.1f} ms")
+        print(f"Latency p95:  {p95 * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent load test for the exam app")
+    parser.add_argument("--url", default="http://127.0.0.1:5000/")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    run_load_test(args.url, args.requests, args.concurrency)
@@ -0,0 +1,55 @@
+# benchmarks/login_benchmark.py
+# Login throughput and latency of password verification on the hashing
+# worker pool, for several KDFs and work factors.
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.password_hasher import build_hasher
+
+CONFIGS = [
+    ("sha256-legacy", {}),
+    ("pbkdf2", {"iterations": 100000}),
+    ("pbkdf2", {"iterations": 300000}),
+    ("pbkdf2", {"iterations": 600000}),
+    ("scrypt", {"n": 2 ** 13}),
+    ("scrypt", {"n": 2 ** 14}),
+    ("scrypt", {"n": 2 ** 15}),
+]
+
+
+def run_config(name, params, logins, concurrency, workers):
+    hasher = build_hasher(name, workers=workers, queue_limit=concurrency, **params)
+    stored = hasher.hash("correct horse battery staple")
+
+    def login(_):
+        started = time.perf_counter()
+        matches, _ = hasher.verify("correct horse battery staple", stored)
+        assert matches
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as requests:
+        latencies = sorted(requests.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+
+    label = name + "".join(f" {key}={value}" for key, value in params.items())
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    print(f"{label:<28} {logins / elapsed:9.1f} logins/s   "
+          f"p50 {statistics.median(latencies) * 1000:8.1f} ms   p95 {p95 * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Password KDF login throughput benchmark")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32, help="simultaneous login requests")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="hashing pool size")
+    args = parser.parse_args()
+    print(f"{args.logins} logins, {args.concurrency} concurrent requests, {args.workers} hashing workers\n")
+    for name, params in CONFIGS:
+        run_config(name, params, args.logins, args.concurrency, args.workers)
@@ -0,0 +1,51 @@
+# benchmarks/otp_dispatch_test.py
+# Queue many OTP emails through PasswordResetService against a local SMTP
+# stand-in and check every one is delivered over a few reused sessions.
+import argparse
+import os
+import sys
+import time
+from email import message_from_bytes
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smtp_stand_in import LocalSMTPServer
+from services.email_dispatcher import EmailDispatcher
+import services.password_reset_service as password_reset
+from services.password_reset_service import PasswordResetService
+
+
+def run_test(emails, workers):
+    server = LocalSMTPServer().start()
+    dispatcher = EmailDispatcher("127.0.0.1", server.port, False, "", "", 60, workers, emails, 3)
+    password_reset.email_dispatcher = dispatcher
+    password_reset.EmailConfig.EMAIL_FROM = "noreply@examsystem.test"
+
+    started = time.perf_counter()
+    tracking_ids = [
+        PasswordResetService.send_otp_email(f"student{n}@examsystem.test", PasswordResetService.generate_otp())
+        for n in range(emails)
+    ]
+    queued = time.perf_counter() - started
+    dispatcher.shutdown()
+    delivered = time.perf_counter() - started
+
+    statuses = [PasswordResetService.get_delivery_status(tracking_id) for tracking_id in tracking_ids]
+    print(f"Queued {emails} OTP emails in {queued * 1000:.1f} ms ({queued / emails * 1e6:.0f} µs per request)")
+    print(f"Delivered in {delivered:.2f}s ({emails / delivered:,.0f} emails/s) by {workers} workers")
+    print(f"SMTP connections opened: {server.connections}")
+    assert statuses.count("sent") == emails, f"undelivered: {emails - statuses.count('sent')}"
+    assert len(server.messages) == emails
+    parts = [part.get_payload(decode=True) for part in message_from_bytes(server.messages[0]).walk()
+             if not part.is_multipart()]
+    assert any(b"Your One-Time Password" in part for part in parts)
+    print("✓ Every OTP email delivered")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OTP email dispatch test against a local SMTP stand-in")
+    parser.add_argument("--emails", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    run_test(args.emails, args.workers)
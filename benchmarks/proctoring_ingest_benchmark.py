@@ -0,0 +1,98 @@
+# benchmarks/proctoring_ingest_benchmark.py
+# Ingest throughput of the proctoring event store: --threads client threads
+# post JSON batches of --batch events for --attempts attempts (decode,
+# validate, fold into summaries, buffer) while the writer thread appends
+# segment blocks, for --duration seconds. Then times a summary read and a
+# full raw scan of one attempt for comparison.
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.proctoring_events import EventStore, EVENT_TYPES
+
+
+def run(attempts, batch, duration, threads, flush_interval, exams, directory):
+    store = EventStore(directory, flush_interval, max_batch=max(batch, 500), max_buffered=10 ** 7,
+                       idle_ttl=3600, max_skew=24 * 3600)
+    ids = [(index % exams + 1, uuid.uuid4().hex) for index in range(attempts)]
+    stop = time.monotonic() + duration
+    counts = []
+    lock = threading.Lock()
+
+    def client(group):
+        rng = random.Random()
+        sent = 0
+        # Like a browser tab, each attempt's batches follow on from its previous one
+        next_base = {}
+        while time.monotonic() < stop:
+            exam_id, attempt_id = rng.choice(group)
+            offsets = sorted(rng.randrange(5000) for _ in range(batch))
+            base = max(int(time.time() * 1000), next_base.get(attempt_id, 0))
+            next_base[attempt_id] = base + offsets[-1]
+            body = json.dumps({'batch': uuid.uuid4().hex, 'base': base,
+                               'events': [[rng.randrange(len(EVENT_TYPES)), offset] for offset in offsets]})
+            payload = json.loads(body)
+            sent += store.append(exam_id, attempt_id, payload['batch'], payload['base'], payload['events'])
+        with lock:
+            counts.append(sent)
+
+    workers = [threading.Thread(target=client, args=(ids[i::threads],)) for i in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    ingest = time.perf_counter() - started
+    flush_started = time.perf_counter()
+    store.shutdown()
+    drain = time.perf_counter() - flush_started
+
+    stats = store.stats()
+    total = sum(counts)
+    print(f"Attempts:      {attempts} over {exams} exams, {batch} events per batch, {threads} client threads")
+    print(f"Ingested:      {total:,} events in {ingest:.1f}s = {total / ingest:,.0f} events/s "
+          f"({stats['batches'] / ingest:,.0f} batches/s)")
+    print(f"Written:       {stats['written']:,} events in {stats['blocks']:,} blocks, "
+          f"final drain {drain * 1000:.0f} ms, errors {stats['errors']}")
+    on_disk = sum(os.path.getsize(os.path.join(root, name))
+                  for root, _, names in os.walk(directory) for name in names if name.endswith('.seg'))
+    print(f"Segment bytes: {on_disk:,} ({on_disk / max(total, 1):.2f} bytes/event)")
+
+    exam_id, attempt_id = max(ids, key=lambda key: os.path.getsize(store._path(*key, '.seg'))
+                              if os.path.exists(store._path(*key, '.seg')) else 0)
+    reader = EventStore(directory, flush_interval, 500, 10 ** 7, 3600, 24 * 3600)
+    started = time.perf_counter()
+    summary = reader.summary(exam_id, attempt_id)
+    summary_time = time.perf_counter() - started
+    started = time.perf_counter()
+    scanned = sum(1 for _ in reader.events(exam_id, attempt_id))
+    scan_time = time.perf_counter() - started
+    print(f"Summary read:  {summary_time * 1000:.2f} ms for {summary['events']} events "
+          f"(raw scan {scan_time * 1000:.2f} ms over {scanned})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Proctoring event ingestion benchmark")
+    parser.add_argument("--attempts", type=int, default=10000)
+    parser.add_argument("--exams", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--flush-interval", type=float, default=1.0)
+    parser.add_argument("--dir", help="store directory (default: a temporary one, removed afterwards)")
+    args = parser.parse_args()
+    directory = args.dir or tempfile.mkdtemp(prefix='proctoring-bench-')
+    try:
+        run(args.attempts, args.batch, args.duration, args.threads, args.flush_interval, args.exams, directory)
+    finally:
+        if not args.dir:
+            shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,78 @@
+# benchmarks/ranking_benchmark.py
+# Live ranking over --submissions synthetic scores for one exam: each
+# submission is recorded and then its rank and percentile are read back, as
+# the result page does. Compares the Fenwick-tree ScoreRanking with
+# re-sorting every score per result page (what ORDER BY would do) on a
+# sample, and times the startup rebuild from grouped score counts.
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ranking import ScoreRanking
+
+
+def percentile_of(latencies, share):
+    return latencies[min(int(len(latencies) * share), len(latencies) - 1)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Live ranking benchmark")
+    parser.add_argument("--submissions", type=int, default=100000)
+    parser.add_argument("--total", type=int, default=200, help="maximum score")
+    parser.add_argument("--negative", type=int, default=50, help="largest possible penalty")
+    parser.add_argument("--sort-sample", type=int, default=200, help="result pages timed with a full re-sort")
+    parser.add_argument("--seed", type=int, default=24)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    scores = [min(max(int(rng.gauss(args.total * 0.55, args.total * 0.18)), -args.negative), args.total)
+              for _ in range(args.submissions)]
+
+    ranking = ScoreRanking()
+    latencies = []
+    started = time.perf_counter()
+    for score in scores:
+        began = time.perf_counter()
+        ranking.add(score)
+        ranking.rank(score)
+        ranking.percentile(score)
+        latencies.append(time.perf_counter() - began)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    print(f"{args.submissions:,} submissions, scores {-args.negative}..{args.total}")
+    print(f"Fenwick insert + rank + percentile: {args.submissions / elapsed:,.0f}/s   "
+          f"p50 {statistics.median(latencies) * 1e6:.1f} us   p99 {percentile_of(latencies, 0.99) * 1e6:.1f} us")
+
+    # Result pages late in the exam, when every earlier score has to be sorted
+    seen = scores[:-args.sort_sample]
+    sort_latencies = []
+    for score in scores[-args.sort_sample:]:
+        seen.append(score)
+        began = time.perf_counter()
+        ordered = sorted(seen, reverse=True)
+        rank = ordered.index(score) + 1
+        below = sum(1 for other in seen if other < score)
+        sort_latencies.append(time.perf_counter() - began)
+    sort_latencies.sort()
+    print(f"Re-sort per result page (n~{len(seen):,}):    "
+          f"p50 {statistics.median(sort_latencies) * 1e3:.2f} ms   p99 {percentile_of(sort_latencies, 0.99) * 1e3:.2f} ms")
+
+    last = scores[-1]
+    assert ranking.rank(last) == rank
+    assert ranking.count_below(last) == below
+
+    counts = Counter(scores)
+    started = time.perf_counter()
+    rebuilt = ScoreRanking()
+    for score, count in counts.items():
+        rebuilt.add(score, count)
+    rebuild = time.perf_counter() - started
+    assert all(rebuilt.rank(score) == ranking.rank(score) for score in counts)
+    print(f"Startup rebuild from {len(counts)} grouped score counts: {rebuild * 1e3:.2f} ms   "
+          f"median {rebuilt.kth((rebuilt.n + 1) // 2)}")
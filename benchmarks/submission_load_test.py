@@ -0,0 +1,71 @@
+# benchmarks/submission_load_test.py
+# Submit many answer sheets concurrently through the write-behind
+# SubmissionWriter against the local database (python init_db.py first),
+# then check that every one of them was stored.
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DatabaseConfig
+from services.submission_writer import SubmissionWriter
+
+
+def make_row(run_tag, n):
+    answers = {str(qid): random.choice("ABCD") for qid in range(1, 51)}
+    return (
+        f"{run_tag}{n:08x}"[:32], 999999, None, json.dumps(answers),
+        random.randint(0, 50), 50, datetime.now()
+    )
+
+
+def count_stored(run_tag):
+    with DatabaseConfig.connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute("SELECT COUNT(*) FROM submissions WHERE submission_uuid LIKE %s", (run_tag + "%",))
+        (count,) = cursor.fetchone()
+        cursor.execute("DELETE FROM submissions WHERE submission_uuid LIKE %s", (run_tag + "%",))
+        connection.commit()
+        cursor.close()
+    return count
+
+
+def run_load_test(submissions, concurrency, batch_size, flush_interval, max_queue):
+    writer = SubmissionWriter(batch_size, flush_interval, max_queue, 30, "submission_spool.jsonl")
+    run_tag = uuid.uuid4().hex[:24]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda n: writer.submit(make_row(run_tag, n)), range(submissions)))
+    enqueued = time.perf_counter() - started
+    writer.shutdown()
+    drained = time.perf_counter() - started
+
+    stats = writer.stats()
+    stored = count_stored(run_tag)
+    print(f"Submissions:     {submissions} from {concurrency} threads")
+    print(f"Enqueued in:     {enqueued:.2f}s ({submissions / enqueued:,.0f}/s)")
+    print(f"Drained in:      {drained:.2f}s ({submissions / drained:,.0f}/s)")
+    print(f"Batches:         {stats['batches']} (avg {stats['written'] / max(stats['batches'], 1):.0f} rows)")
+    print(f"Retries/spooled: {stats['retries']}/{stats['spooled']}")
+    print(f"Stored:          {stored}")
+    assert stored + stats['spooled'] == submissions, "submissions were lost"
+    print("✓ No submission lost")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent submission load test")
+    parser.add_argument("--submissions", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--flush-interval", type=float, default=0.2)
+    parser.add_argument("--max-queue", type=int, default=2000)
+    args = parser.parse_args()
+    run_load_test(args.submissions, args.concurrency, args.batch_size, args.flush_interval, args.max_queue)
@@ -0,0 +1,434 @@
+# benchmarks/suite.py
+# End-to-end benchmark suite: seeds a SQLite stand-in for MySQL with
+# realistic volumes, drives the Flask routes through the test client and
+# the user/password-reset services directly, and reports latency
+# percentiles and throughput per scenario. Results are written as JSON and
+# compared with a stored baseline; the exit status is 1 if any scenario got
+# slower than the baseline by more than --threshold.
+#   python benchmarks/suite.py                       run and compare with benchmarks/baseline.json
+#   python benchmarks/suite.py --update-baseline     run and store the results as the new baseline
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from email import message_from_bytes
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, ROOT)
+
+# Everything the app writes to disk goes to a scratch directory
+SCRATCH = tempfile.mkdtemp(prefix='exam-bench-')
+os.environ.setdefault('LEDGER_DIR', os.path.join(SCRATCH, 'ledger'))
+os.environ.setdefault('PROCTORING_DIR', os.path.join(SCRATCH, 'proctoring'))
+os.environ.setdefault('SUBMISSION_SPOOL_FILE', os.path.join(SCRATCH, 'submission_spool.jsonl'))
+
+import db_stand_in
+from smtp_stand_in import LocalSMTPServer
+
+PASSWORD = 'Bench-password-1'
+OPTIONS = ['Option A', 'Option B', 'Option C', 'Option D']
+OTP_PATTERN = re.compile(rb'Your One-Time Password \(OTP\) is: (\d+)')
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, 'baseline.json')
+# Scenarios bound by the password KDF run --slow-iterations times
+SLOW_SCENARIOS = {'authenticate_user', 'create_user', 'password_reset'}
+
+
+# Seeding
+def question_rows(exam_id, count, rng):
+    rows = []
+    for number in range(count):
+        kind = rng.random()
+        if kind < 0.8:
+            options = OPTIONS
+            correct = [rng.choice(OPTIONS)]
+            q_type = 'mcq'
+        elif kind < 0.9:
+            options = ['True', 'False']
+            correct = [rng.choice(options)]
+            q_type = 'truefalse'
+        else:
+            options = []
+            correct = [f"answer {number}"]
+            q_type = 'text'
+        rows.append((exam_id, f"Question {number + 1} of exam {exam_id}: " + "lorem ipsum " * 8, q_type,
+                     rng.randint(1, 4), rng.randint(0, 1), rng.choice(['easy', 'medium', 'hard']),
+                     json.dumps(options), json.dumps(correct)))
+    return rows
+
+
+def seed(path, users, exams, questions, submissions, password_hash, seed_value):
+    """Create and fill a stand-in database; returns nothing, the file is the result"""
+    rng = random.Random(seed_value)
+    db_stand_in.create(path)
+    connection = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES)
+    now = datetime.now().replace(microsecond=0)
+
+    connection.executemany(
+        "INSERT INTO users (name, email, password, role, branch, enrollment_number, computer_code, "
+        "digital_id_hash, is_active) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1)",
+        ((f"User {n}", f"user{n}@bench.test", password_hash,
+          'Student' if n % 50 else 'Examiner', rng.choice(['CSE', 'ECE', 'ME']), f"EN{n:07d}",
+          f"PC{n % 500:03d}", hashlib.sha256(f"bench-{n}".encode()).hexdigest())
+         for n in range(users))
+    )
+
+    for exam_id in range(1, exams + 1):
+        # A third each of past, live and upcoming exams
+        phase = exam_id % 3
+        if phase == 0:
+            start = now - timedelta(days=rng.randint(2, 300))
+            end = start + timedelta(hours=3)
+        elif phase == 1:
+            start = now - timedelta(hours=rng.randint(1, 48))
+            end = now + timedelta(days=rng.randint(30, 60))
+        else:
+            start = now + timedelta(days=rng.randint(1, 300))
+            end = start + timedelta(hours=3)
+        connection.execute("INSERT INTO exams (id, title, start_time, end_time, duration) VALUES (?, ?, ?, ?, ?)",
+                           (exam_id, f"Benchmark exam {exam_id}", start, end, 180))
+        connection.executemany(
+            "INSERT INTO questions (exam_id, q_text, q_type, marks, negative, difficulty, options, correct) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", question_rows(exam_id, questions, rng))
+
+    question_ids = {}
+    for exam_id, question_id in connection.execute("SELECT exam_id, id FROM questions"):
+        question_ids.setdefault(exam_id, []).append(question_id)
+    rows = []
+    for _ in range(submissions):
+        exam_id = rng.randrange(1, exams + 1)
+        answers = {str(qid): rng.choice(OPTIONS) for qid in question_ids.get(exam_id, []) if rng.random() < 0.9}
+        rows.append((uuid.uuid4().hex, exam_id, hashlib.sha256(f"bench-{rng.randrange(users)}".encode()).hexdigest(),
+                     json.dumps(answers), rng.randint(0, questions * 2), questions * 2,
+                     now - timedelta(minutes=rng.randint(1, 100000))))
+    connection.executemany(
+        "INSERT INTO submissions (submission_uuid, exam_id, digital_id_hash, answers, score, total, submitted_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    connection.commit()
+    connection.close()
+
+
+# Measurement
+def timed(call):
+    started = time.perf_counter()
+    result = call()
+    return result, time.perf_counter() - started
+
+
+def summarize(latencies, errors):
+    """Percentiles in ms; throughput is sequential operations per second of measured time"""
+    ordered = sorted(latencies)
+    elapsed = sum(ordered)
+
+    def pick(share):
+        return ordered[min(int(len(ordered) * share), len(ordered) - 1)] * 1000 if ordered else None
+
+    return {
+        'iterations': len(latencies),
+        'errors': errors,
+        'throughput_per_s': len(latencies) / elapsed if elapsed else None,
+        'mean_ms': statistics.fmean(ordered) * 1000 if ordered else None,
+        'p50_ms': pick(0.50),
+        'p90_ms': pick(0.90),
+        'p99_ms': pick(0.99),
+        'max_ms': ordered[-1] * 1000 if ordered else None,
+    }
+
+
+class Suite:
+    def __init__(self, app_module, volumes, smtp, rng):
+        self.app_module = app_module
+        self.app = app_module.app
+        self.volumes = volumes
+        self.smtp = smtp
+        self.rng = rng
+        self.live_exams = [exam_id for exam_id in range(1, volumes['exams'] + 1) if exam_id % 3 != 0]
+        self.created_users = 0
+        # Password resets change passwords, so they use their own slice of users
+        self.reset_users = max(volumes['users'] // 10, 1)
+
+        from services.user_service import UserService
+        from services.password_reset_service import PasswordResetService
+        from models.user import User
+        self.UserService = UserService
+        self.PasswordResetService = PasswordResetService
+        self.User = User
+
+    def client(self):
+        client = self.app.test_client()
+        with client.session_transaction() as session:
+            session['digital_id_hash'] = hashlib.sha256(uuid.uuid4().bytes).hexdigest()
+        return client
+
+    def exam_form(self, title, questions, rng):
+        start = datetime.now() + timedelta(days=rng.randint(1, 30))
+        form = {'title': title, 'start_time': start.strftime('%Y-%m-%dT%H:%M'),
+                'end_time': (start + timedelta(hours=3)).strftime('%Y-%m-%dT%H:%M')}
+        for index, q in enumerate(questions, start=1):
+            if q.get('id'):
+                form[f'q{index}_id'] = str(q['id'])
+            form[f'q{index}_text'] = q['q_text']
+            form[f'q{index}_type'] = q['q_type']
+            form[f'q{index}_marks'] = str(q['marks'])
+            form[f'q{index}_negative'] = str(q['negative'])
+            form[f'q{index}_difficulty'] = q['difficulty'] or ''
+            if q['q_type'] == 'mcq':
+                for number, option in enumerate(q['options'], start=1):
+                    form[f'q{index}_option{number}'] = option
+                    if option in q['correct']:
+                        form[f'q{index}_correct{number}'] = 'on'
+            elif q['q_type'] == 'truefalse':
+                form[f'q{index}_truefalse'] = q['correct'][0] if q['correct'] else 'True'
+        return form
+
+    # Scenarios: each returns (ok, seconds spent in the measured part)
+    def home(self):
+        path = self.rng.choice(['/', '/?status=live', '/?status=upcoming', '/?status=past'])
+        client = self.app.test_client()
+        response, elapsed = timed(lambda: client.get(path))
+        return response.status_code == 200, elapsed
+
+    def take_exam_get(self):
+        client = self.client()
+        exam_id = self.rng.choice(self.live_exams)
+        response, elapsed = timed(lambda: client.get(f'/take_exam/{exam_id}?stream=0'))
+        return response.status_code == 200, elapsed
+
+    def take_exam_post(self):
+        client = self.client()
+        exam_id = self.rng.choice(self.live_exams)
+        if client.get(f'/take_exam/{exam_id}?stream=0').status_code != 200:
+            return False, 0.0
+        with self.app.app_context():
+            _, questions, _ = self.app_module.get_exam(exam_id)
+        form = {}
+        for q in questions:
+            if self.rng.random() < 0.9:
+                form[f'question_{q["id"]}'] = self.rng.choice(q['options'] or q['correct'] or ['?'])
+        response, elapsed = timed(lambda: client.post(f'/take_exam/{exam_id}', data=form))
+        return response.status_code == 200, elapsed
+
+    def create_exam(self):
+        rng = self.rng
+        questions = [dict(id=None, q_text=row[1], q_type=row[2], marks=row[3], negative=row[4], difficulty=row[5],
+                          options=json.loads(row[6]), correct=json.loads(row[7]))
+                     for row in question_rows(0, self.volumes['questions'], rng)]
+        form = self.exam_form(f"Created exam {uuid.uuid4().hex[:8]}", questions, rng)
+        client = self.app.test_client()
+        response, elapsed = timed(lambda: client.post('/create_exam', data=form))
+        return response.status_code == 302 and response.location.endswith('/'), elapsed
+
+    def edit_exam(self):
+        exam_id = self.rng.choice(self.live_exams)
+        with self.app.app_context():
+            cached = self.app_module.get_exam(exam_id)
+        if not cached:
+            return False, 0.0
+        exam, questions, _ = cached
+        questions = [dict(q) for q in questions]
+        changed = self.rng.randrange(len(questions))
+        questions[changed]['q_text'] = f"Edited question {uuid.uuid4().hex[:8]}"
+        form = self.exam_form(exam['title'], questions, self.rng)
+        client = self.app.test_client()
+        response, elapsed = timed(lambda: client.post(f'/edit_exam/{exam_id}', data=form))
+        return response.status_code == 302 and response.location.endswith('/'), elapsed
+
+    def authenticate_user(self):
+        n = self.rng.randrange(self.reset_users, self.volumes['users'])
+        user, elapsed = timed(lambda: self.UserService.authenticate_user(f"user{n}@bench.test", PASSWORD))
+        return isinstance(user, self.User), elapsed
+
+    def create_user(self):
+        self.created_users += 1
+        data = {'name': 'New user', 'email': f"new{self.created_users}-{uuid.uuid4().hex[:8]}@bench.test",
+                'password': PASSWORD, 'role': 'Student', 'branch': 'CSE',
+                'enrollment_number': f"NEW{self.created_users:07d}"}
+        user, elapsed = timed(lambda: self.UserService.create_user(data))
+        return isinstance(user, self.User), elapsed
+
+    def password_reset(self):
+        """Request an OTP, then verify it and set a new password; mail delivery is not timed"""
+        email = f"user{self.rng.randrange(self.reset_users)}@bench.test"
+        result, requested = timed(lambda: self.PasswordResetService.create_reset_token(email))
+        if not result.get('success'):
+            return False, requested
+        otp = self.wait_for_otp(email)
+        if otp is None:
+            return False, requested
+
+        def complete():
+            return (self.PasswordResetService.verify_reset_token(email, otp)
+                    and self.PasswordResetService.reset_password(email, PASSWORD))
+
+        ok, completed = timed(complete)
+        return bool(ok), requested + completed
+
+    def wait_for_otp(self, email, timeout=10):
+        deadline = time.monotonic() + timeout
+        recipient = f"To: {email}".encode()
+        while time.monotonic() < deadline:
+            with self.smtp.lock:
+                for index, raw in enumerate(self.smtp.messages):
+                    if recipient in raw:
+                        del self.smtp.messages[index]
+                        for part in message_from_bytes(raw).walk():
+                            payload = None if part.is_multipart() else part.get_payload(decode=True)
+                            match = OTP_PATTERN.search(payload or b'')
+                            if match:
+                                return match.group(1).decode()
+            time.sleep(0.002)
+        return None
+
+    SCENARIOS = ('home', 'take_exam_get', 'take_exam_post', 'create_exam', 'edit_exam',
+                 'authenticate_user', 'create_user', 'password_reset')
+
+    def run(self, name, iterations, warmup):
+        scenario = getattr(self, name)
+        for _ in range(warmup):
+            scenario()
+        latencies = []
+        errors = 0
+        for _ in range(iterations):
+            ok, elapsed = scenario()
+            latencies.append(elapsed)
+            errors += 0 if ok else 1
+        return summarize(latencies, errors)
+
+
+# Baseline comparison
+def compare(results, baseline, metric, threshold):
+    """Rows of (scenario, baseline, current, change, verdict); verdict is 'REGRESSION' past the threshold"""
+    rows = []
+    for name, current in results['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name, {}).get(metric)
+        now = current.get(metric)
+        if before is None or now is None:
+            rows.append((name, before, now, None, 'new'))
+            continue
+        change = now / before - 1 if before else 0.0
+        verdict = 'REGRESSION' if change > threshold else ('improved' if change < -threshold else 'ok')
+        rows.append((name, before, now, change, verdict))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite for the exam app routes and services")
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--exams", type=int, default=1000)
+    parser.add_argument("--questions", type=int, default=200, help="questions per exam")
+    parser.add_argument("--submissions", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--slow-iterations", type=int, default=30,
+                        help="iterations for scenarios dominated by password hashing")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--only", nargs='+', choices=Suite.SCENARIOS, help="run only these scenarios")
+    parser.add_argument("--seed", type=int, default=25)
+    parser.add_argument("--db", help="seeded database to reuse (default: cached in the temp directory)")
+    parser.add_argument("--reseed", action="store_true", help="rebuild the seeded database")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--metric", default="p50_ms", choices=["mean_ms", "p50_ms", "p90_ms", "p99_ms"])
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown against the baseline, as a fraction (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    volumes = {'users': args.users, 'exams': args.exams, 'questions': args.questions,
+               'submissions': args.submissions}
+    from services.password_hasher import password_hasher
+
+    seeded = args.db or os.path.join(tempfile.gettempdir(), "exam-bench-{users}u-{exams}e-{questions}q-"
+                                     "{submissions}s.db".format(**volumes))
+    if args.reseed or not os.path.exists(seeded):
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(seeded + suffix):
+                os.remove(seeded + suffix)
+        print(f"Seeding {seeded} ...")
+        started = time.perf_counter()
+        seed(seeded, args.users, args.exams, args.questions, args.submissions,
+             password_hasher.hash(PASSWORD), args.seed)
+        print(f"Seeded in {time.perf_counter() - started:.1f}s")
+    # Scenarios write, so each run works on a fresh copy
+    working = os.path.join(SCRATCH, 'bench.db')
+    shutil.copyfile(seeded, working)
+    db_stand_in.install(working)
+
+    smtp = LocalSMTPServer().start()
+    import services.password_reset_service as password_reset
+    from services.email_dispatcher import EmailDispatcher
+    password_reset.email_dispatcher = EmailDispatcher("127.0.0.1", smtp.port, False, "", "", 60, 2, 10000, 3)
+    password_reset.EmailConfig.EMAIL_FROM = "noreply@examsystem.test"
+
+    import app as app_module
+    if not os.path.isdir(os.path.join(ROOT, 'templates')):
+        app_module.app.template_folder = ROOT
+    app_module.app.config['TESTING'] = True
+
+    suite = Suite(app_module, volumes, smtp, random.Random(args.seed))
+    results = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'volumes': volumes,
+            'metric': args.metric,
+        },
+        'scenarios': {},
+    }
+    for name in args.only or Suite.SCENARIOS:
+        iterations = args.slow_iterations if name in SLOW_SCENARIOS else args.iterations
+        # The app and services log to stdout; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats = suite.run(name, iterations, args.warmup)
+        results['scenarios'][name] = stats
+        print(f"{name:<18} p50 {stats['p50_ms']:9.2f} ms   p90 {stats['p90_ms']:9.2f} ms   "
+              f"p99 {stats['p99_ms']:9.2f} ms   {stats['throughput_per_s']:9.1f}/s   errors {stats['errors']}")
+
+    with open(args.output, 'w', encoding='utf-8') as output:
+        json.dump(results, output, indent=2)
+    print(f"Results written to {args.output}")
+
+    regressions = 0
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get('meta', {}).get('volumes') != volumes:
+            print("⚠️ Baseline was recorded with different volumes; comparing anyway")
+        print(f"\nAgainst {args.baseline} ({args.metric}, threshold {args.threshold:.0%}):")
+        for name, before, now, change, verdict in compare(results, baseline, args.metric, args.threshold):
+            if change is None:
+                print(f"{name:<18} {'-':>10}   {now if now is not None else '-':>10}   {verdict}")
+                continue
+            print(f"{name:<18} {before:8.2f} ms → {now:8.2f} ms   {change:+7.1%}   {verdict}")
+            regressions += verdict == 'REGRESSION'
+    else:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to store one")
+
+    failed = sum(stats['errors'] for stats in results['scenarios'].values())
+    shutil.rmtree(SCRATCH, ignore_errors=True)
+    if regressions or failed:
+        print(f"✗ {regressions} regression(s), {failed} failed operation(s)")
+        sys.exit(1)
+    print("✓ No regressions")
+
+
+if __name__ == "__main__":
+    main()
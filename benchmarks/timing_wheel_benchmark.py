@@ -0,0 +1,69 @@
+# benchmarks/timing_wheel_benchmark.py
+# Per-tick cost of tracking attempt deadlines: TimingWheel against a scan of
+# every live attempt, with --attempts live attempts spread over --spread
+# seconds, plus a "mass deadline" run where all of them end in the same tick.
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.timing_wheel import TimingWheel
+
+
+class ScanDeadlines:
+    """What a periodic sweep does: look at every live attempt on every tick"""
+
+    def __init__(self):
+        self._deadlines = {}
+
+    def schedule(self, key, deadline):
+        self._deadlines[key] = deadline
+
+    def advance(self, now):
+        due = [key for key, deadline in self._deadlines.items() if deadline <= now]
+        for key in due:
+            del self._deadlines[key]
+        return due
+
+
+def run(label, timers, deadlines, start, ticks):
+    started = time.perf_counter()
+    for key, deadline in deadlines.items():
+        timers.schedule(key, deadline)
+    schedule_cost = time.perf_counter() - started
+
+    costs = []
+    fired = 0
+    for tick in range(1, ticks + 1):
+        started = time.perf_counter()
+        fired += len(timers.advance(start + tick))
+        costs.append(time.perf_counter() - started)
+    costs.sort()
+    print(f"{label:<22} schedule {schedule_cost / len(deadlines) * 1e6:6.2f} us/attempt   "
+          f"tick p50 {statistics.median(costs) * 1e6:9.1f} us   p99 {costs[int(len(costs) * 0.99) - 1] * 1e6:9.1f} us   "
+          f"max {costs[-1] * 1e3:7.2f} ms   fired {fired}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Attempt deadline tick cost")
+    parser.add_argument("--attempts", type=int, default=50000)
+    parser.add_argument("--spread", type=int, default=3 * 3600, help="seconds over which deadlines fall")
+    parser.add_argument("--ticks", type=int, default=600, help="one-second ticks to measure")
+    parser.add_argument("--seed", type=int, default=21)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    start = 1_000_000.0
+    spread = {f"attempt-{i}": start + rng.uniform(1, args.spread) for i in range(args.attempts)}
+    mass = {f"attempt-{i}": start + args.ticks // 2 for i in range(args.attempts)}
+
+    print(f"{args.attempts} live attempts, deadlines spread over {args.spread}s, {args.ticks} ticks")
+    run("timing wheel", TimingWheel(start), spread, start, args.ticks)
+    run("scan", ScanDeadlines(), spread, start, args.ticks)
+    print(f"{args.attempts} live attempts, all due in tick {args.ticks // 2}")
+    run("timing wheel", TimingWheel(start), mass, start, args.ticks)
+    run("scan", ScanDeadlines(), mass, start, args.ticks)
@@ -0,0 +1,91 @@
+# benchmarks/user_listing_benchmark.py
+# Peak Python memory and wall time of listing every user: the old
+# fetchall() + User objects approach against the streaming keyset iterator.
+# Needs the configured MySQL database; --seed adds benchmark students first.
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DatabaseConfig
+from models.user import User
+from services.user_service import UserService
+
+SEED_DOMAIN = "@listing-bench.example"
+
+
+def seed(count):
+    with DatabaseConfig.connection() as connection:
+        cursor = connection.cursor()
+        rows = [
+            (f"Bench Student {i}", f"student{i}{SEED_DOMAIN}", "x" * 96, "student",
+             "CSE", f"LB{i:07d}", os.urandom(32).hex())
+            for i in range(count)
+        ]
+        for start in range(0, count, 1000):
+            cursor.executemany(
+                "INSERT INTO users (name, email, password, role, branch, enrollment_number, digital_id_hash) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                rows[start:start + 1000]
+            )
+            connection.commit()
+        cursor.close()
+
+
+def cleanup():
+    with DatabaseConfig.connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM users WHERE email LIKE %s", (f"%{SEED_DOMAIN}",))
+        connection.commit()
+        cursor.close()
+
+
+def legacy_listing(role):
+    """get_all_users as it was: every row as a dict, then a full User per row"""
+    with DatabaseConfig.connection() as connection:
+        cursor = connection.cursor(dictionary=True)
+        if role:
+            cursor.execute("SELECT * FROM users WHERE role = %s", (role,))
+        else:
+            cursor.execute("SELECT * FROM users")
+        users = [User(user) for user in cursor.fetchall()]
+        cursor.close()
+    return len(users)
+
+
+def streamed_listing(role):
+    count = 0
+    for _ in UserService.iter_users(role):
+        count += 1
+    return count
+
+
+def measure(label, listing, role):
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = listing(role)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<22} {count:>8} users   peak {peak / 1024 / 1024:8.2f} MiB   "
+          f"{elapsed:6.2f}s   {count / elapsed if elapsed else 0:10,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="User listing memory benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="insert this many benchmark students first")
+    parser.add_argument("--role", default=None)
+    parser.add_argument("--cleanup", action="store_true", help="delete the benchmark students afterwards")
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed)
+    try:
+        measure("fetchall + User", legacy_listing, args.role)
+        measure("iter_users (keyset)", streamed_listing, args.role)
+    finally:
+        if args.cleanup:
+            cleanup()
@@ -2,26 +2,272 @@
 import mysql.connector
 from mysql.connector import Error
 import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
 load_dotenv()
 
+
+class ConnectionPool:
+    """Bounded pool of MySQL connections with health checks on checkout"""
+
+    def __init__(self, size, timeout, connect):
+        self.size = size
+        self.timeout = timeout
+        self._connect = connect
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._stats = {
+            'checkouts': 0,
+            'created': 0,
+            'discarded': 0,
+            'timeouts': 0,
+            'wait_total': 0.0,
+            'wait_max': 0.0,
+        }
+
+    def acquire(self):
+        """Check out a live connection, waiting up to `timeout` seconds for a free slot"""
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats['timeouts'] += 1
+            raise Error(msg=f"Connection pool exhausted after {self.timeout}s")
+        waited = time.perf_counter() - started
+
+        try:
+            connection = self._checkout_idle()
+            if connection is None:
+                connection = self._connect()
+                with self._lock:
+                    self._stats['created'] += 1
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._stats['checkouts'] += 1
+            self._stats['wait_total'] += waited
+            self._stats['wait_max'] = max(self._stats['wait_max'], waited)
+        return connection
+
+    def _checkout_idle(self):
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return None
+            if self._is_healthy(connection):
+                return connection
+            self._discard(connection)
+
+    @staticmethod
+    def _is_healthy(connection):
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, connection):
+        with self._lock:
+            self._stats['discarded'] += 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def release(self, connection):
+        """Return a connection to the pool, dropping it if it is no longer usable"""
+        try:
+            if connection.is_connected():
+                # Never hand the next caller an open transaction
+                connection.rollback()
+                self._idle.put(connection)
+            else:
+                self._discard(connection)
+        except Exception:
+            self._discard(connection)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def stats(self):
+        """Checkout counts and wait times, for sizing the pool"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['size'] = self.size
+        stats['idle'] = self._idle.qsize()
+        checkouts = stats['checkouts']
+        stats['wait_avg'] = stats['wait_total'] / checkouts if checkouts else 0.0
+        return stats
+
+
 class DatabaseConfig:
     DB_HOST = os.getenv('DB_HOST', 'localhost')
     DB_USER = os.getenv('DB_USER', 'root')
     DB_PASSWORD = os.getenv('DB_PASSWORD', '')
     DB_NAME = os.getenv('DB_NAME', 'exam_proctoring_system')
-    
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 5))
+
+    _pool = None
+    _pool_pid = None
+    _pool_lock = threading.Lock()
+
+    @staticmethod
+    def _connect():
+        return mysql.connector.connect(
+            host=DatabaseConfig.DB_HOST,
+            user=DatabaseConfig.DB_USER,
+            password=DatabaseConfig.DB_PASSWORD,
+            database=DatabaseConfig.DB_NAME
+        )
+
     @staticmethod
     def get_connection():
         try:
-            connection = mysql.connector.connect(
-                host=DatabaseConfig.DB_HOST,
-                user=DatabaseConfig.DB_USER,
-                password=DatabaseConfig.DB_PASSWORD,
-                database=DatabaseConfig.DB_NAME
-            )
-            return connection
+            return DatabaseConfig._connect()
+        except Error as e:
+            print(f"Error connecting to MySQL: {e}")
+            return None
+
+    @staticmethod
+    def get_pool():
+        """Per-process connection pool, created on first use"""
+        pid = os.getpid()
+        if DatabaseConfig._pool is None or DatabaseConfig._pool_pid != pid:
+            with DatabaseConfig._pool_lock:
+                # Connections must not be shared with a forked parent
+                if DatabaseConfig._pool is None or DatabaseConfig._pool_pid != pid:
+                    DatabaseConfig._pool = ConnectionPool(
+                        DatabaseConfig.DB_POOL_SIZE,
+                        DatabaseConfig.DB_POOL_TIMEOUT,
+                        DatabaseConfig._connect
+                    )
+                    DatabaseConfig._pool_pid = pid
+        return DatabaseConfig._pool
+
+    @staticmethod
+    @contextmanager
+    def connection():
+        """Borrow a pooled connection; yields None if none could be obtained"""
+        pool = DatabaseConfig.get_pool()
+        try:
+            connection = pool.acquire()
         except Error as e:
             print(f"Error connecting to MySQL: {e}")
-            return None
\ No newline at end of file
+            yield None
+            return
+        try:
+            yield connection
+        finally:
+            pool.release(connection)
+
+    @staticmethod
+    def pool_stats():
+        return DatabaseConfig.get_pool().stats()
+
+
+class CacheConfig:
+    EXAM_CACHE_SIZE = int(os.getenv('EXAM_CACHE_SIZE', 256))
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 5000))
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 300))
+
+
+class SubmissionConfig:
+    SUBMISSION_BATCH_SIZE = int(os.getenv('SUBMISSION_BATCH_SIZE', 500))
+    SUBMISSION_FLUSH_INTERVAL = float(os.getenv('SUBMISSION_FLUSH_INTERVAL', 0.2))
+    SUBMISSION_QUEUE_SIZE = int(os.getenv('SUBMISSION_QUEUE_SIZE', 20000))
+    SUBMISSION_ENQUEUE_TIMEOUT = float(os.getenv('SUBMISSION_ENQUEUE_TIMEOUT', 5))
+    SUBMISSION_SPOOL_FILE = os.getenv('SUBMISSION_SPOOL_FILE', 'submission_spool.jsonl')
+    # Attempts before a batch failing with a permanent error is split to find the bad rows
+    SUBMISSION_MAX_ATTEMPTS = int(os.getenv('SUBMISSION_MAX_ATTEMPTS', 3))
+
+
+class LedgerConfig:
+    LEDGER_DIR = os.getenv('LEDGER_DIR', 'ledger')
+    LEDGER_BLOCK_SIZE = int(os.getenv('LEDGER_BLOCK_SIZE', 1024))
+    # Seconds a partial block may stay open before it is sealed anyway
+    LEDGER_SEAL_INTERVAL = float(os.getenv('LEDGER_SEAL_INTERVAL', 60))
+    LEDGER_AUDIT_WORKERS = int(os.getenv('LEDGER_AUDIT_WORKERS', os.cpu_count() or 1))
+    LEDGER_CHECKPOINT_KEY = os.getenv('LEDGER_CHECKPOINT_KEY', os.getenv('SECRET_KEY', ''))
+
+
+class SecurityConfig:
+    PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'scrypt')
+    PBKDF2_ITERATIONS = int(os.getenv('PBKDF2_ITERATIONS', 600000))
+    SCRYPT_N = int(os.getenv('SCRYPT_N', 2 ** 14))
+    SCRYPT_R = int(os.getenv('SCRYPT_R', 8))
+    SCRYPT_P = int(os.getenv('SCRYPT_P', 1))
+    HASH_WORKERS = int(os.getenv('HASH_WORKERS', os.cpu_count() or 1))
+    HASH_QUEUE_LIMIT = int(os.getenv('HASH_QUEUE_LIMIT', 256))
+    HASH_TIMEOUT = float(os.getenv('HASH_TIMEOUT', 30))
+
+
+class EmailConfig:
+    SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
+    SMTP_PORT = int(os.getenv('SMTP_PORT', 587))
+    SMTP_USE_TLS = os.getenv('SMTP_USE_TLS', '1') == '1'
+    SMTP_IDLE_TIMEOUT = float(os.getenv('SMTP_IDLE_TIMEOUT', 60))
+    EMAIL_USERNAME = os.getenv('EMAIL_USERNAME', '')
+    EMAIL_PASSWORD = os.getenv('EMAIL_PASSWORD', '')
+    EMAIL_FROM = os.getenv('EMAIL_FROM', os.getenv('EMAIL_USERNAME', ''))
+    EMAIL_WORKERS = int(os.getenv('EMAIL_WORKERS', 2))
+    EMAIL_QUEUE_SIZE = int(os.getenv('EMAIL_QUEUE_SIZE', 5000))
+    EMAIL_MAX_ATTEMPTS = int(os.getenv('EMAIL_MAX_ATTEMPTS', 3))
+
+
+class OTPConfig:
+    OTP_TTL_MINUTES = int(os.getenv('OTP_TTL_MINUTES', 10))
+    # Keep tokens in MySQL too, so they survive a restart; off by default since
+    # the app runs as one process and a lost OTP can simply be requested again
+    OTP_WRITE_THROUGH = os.getenv('OTP_WRITE_THROUGH', '0') == '1'
+    OTP_PURGE_BATCH = int(os.getenv('OTP_PURGE_BATCH', 1000))
+
+
+class LoginConfig:
+    # Upper bound on how stale users.last_login may be
+    LAST_LOGIN_FLUSH_INTERVAL = float(os.getenv('LAST_LOGIN_FLUSH_INTERVAL', 30))
+    LAST_LOGIN_BATCH_SIZE = int(os.getenv('LAST_LOGIN_BATCH_SIZE', 1000))
+
+
+class AutosaveConfig:
+    AUTOSAVE_FLUSH_INTERVAL = float(os.getenv('AUTOSAVE_FLUSH_INTERVAL', 2))
+    AUTOSAVE_BATCH_SIZE = int(os.getenv('AUTOSAVE_BATCH_SIZE', 500))
+    # Clean (already persisted) attempts idle this long are dropped from memory
+    AUTOSAVE_IDLE_TTL = int(os.getenv('AUTOSAVE_IDLE_TTL', 3600))
+    AUTOSAVE_MAX_ANSWER_LENGTH = int(os.getenv('AUTOSAVE_MAX_ANSWER_LENGTH', 10000))
+
+
+class AttemptConfig:
+    ATTEMPT_TICK = float(os.getenv('ATTEMPT_TICK', 1))
+    # Slack after the deadline for the final POST still in flight
+    ATTEMPT_GRACE = int(os.getenv('ATTEMPT_GRACE', 30))
+    ATTEMPT_RETRY = int(os.getenv('ATTEMPT_RETRY', 5))
+
+
+class ProctoringConfig:
+    PROCTORING_DIR = os.getenv('PROCTORING_DIR', 'proctoring')
+    PROCTORING_FLUSH_INTERVAL = float(os.getenv('PROCTORING_FLUSH_INTERVAL', 1))
+    PROCTORING_MAX_BATCH = int(os.getenv('PROCTORING_MAX_BATCH', 500))
+    # Events accepted but not yet written; beyond this the endpoint answers 503
+    PROCTORING_MAX_BUFFERED = int(os.getenv('PROCTORING_MAX_BUFFERED', 1000000))
+    PROCTORING_IDLE_TTL = int(os.getenv('PROCTORING_IDLE_TTL', 3600))
+    # How far client timestamps may be from the server clock
+    PROCTORING_MAX_SKEW = int(os.getenv('PROCTORING_MAX_SKEW', 24 * 3600))
@@ -0,0 +1,74 @@
+# conftest.py
+# Shared pytest fixtures. The services write their files under a scratch
+# directory, and the database is the SQLite stand-in for MySQL from
+# benchmarks/db_stand_in.py, so the tests run without a MySQL server.
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SCRATCH = tempfile.mkdtemp(prefix='exam-tests-')
+os.environ.setdefault('LEDGER_DIR', os.path.join(SCRATCH, 'ledger'))
+os.environ.setdefault('PROCTORING_DIR', os.path.join(SCRATCH, 'proctoring'))
+os.environ.setdefault('SUBMISSION_SPOOL_FILE', os.path.join(SCRATCH, 'submission_spool.jsonl'))
+# Cheap KDF parameters; the tests check behaviour, not hash strength
+os.environ.setdefault('SCRYPT_N', '16')
+os.environ.setdefault('HASH_WORKERS', '2')
+
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import db_stand_in
+
+
+@pytest.fixture
+def database(tmp_path):
+    """A fresh stand-in database with the current schema; yields a sqlite3 connection to it"""
+    path = str(tmp_path / 'exam.db')
+    db_stand_in.create(path)
+    db_stand_in.install(path)
+    connection = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES)
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def client(database):
+    """Flask test client for app.py on the stand-in database"""
+    import app as app_module
+    from services.exam_cache import exam_cache
+    app_module.app.template_folder = ROOT
+    app_module.app.config['TESTING'] = True
+    exam_cache.clear()
+    app_module.invalidate_exam_counts()
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    """Every statement other than a SELECT run through the stand-in by the test's own thread"""
+    statements = []
+    thread = threading.current_thread()
+    execute = db_stand_in.StandInCursor.execute
+    executemany = db_stand_in.StandInCursor.executemany
+
+    def record(sql):
+        # Background services (autosave flusher, submission writer) keep their own schedule
+        if threading.current_thread() is thread and not sql.lstrip().upper().startswith(('SELECT', 'EXPLAIN')):
+            statements.append(sql)
+
+    def recording_execute(self, sql, params=None):
+        record(sql)
+        return execute(self, sql, params)
+
+    def recording_executemany(self, sql, rows):
+        record(sql)
+        return executemany(self, sql, rows)
+
+    monkeypatch.setattr(db_stand_in.StandInCursor, 'execute', recording_execute)
+    monkeypatch.setattr(db_stand_in.StandInCursor, 'executemany', recording_executemany)
+    return statements
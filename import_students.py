@@ -0,0 +1,56 @@
+# import_students.py
+import argparse
+import csv
+import json
+import os
+from services.user_service import UserService
+
+
+def read_roster(path, fmt=None):
+    """Yield roster rows as dicts from a CSV (with header) or JSON Lines file"""
+    fmt = fmt or ('jsonl' if os.path.splitext(path)[1].lower() in ('.jsonl', '.ndjson') else 'csv')
+    with open(path, newline='', encoding='utf-8-sig') as roster:
+        if fmt == 'csv':
+            for row in csv.DictReader(roster):
+                yield {key.strip().lower(): value for key, value in row.items() if key}
+        else:
+            for line in roster:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # Keep row numbers aligned; the service reports it as invalid
+                        yield {}
+
+
+def write_errors(path, errors):
+    with open(path, 'w', newline='', encoding='utf-8') as report:
+        writer = csv.DictWriter(report, fieldnames=['row', 'email', 'error'])
+        writer.writeheader()
+        writer.writerows(errors)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-enroll students from a CSV or JSONL roster")
+    parser.add_argument("roster", help="columns: name, email, [password, role, branch, enrollment_number, "
+                                       "computer_code, wallet_address]")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None, help="default: from file extension")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="rows per transaction")
+    parser.add_argument("--role", default="Student", help="role for rows without one")
+    parser.add_argument("--errors", default=None, help="write per-row errors to this CSV file")
+    args = parser.parse_args()
+
+    report = UserService.bulk_import(read_roster(args.roster, args.format), args.chunk_size, args.role)
+
+    print(f"✅ Imported {report['imported']} of {report['rows']} rows "
+          f"in {report['elapsed']:.2f}s ({report['rows_per_second']:,.0f} rows/s)")
+    if report['errors']:
+        print(f"❌ {report['failed']} rows failed")
+        if args.errors:
+            write_errors(args.errors, report['errors'])
+            print(f"Error report written to {args.errors}")
+        else:
+            for error in report['errors'][:20]:
+                print(f"  row {error['row']}: {error['email']} - {error['error']}")
+            if len(report['errors']) > 20:
+                print(f"  ... {len(report['errors']) - 20} more (use --errors FILE for the full list)")
@@ -1,6 +1,8 @@
 # init_db.py
 from config import DatabaseConfig
+from migrations import migrate
 import mysql.connector
+from mysql.connector import Error
 
 def initialize_database():
     try:
@@ -19,26 +21,9 @@ def initialize_database():
         # Use the database
         cursor.execute(f"USE {DatabaseConfig.DB_NAME}")
         
-        # Create users table
-        users_table = """
-        CREATE TABLE IF NOT EXISTS users (
-            user_id INT PRIMARY KEY AUTO_INCREMENT,
-            name VARCHAR(100) NOT NULL,
-            email VARCHAR(100) UNIQUE NOT NULL,
-            password VARCHAR(255) NOT NULL,
-            role ENUM('Student', 'Examiner', 'Admin') NOT NULL,
-            branch VARCHAR(50),
-            enrollment_number VARCHAR(50),
-            computer_code VARCHAR(20),
-            wallet_address VARCHAR(42) UNIQUE,
-            digital_id_hash VARCHAR(64) UNIQUE,
-            is_active BOOLEAN DEFAULT TRUE,
-            last_login TIMESTAMP NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """
-        cursor.execute(users_table)
-        print("Users table created successfully")
+        # Create or upgrade every table through the versioned migrations
+        migrate(connection)
+        print("Schema is up to date")
         
         cursor.close()
         connection.close()
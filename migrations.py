@@ -0,0 +1,194 @@
+# migrations.py
+import argparse
+from config import DatabaseConfig
+from mysql.connector import Error, errorcode
+
+# Versioned schema changes, applied in order and recorded in schema_migrations.
+# Add new versions at the end; never edit one that has shipped. MySQL commits
+# DDL implicitly, so statements are written to be safe to re-run: a migration
+# interrupted half-way is simply applied again.
+MIGRATIONS = [
+    (1, "initial schema", [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INT PRIMARY KEY AUTO_INCREMENT,
+            name VARCHAR(100) NOT NULL,
+            email VARCHAR(100) UNIQUE NOT NULL,
+            password VARCHAR(255) NOT NULL,
+            role ENUM('Student', 'Examiner', 'Admin') NOT NULL,
+            branch VARCHAR(50),
+            enrollment_number VARCHAR(50),
+            computer_code VARCHAR(20),
+            wallet_address VARCHAR(42) UNIQUE,
+            digital_id_hash VARCHAR(64) UNIQUE,
+            is_active BOOLEAN DEFAULT TRUE,
+            last_login TIMESTAMP NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS exams (
+            id INT PRIMARY KEY AUTO_INCREMENT,
+            title VARCHAR(255) NOT NULL,
+            start_time DATETIME NOT NULL,
+            end_time DATETIME NOT NULL,
+            duration INT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS questions (
+            id INT PRIMARY KEY AUTO_INCREMENT,
+            exam_id INT NOT NULL,
+            q_text TEXT NOT NULL,
+            q_type VARCHAR(20) NOT NULL,
+            marks INT NOT NULL DEFAULT 1,
+            negative INT NOT NULL DEFAULT 0,
+            difficulty VARCHAR(20),
+            options JSON,
+            correct JSON
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS password_reset_tokens (
+            id INT PRIMARY KEY AUTO_INCREMENT,
+            email VARCHAR(100) NOT NULL,
+            token VARCHAR(10) NOT NULL,
+            expires_at DATETIME NOT NULL,
+            is_used BOOLEAN NOT NULL DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS submissions (
+            id INT PRIMARY KEY AUTO_INCREMENT,
+            submission_uuid CHAR(32) UNIQUE NOT NULL,
+            exam_id INT NOT NULL,
+            digital_id_hash VARCHAR(64),
+            answers JSON NOT NULL,
+            score INT NOT NULL,
+            total INT NOT NULL,
+            submitted_at TIMESTAMP NOT NULL
+        )
+        """,
+    ]),
+    (2, "hot-path indexes and question foreign key", [
+        "CREATE INDEX idx_questions_exam ON questions (exam_id)",
+        "CREATE INDEX idx_users_role ON users (role)",
+        "CREATE INDEX idx_users_enrollment ON users (enrollment_number)",
+        "CREATE INDEX idx_reset_tokens_lookup ON password_reset_tokens (email, token, expires_at)",
+        "CREATE INDEX idx_submissions_exam ON submissions (exam_id)",
+        # Questions left behind by exams deleted before the foreign key existed
+        "DELETE q FROM questions q LEFT JOIN exams e ON e.id = q.exam_id WHERE e.id IS NULL",
+        """
+        ALTER TABLE questions ADD CONSTRAINT fk_questions_exam
+            FOREIGN KEY (exam_id) REFERENCES exams (id) ON DELETE CASCADE
+        """,
+    ]),
+    (3, "exam listing keyset indexes", [
+        "CREATE INDEX idx_exams_start ON exams (start_time, id)",
+        "CREATE INDEX idx_exams_end ON exams (end_time, id)",
+    ]),
+    (4, "autosaved attempt snapshots", [
+        """
+        CREATE TABLE IF NOT EXISTS attempt_snapshots (
+            attempt_id CHAR(32) PRIMARY KEY,
+            exam_id INT NOT NULL,
+            digital_id_hash VARCHAR(64),
+            answers JSON NOT NULL,
+            seq INT NOT NULL DEFAULT 0,
+            sealed BOOLEAN NOT NULL DEFAULT FALSE,
+            updated_at DATETIME NOT NULL,
+            INDEX idx_attempt_snapshots_exam (exam_id)
+        )
+        """,
+    ]),
+    (5, "attempt start times and deadlines", [
+        "ALTER TABLE attempt_snapshots ADD COLUMN started_at DATETIME NULL",
+        "ALTER TABLE attempt_snapshots ADD COLUMN deadline DATETIME NULL",
+        "CREATE INDEX idx_attempt_snapshots_open ON attempt_snapshots (sealed, deadline)",
+    ]),
+    # Covers the per-exam score counts that rebuild the rankings at startup
+    (6, "submission score index", [
+        "CREATE INDEX idx_submissions_exam_score ON submissions (exam_id, score, submitted_at)",
+    ]),
+]
+
+# Raised when an index/constraint/column from a re-run (or hand-made) schema is already there
+ALREADY_APPLIED = {errorcode.ER_DUP_KEYNAME, errorcode.ER_FK_DUP_NAME, errorcode.ER_DUP_FIELDNAME}
+
+
+def ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_versions(cursor):
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def apply_migration(cursor, version, name, statements):
+    for statement in statements:
+        try:
+            cursor.execute(statement)
+        except Error as e:
+            if e.errno not in ALREADY_APPLIED:
+                raise
+    cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+
+
+def migrate(connection, target=None):
+    """Apply pending migrations up to `target` (default: latest); returns the versions applied"""
+    cursor = connection.cursor()
+    try:
+        ensure_migrations_table(cursor)
+        done = applied_versions(cursor)
+        applied = []
+        for version, name, statements in MIGRATIONS:
+            if version in done or (target is not None and version > target):
+                continue
+            print(f"Applying migration {version}: {name}")
+            apply_migration(cursor, version, name, statements)
+            connection.commit()
+            applied.append(version)
+        return applied
+    finally:
+        cursor.close()
+
+
+def status(connection):
+    cursor = connection.cursor()
+    try:
+        ensure_migrations_table(cursor)
+        done = applied_versions(cursor)
+    finally:
+        cursor.close()
+    for version, name, _ in MIGRATIONS:
+        print(f"{'✓' if version in done else ' '} {version:04d} {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply database schema migrations")
+    parser.add_argument("--target", type=int, default=None, help="stop after this version")
+    parser.add_argument("--status", action="store_true", help="list migrations and exit")
+    args = parser.parse_args()
+
+    connection = DatabaseConfig.get_connection()
+    if not connection:
+        raise SystemExit(1)
+    try:
+        if args.status:
+            status(connection)
+        else:
+            applied = migrate(connection, args.target)
+            print(f"✅ Applied {len(applied)} migration(s)" if applied else "✅ Schema is up to date")
+    except Error as e:
+        print(f"❌ Migration failed: {e}")
+        raise SystemExit(1)
+    finally:
+        connection.close()
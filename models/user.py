@@ -2,7 +2,28 @@
 from config import DatabaseConfig
 import hashlib
 import uuid
+from collections import namedtuple
 from datetime import datetime
+from functools import lru_cache
+
+USER_COLUMNS = (
+    'user_id', 'name', 'email', 'password', 'role', 'branch', 'enrollment_number',
+    'computer_code', 'wallet_address', 'digital_id_hash', 'is_active', 'last_login', 'created_at'
+)
+# Everything except the password hash, for listings
+PUBLIC_COLUMNS = tuple(column for column in USER_COLUMNS if column != 'password')
+
+
+@lru_cache(maxsize=None)
+def user_record_type(columns):
+    """Tuple-backed UserRecord class holding only `columns` (no per-row __dict__)"""
+    unknown = set(columns) - set(USER_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown user columns: {', '.join(sorted(unknown))}")
+    record = namedtuple('UserRecord', columns)
+    record.to_dict = lambda self: dict(zip(self._fields, self))
+    return record
+
 
 class User:
     def __init__(self, user_data):
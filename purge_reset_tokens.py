@@ -0,0 +1,16 @@
+# purge_reset_tokens.py
+import argparse
+import time
+from config import OTPConfig
+from services.otp_store import purge_expired_tokens
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete expired and used password reset tokens")
+    parser.add_argument("--batch-size", type=int, default=OTPConfig.OTP_PURGE_BATCH,
+                        help="rows deleted per transaction")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    removed = purge_expired_tokens(args.batch_size)
+    print(f"🧹 Removed {removed} reset tokens in {time.perf_counter() - started:.2f}s")
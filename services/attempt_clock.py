@@ -0,0 +1,213 @@
+# services/attempt_clock.py
+import atexit
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from config import AttemptConfig
+from services.autosave import autosave
+from services.timing_wheel import TimingWheel
+
+
+class AttemptClock:
+    """Server-side deadlines for exam attempts.
+
+    An attempt's start time and deadline (the exam duration, capped at the
+    exam's end_time) are stored with its autosave snapshot, so reloading the
+    page or restarting the server never resets the clock. Pending deadlines
+    sit in a TimingWheel; a background thread advances it every `tick`
+    seconds and passes each attempt that is `grace` seconds past its deadline
+    to the expiry handler, which submits its last saved answers. A handler
+    that returns False (e.g. the submission queue is full) is retried after
+    `retry` seconds.
+
+    On start the ticker thread also reloads the open attempts from storage,
+    retrying with exponential backoff (from `retry` up to
+    `max_restore_delay` seconds) until it succeeds; until then attempts from
+    before the restart are only tracked once a candidate submits them.
+
+    Deadlines are tracked per process: run one app process, or route every
+    attempt of an exam to the same one.
+    """
+
+    def __init__(self, tick, grace, retry, max_restore_delay=60):
+        self.tick = tick
+        self.grace = grace
+        self.retry = retry
+        self.max_restore_delay = max_restore_delay
+        self._wheel = TimingWheel(time.time(), tick)
+        self._attempts = {}
+        self._handler = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._restored = False
+        self._stats = {'started': 0, 'finished': 0, 'expired': 0, 'retries': 0, 'restored': 0,
+                       'restore_errors': 0, 'ticks': 0, 'last_tick_ms': 0.0, 'max_tick_ms': 0.0}
+
+    def on_expire(self, handler):
+        """handler(attempt_id, exam_id, digital_id) -> False to retry later"""
+        self._handler = handler
+
+    def start(self):
+        """Start the ticker for this process; it reloads open attempts until that succeeds once"""
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='attempt-clock', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        delay = self.retry
+        restore_at = 0.0
+        while True:
+            if not self._restored and time.monotonic() >= restore_at:
+                try:
+                    self.restore()
+                    self._restored = True
+                except Exception as e:
+                    print(f"Error restoring attempt deadlines (retrying in {delay:g}s): {e}")
+                    with self._lock:
+                        self._stats['restore_errors'] += 1
+                    restore_at = time.monotonic() + delay
+                    delay = min(delay * 2, self.max_restore_delay)
+            if self._stop.wait(self.tick):
+                return
+            self.advance()
+
+    def restore(self):
+        """Track every unsealed attempt with a deadline from storage; returns how many were added"""
+        restored = 0
+        for attempt_id, exam_id, digital_id, deadline in autosave.open_deadlines():
+            with self._lock:
+                if attempt_id in self._attempts:
+                    continue
+            self._track(attempt_id, exam_id, digital_id, deadline)
+            restored += 1
+        with self._lock:
+            self._stats['restored'] += restored
+        return restored
+
+    def _track(self, attempt_id, exam_id, digital_id, deadline):
+        with self._lock:
+            self._attempts[attempt_id] = (exam_id, digital_id, deadline)
+            self._wheel.schedule(attempt_id, deadline.timestamp() + self.grace)
+
+    def start_attempt(self, attempt_id, exam_id, digital_id, duration_seconds, end_time=None):
+        """Begin (or resume) an attempt; returns (deadline, sealed). deadline is None for untimed exams."""
+        self.start()
+        now = datetime.now()
+        deadline = now + timedelta(seconds=duration_seconds) if duration_seconds > 0 else None
+        if end_time is not None:
+            deadline = min(deadline, end_time) if deadline else end_time
+        _, deadline, sealed = autosave.begin(attempt_id, exam_id, digital_id, now, deadline)
+        if deadline is not None and not sealed:
+            with self._lock:
+                known = attempt_id in self._attempts
+                if not known:
+                    self._stats['started'] += 1
+            if not known:
+                self._track(attempt_id, exam_id, digital_id, deadline)
+        return deadline, sealed
+
+    def remaining(self, attempt_id):
+        """Seconds left before the attempt's deadline (negative once passed), or None if untracked"""
+        with self._lock:
+            entry = self._attempts.get(attempt_id)
+        if entry is None:
+            return None
+        return (entry[2] - datetime.now()).total_seconds()
+
+    def expired(self, attempt_id):
+        """True once the attempt is past its deadline and the grace period"""
+        remaining = self.remaining(attempt_id)
+        return remaining is not None and remaining < -self.grace
+
+    def check(self, attempt_id, exam_id, digital_id):
+        """Whether the attempt may still be submitted: 'open', 'expired' or 'unstarted'.
+
+        Attempts this process does not track (e.g. already submitted) are
+        looked up in storage; an overdue one found there is tracked again so
+        expire_now() can submit it.
+        """
+        if self.remaining(attempt_id) is None:
+            started_at, deadline, sealed = autosave.timing(attempt_id, exam_id, digital_id)
+            if started_at is None:
+                return 'unstarted'
+            if sealed or deadline is None:
+                return 'open'
+            with self._lock:
+                known = attempt_id in self._attempts
+            if not known:
+                self._track(attempt_id, exam_id, digital_id, deadline)
+        return 'expired' if self.expired(attempt_id) else 'open'
+
+    def finish(self, attempt_id):
+        """Stop tracking an attempt that was submitted normally"""
+        with self._lock:
+            if self._attempts.pop(attempt_id, None) is not None:
+                self._wheel.cancel(attempt_id)
+                self._stats['finished'] += 1
+
+    def advance(self, now=None):
+        """Expire every attempt that fell due; returns how many were handed to the handler"""
+        started = time.perf_counter()
+        with self._lock:
+            due = [(attempt_id, self._attempts.pop(attempt_id))
+                   for attempt_id in self._wheel.advance(time.time() if now is None else now)]
+            elapsed = (time.perf_counter() - started) * 1000
+            self._stats['ticks'] += 1
+            self._stats['last_tick_ms'] = elapsed
+            self._stats['max_tick_ms'] = max(self._stats['max_tick_ms'], elapsed)
+        for attempt_id, entry in due:
+            self._expire(attempt_id, entry)
+        return len(due)
+
+    def expire_now(self, attempt_id):
+        """Run the expiry handler for an overdue attempt right away instead of on the next tick"""
+        with self._lock:
+            entry = self._attempts.pop(attempt_id, None)
+            if entry is not None:
+                self._wheel.cancel(attempt_id)
+        if entry is not None:
+            self._expire(attempt_id, entry)
+
+    def _expire(self, attempt_id, entry):
+        exam_id, digital_id, deadline = entry
+        try:
+            done = self._handler is None or self._handler(attempt_id, exam_id, digital_id) is not False
+        except Exception as e:
+            print(f"Error expiring attempt {attempt_id}: {e}")
+            done = False
+        with self._lock:
+            if done:
+                self._stats['expired'] += 1
+                return
+            self._stats['retries'] += 1
+            if attempt_id not in self._attempts:
+                self._attempts[attempt_id] = entry
+                self._wheel.schedule(attempt_id, time.time() + self.retry)
+
+    def shutdown(self, timeout=None):
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid() and thread.is_alive():
+            thread.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['live'] = len(self._attempts)
+            stats['restore_pending'] = not self._restored
+        return stats
+
+
+attempt_clock = AttemptClock(
+    AttemptConfig.ATTEMPT_TICK,
+    AttemptConfig.ATTEMPT_GRACE,
+    AttemptConfig.ATTEMPT_RETRY,
+)
+atexit.register(attempt_clock.shutdown)
@@ -0,0 +1,299 @@
+# services/autosave.py
+import atexit
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from config import AutosaveConfig, DatabaseConfig
+
+UPSERT_SNAPSHOTS = (
+    "INSERT INTO attempt_snapshots "
+    "(attempt_id, exam_id, digital_id_hash, answers, seq, sealed, started_at, deadline, updated_at) "
+    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s) "
+    "ON DUPLICATE KEY UPDATE answers=VALUES(answers), seq=VALUES(seq), sealed=VALUES(sealed), "
+    "started_at=VALUES(started_at), deadline=VALUES(deadline), updated_at=VALUES(updated_at)"
+)
+
+
+class AttemptSealedError(Exception):
+    """Raised when answers arrive for an attempt that was already submitted"""
+
+
+class Attempt:
+    __slots__ = ('attempt_id', 'exam_id', 'digital_id', 'answers', 'seq', 'sealed', 'started_at', 'deadline',
+                 'submitting', 'dirty', 'touched')
+
+    def __init__(self, attempt_id, exam_id, digital_id, answers=None, seq=0, sealed=False,
+                 started_at=None, deadline=None):
+        self.attempt_id = attempt_id
+        self.exam_id = exam_id
+        self.digital_id = digital_id
+        self.answers = answers or {}
+        self.seq = seq
+        self.sealed = sealed
+        self.started_at = started_at
+        self.deadline = deadline
+        # Sealed in memory but not yet in storage: the submission is still being queued
+        self.submitting = False
+        self.dirty = False
+        self.touched = time.monotonic()
+
+
+class AutosaveBuffer:
+    """Merges answer deltas per attempt in memory and persists snapshots in batches.
+
+    save() only updates the attempt's answer dict; a background thread
+    upserts every changed attempt into attempt_snapshots each
+    `flush_interval` seconds, `batch_size` rows per statement and one
+    commit per flush. However often a candidate saves, each attempt costs
+    at most one row write per interval.
+    """
+
+    def __init__(self, flush_interval, batch_size, idle_ttl):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.idle_ttl = idle_ttl
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._stats = {'saves': 0, 'stale_deltas': 0, 'restored': 0, 'sealed': 0,
+                       'written': 0, 'flushes': 0, 'errors': 0}
+
+    def start(self):
+        """Start the flush thread for this process (threads do not survive fork)"""
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='autosave-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def _load(self, attempt_id):
+        with DatabaseConfig.connection() as connection:
+            if not connection:
+                raise RuntimeError("Database connection failed")
+            cursor = connection.cursor(dictionary=True)
+            try:
+                cursor.execute(
+                    "SELECT exam_id, digital_id_hash, answers, seq, sealed, started_at, deadline "
+                    "FROM attempt_snapshots "
+                    "WHERE attempt_id = %s", (attempt_id,)
+                )
+                return cursor.fetchone()
+            finally:
+                cursor.close()
+
+    def _get(self, attempt_id, exam_id, digital_id):
+        """The in-memory attempt, restored from its snapshot (or created) on a miss"""
+        with self._lock:
+            attempt = self._attempts.get(attempt_id)
+        if attempt is not None:
+            return attempt
+
+        row = self._load(attempt_id)
+        with self._lock:
+            attempt = self._attempts.get(attempt_id)
+            if attempt is None:
+                if row:
+                    answers = row['answers']
+                    attempt = Attempt(attempt_id, row['exam_id'], row['digital_id_hash'],
+                                      json.loads(answers) if isinstance(answers, (str, bytes)) else answers,
+                                      row['seq'], bool(row['sealed']), row['started_at'], row['deadline'])
+                    self._stats['restored'] += 1
+                else:
+                    attempt = Attempt(attempt_id, exam_id, digital_id)
+                self._attempts[attempt_id] = attempt
+            return attempt
+
+    def save(self, attempt_id, exam_id, digital_id, delta, seq):
+        """Merge {field: value} into the attempt (None or '' clears a field).
+
+        Deltas with a seq no newer than the last one applied are ignored.
+        Returns (applied, current seq).
+        """
+        self.start()
+        attempt = self._get(attempt_id, exam_id, digital_id)
+        with self._lock:
+            if attempt.exam_id != exam_id:
+                raise ValueError("Attempt belongs to another exam")
+            if attempt.sealed:
+                raise AttemptSealedError("Attempt already submitted")
+            attempt.touched = time.monotonic()
+            if seq <= attempt.seq:
+                self._stats['stale_deltas'] += 1
+                return False, attempt.seq
+            for field, value in delta.items():
+                if value is None or value == '':
+                    attempt.answers.pop(field, None)
+                else:
+                    attempt.answers[field] = value
+            attempt.seq = seq
+            attempt.dirty = True
+            self._stats['saves'] += 1
+            return True, seq
+
+    def begin(self, attempt_id, exam_id, digital_id, started_at, deadline):
+        """Record when an attempt started and must end; an attempt that already has a deadline keeps it.
+
+        Returns the attempt's (started_at, deadline, sealed).
+        """
+        self.start()
+        attempt = self._get(attempt_id, exam_id, digital_id)
+        with self._lock:
+            if attempt.deadline is None and not attempt.sealed:
+                attempt.started_at = started_at
+                attempt.deadline = deadline
+                attempt.dirty = True
+            attempt.touched = time.monotonic()
+            return attempt.started_at, attempt.deadline, attempt.sealed
+
+    def timing(self, attempt_id, exam_id, digital_id):
+        """The attempt's (started_at, deadline, sealed); started_at is None if it was never begun"""
+        attempt = self._get(attempt_id, exam_id, digital_id)
+        with self._lock:
+            return attempt.started_at, attempt.deadline, attempt.sealed
+
+    def open_deadlines(self):
+        """(attempt_id, exam_id, digital_id_hash, deadline) of every persisted attempt not yet sealed"""
+        with DatabaseConfig.connection() as connection:
+            if not connection:
+                raise RuntimeError("Database connection failed")
+            cursor = connection.cursor()
+            try:
+                cursor.execute(
+                    "SELECT attempt_id, exam_id, digital_id_hash, deadline FROM attempt_snapshots "
+                    "WHERE sealed = FALSE AND deadline IS NOT NULL"
+                )
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+    def snapshot(self, attempt_id, exam_id, digital_id):
+        """{'answers', 'seq', 'sealed'} for restoring a reloaded exam page"""
+        attempt = self._get(attempt_id, exam_id, digital_id)
+        with self._lock:
+            return {'answers': dict(attempt.answers), 'seq': attempt.seq, 'sealed': attempt.sealed}
+
+    def seal(self, attempt_id, exam_id, digital_id, final_answers=None):
+        """Close the attempt with the submitted answers (default: the last saved ones).
+
+        Returns the sealed answers, or None if it was already sealed. The seal
+        only reaches storage after confirm(); until then the attempt stays in
+        memory so reopen() can undo it if the submission is not accepted.
+        """
+        self.start()
+        attempt = self._get(attempt_id, exam_id, digital_id)
+        with self._lock:
+            if attempt.sealed:
+                return None
+            if final_answers is not None:
+                # The submitted form is authoritative; autosaves only covered the time before it
+                attempt.answers = dict(final_answers)
+            attempt.seq += 1
+            attempt.sealed = True
+            attempt.submitting = True
+            attempt.dirty = True
+            attempt.touched = time.monotonic()
+            self._stats['sealed'] += 1
+            return dict(attempt.answers)
+
+    def confirm(self, attempt_id):
+        """The sealed attempt's submission was accepted; persist the seal"""
+        with self._lock:
+            attempt = self._attempts.get(attempt_id)
+            if attempt is not None and attempt.submitting:
+                attempt.submitting = False
+                attempt.dirty = True
+
+    def reopen(self, attempt_id):
+        """Undo seal() when the submission could not be accepted"""
+        with self._lock:
+            attempt = self._attempts.get(attempt_id)
+            if attempt is not None and attempt.submitting:
+                attempt.sealed = False
+                attempt.submitting = False
+                attempt.seq += 1
+                attempt.dirty = True
+                self._stats['sealed'] -= 1
+
+    def flush(self):
+        """Write every changed attempt; returns the number of snapshots written"""
+        with self._flush_lock:
+            now = datetime.now()
+            with self._lock:
+                changed = [attempt for attempt in self._attempts.values() if attempt.dirty]
+                rows = []
+                for attempt in changed:
+                    attempt.dirty = False
+                    rows.append((attempt.attempt_id, attempt.exam_id, attempt.digital_id,
+                                 dict(attempt.answers), attempt.seq, attempt.sealed and not attempt.submitting,
+                                 attempt.started_at, attempt.deadline, now))
+            if rows:
+                try:
+                    self._write([row[:3] + (json.dumps(row[3]),) + row[4:] for row in rows])
+                except Exception as e:
+                    print(f"Error flushing autosaved answers ({len(rows)} attempts): {e}")
+                    with self._lock:
+                        self._stats['errors'] += 1
+                        for attempt in changed:
+                            attempt.dirty = True
+                    return 0
+            self._evict()
+            with self._lock:
+                self._stats['written'] += len(rows)
+                self._stats['flushes'] += 1 if rows else 0
+            return len(rows)
+
+    def _write(self, rows):
+        with DatabaseConfig.connection() as connection:
+            if not connection:
+                raise RuntimeError("Database connection failed")
+            cursor = connection.cursor()
+            try:
+                for start in range(0, len(rows), self.batch_size):
+                    cursor.executemany(UPSERT_SNAPSHOTS, rows[start:start + self.batch_size])
+                connection.commit()
+            finally:
+                cursor.close()
+
+    def _evict(self):
+        """Drop persisted attempts that are sealed or idle; they reload from storage if needed"""
+        cutoff = time.monotonic() - self.idle_ttl
+        with self._lock:
+            for attempt_id in [attempt_id for attempt_id, attempt in self._attempts.items()
+                               if not attempt.dirty and not attempt.submitting
+                               and (attempt.sealed or attempt.touched < cutoff)]:
+                del self._attempts[attempt_id]
+
+    def shutdown(self, timeout=None):
+        """Stop the flush thread and write whatever is still pending"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid() and thread.is_alive():
+            thread.join(timeout)
+        if self._pid == os.getpid():
+            self.flush()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['attempts'] = len(self._attempts)
+            stats['dirty'] = sum(1 for attempt in self._attempts.values() if attempt.dirty)
+        return stats
+
+
+autosave = AutosaveBuffer(
+    AutosaveConfig.AUTOSAVE_FLUSH_INTERVAL,
+    AutosaveConfig.AUTOSAVE_BATCH_SIZE,
+    AutosaveConfig.AUTOSAVE_IDLE_TTL,
+)
+atexit.register(autosave.shutdown)
@@ -0,0 +1,184 @@
+# services/email_dispatcher.py
+import atexit
+import os
+import queue
+import smtplib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from config import EmailConfig
+
+_STOP = object()
+
+
+class SMTPSession:
+    """One authenticated SMTP connection, reopened when it drops or sits idle too long"""
+
+    def __init__(self, server, port, use_tls, username, password, idle_timeout):
+        self.server = server
+        self.port = port
+        self.use_tls = use_tls
+        self.username = username
+        self.password = password
+        self.idle_timeout = idle_timeout
+        self.connections = 0
+        self._smtp = None
+        self._last_used = 0.0
+
+    def _connect(self):
+        smtp = smtplib.SMTP(self.server, self.port, timeout=30)
+        if self.use_tls:
+            smtp.starttls()
+        if self.username:
+            smtp.login(self.username, self.password)
+        self._smtp = smtp
+        self.connections += 1
+
+    def send(self, message):
+        if self._smtp is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            # Servers drop idle sessions; start over rather than fail mid-send
+            self.close()
+        if self._smtp is None:
+            self._connect()
+        try:
+            self._smtp.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            self._connect()
+            self._smtp.send_message(message)
+        self._last_used = time.monotonic()
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+
+class EmailDispatcher:
+    """Background email delivery with persistent SMTP sessions.
+
+    enqueue() returns a tracking id at once; `workers` threads, each owning
+    one SMTPSession, send queued messages and record their delivery status.
+    """
+
+    def __init__(self, server, port, use_tls, username, password, idle_timeout,
+                 workers, max_queue, max_attempts, max_tracked=50000):
+        self._session_args = (server, port, use_tls, username, password, idle_timeout)
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.max_tracked = max_tracked
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._status = OrderedDict()
+        self._threads = []
+        self._sessions = []
+        self._pid = None
+
+    def start(self):
+        with self._lock:
+            if self._pid == os.getpid() and any(thread.is_alive() for thread in self._threads):
+                return
+            self._pid = os.getpid()
+            self._sessions = [SMTPSession(*self._session_args) for _ in range(self.workers)]
+            self._threads = [
+                threading.Thread(target=self._run, args=(session,), name=f'email-worker-{i}', daemon=True)
+                for i, session in enumerate(self._sessions)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def enqueue(self, message):
+        """Queue a message (or a callable that builds it on the worker) for delivery.
+
+        Returns its tracking id, or None if the queue is full.
+        """
+        self.start()
+        tracking_id = uuid.uuid4().hex
+        self._set_status(tracking_id, 'queued')
+        try:
+            self._queue.put_nowait((tracking_id, message))
+        except queue.Full:
+            self._set_status(tracking_id, 'rejected')
+            return None
+        return tracking_id
+
+    def status(self, tracking_id):
+        with self._lock:
+            return self._status.get(tracking_id)
+
+    def _set_status(self, tracking_id, status):
+        with self._lock:
+            self._status[tracking_id] = status
+            self._status.move_to_end(tracking_id)
+            while len(self._status) > self.max_tracked:
+                self._status.popitem(last=False)
+
+    def _run(self, session):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                session.close()
+                return
+            tracking_id, message = item
+            self._set_status(tracking_id, 'sending')
+            if callable(message):
+                try:
+                    message = message()
+                except Exception as e:
+                    print(f"❌ Could not build email: {e}")
+                    self._set_status(tracking_id, 'failed')
+                    continue
+            for attempt in range(1, self.max_attempts + 1):
+                try:
+                    session.send(message)
+                    self._set_status(tracking_id, 'sent')
+                    break
+                except smtplib.SMTPAuthenticationError as e:
+                    print(f"❌ SMTP Authentication Failed: {e}")
+                    session.close()
+                    self._set_status(tracking_id, 'failed')
+                    break
+                except (smtplib.SMTPException, OSError) as e:
+                    print(f"❌ SMTP Error (attempt {attempt}/{self.max_attempts}): {e}")
+                    session.close()
+                    if attempt == self.max_attempts:
+                        self._set_status(tracking_id, 'failed')
+                    else:
+                        time.sleep(0.5 * attempt)
+
+    def shutdown(self, timeout=None):
+        """Deliver what is already queued, then close every SMTP session"""
+        threads = [thread for thread in self._threads if thread.is_alive()]
+        if self._pid != os.getpid() or not threads:
+            return
+        for _ in threads:
+            self._queue.put(_STOP)
+        for thread in threads:
+            thread.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for status in self._status.values():
+                counts[status] = counts.get(status, 0) + 1
+        counts['queued_now'] = self._queue.qsize()
+        counts['smtp_connections'] = sum(session.connections for session in self._sessions)
+        return counts
+
+
+email_dispatcher = EmailDispatcher(
+    EmailConfig.SMTP_SERVER,
+    EmailConfig.SMTP_PORT,
+    EmailConfig.SMTP_USE_TLS,
+    EmailConfig.EMAIL_USERNAME,
+    EmailConfig.EMAIL_PASSWORD,
+    EmailConfig.SMTP_IDLE_TIMEOUT,
+    EmailConfig.EMAIL_WORKERS,
+    EmailConfig.EMAIL_QUEUE_SIZE,
+    EmailConfig.EMAIL_MAX_ATTEMPTS,
+)
+atexit.register(email_dispatcher.shutdown)
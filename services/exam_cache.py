@@ -0,0 +1,70 @@
+# services/exam_cache.py
+import threading
+from collections import OrderedDict
+from config import CacheConfig
+
+
+class ExamCache:
+    """Size-bounded LRU cache of (exam, questions, answer_key) keyed by exam id.
+
+    Cached rows are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, exam_id, loader):
+        """Return the cached entry for exam_id, calling loader(exam_id) on a miss"""
+        with self._lock:
+            entry = self._entries.get(exam_id)
+            if entry is not None:
+                self._entries.move_to_end(exam_id)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            epoch = self._epoch
+
+        entry = loader(exam_id)
+        if entry is None:
+            return None
+
+        with self._lock:
+            # Skip the store if an invalidation raced with the load
+            if epoch == self._epoch:
+                self._entries[exam_id] = entry
+                self._entries.move_to_end(exam_id)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return entry
+
+    def invalidate(self, exam_id):
+        with self._lock:
+            self._entries.pop(exam_id, None)
+            self._epoch += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._epoch += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+exam_cache = ExamCache(CacheConfig.EXAM_CACHE_SIZE)
@@ -0,0 +1,104 @@
+# services/grading.py
+from itertools import chain, repeat
+
+import numpy as np
+
+CORRECT = 1
+WRONG = -1
+SKIPPED = 0
+
+# Response codes: 0 = not answered, 1..n = the n-th correct answer, OTHER = any other answer
+OTHER = np.iinfo(np.int16).max
+
+STATUS_LABELS = {
+    CORRECT: "✅ Correct",
+    WRONG: "❌ Wrong",
+    SKIPPED: "⚠️ Skipped",
+}
+
+
+class AnswerKey:
+    """Answer key compiled once per exam from its (decoded) question rows"""
+
+    __slots__ = ('question_ids', 'fields', 'texts', 'correct', 'marks', 'negative', 'total',
+                 'answer_codes', 'correct_counts')
+
+    def __init__(self, question_ids, texts, correct, marks, negative):
+        self.question_ids = tuple(question_ids)
+        self.fields = tuple(f'question_{qid}' for qid in self.question_ids)
+        self.texts = tuple(texts)
+        self.correct = tuple(correct)
+        self.marks = np.asarray(marks, dtype=np.int64)
+        self.negative = np.asarray(negative, dtype=np.int64)
+        self.total = int(self.marks.sum())
+        # Per question: response -> code; unanswered fields (missing or blank) encode as 0
+        self.answer_codes = tuple({None: 0, '': 0, **{answer: i for i, answer in enumerate(sorted(c), 1)}}
+                                  for c in self.correct)
+        self.correct_counts = np.asarray([len(c) for c in self.correct], dtype=np.int16)
+
+    @classmethod
+    def compile(cls, questions):
+        """Build a key from question rows whose `correct` is already a list"""
+        return cls(
+            [q['id'] for q in questions],
+            [q['q_text'] for q in questions],
+            [frozenset(q.get('correct') or ()) for q in questions],
+            [q.get('marks') or 0 for q in questions],
+            [q.get('negative') or 0 for q in questions],
+        )
+
+    def outcomes(self, answers):
+        """Per-question outcome (CORRECT/WRONG/SKIPPED) for a form-like mapping"""
+        get = answers.get
+        return [
+            SKIPPED if not answer else (CORRECT if answer in correct else WRONG)
+            for answer, correct in zip((get(field) for field in self.fields), self.correct)
+        ]
+
+    def score(self, answers):
+        """Grade one submission; returns (score, total, results) like take_exam renders them"""
+        score = 0
+        results = []
+        get = answers.get
+        for field, text, correct, marks, negative in zip(
+                self.fields, self.texts, self.correct, self.marks.tolist(), self.negative.tolist()):
+            answer = get(field)
+            if answer and answer in correct:
+                score += marks
+                status = CORRECT
+            elif answer:
+                score -= negative
+                status = WRONG
+            else:
+                answer = "Not answered"
+                status = SKIPPED
+            results.append({"question": text, "your_answer": answer, "status": STATUS_LABELS[status]})
+        return score, self.total, results
+
+    def response_matrix(self, submissions):
+        """(submissions x questions) int16 matrix of response codes (0, 1..n or OTHER).
+
+        Each submission is encoded by chained C-level iterators (form lookup,
+        then code lookup) feeding one np.fromiter; no Python code runs per answer.
+        """
+        codes = self.answer_codes
+        fields = self.fields
+        width = len(fields)
+        flat = chain.from_iterable(map(dict.get, codes, map(answers.get, fields), repeat(OTHER, width))
+                                   for answers in submissions)
+        return np.fromiter(flat, dtype=np.int16, count=len(submissions) * width).reshape(-1, width)
+
+    def outcome_matrix(self, submissions):
+        """(submissions x questions) int8 matrix of outcomes"""
+        responses = self.response_matrix(submissions)
+        outcomes = np.where(responses <= self.correct_counts, CORRECT, WRONG).astype(np.int8)
+        outcomes[responses == 0] = SKIPPED
+        return outcomes
+
+    def score_batch(self, submissions):
+        """Scores for many submissions at once, as an int64 array"""
+        responses = self.response_matrix(submissions)
+        # Broadcast against the key: a code up to the question's number of correct answers is right
+        correct = (responses > 0) & (responses <= self.correct_counts)
+        wrong = responses > self.correct_counts
+        return correct @ self.marks - wrong @ self.negative
@@ -0,0 +1,259 @@
+# services/item_analysis.py
+import json
+import math
+import threading
+from datetime import datetime
+import numpy as np
+from mysql.connector import Error
+from config import DatabaseConfig
+
+# Choice codes besides an index into the question's option list
+SKIPPED = -1
+OTHER = -2
+# Column offset so OTHER and SKIPPED index the first two slots of a count row
+SHIFT = 2
+
+# Suggested difficulty from facility (share of candidates answering correctly)
+DIFFICULTY_BANDS = ((0.7, 'easy'), (0.3, 'medium'), (0.0, 'hard'))
+
+
+class ItemStats:
+    """Running per-question statistics for one exam.
+
+    Every submission is reduced to one choice code per question (option
+    index, SKIPPED or OTHER) and added into fixed-size accumulators: per
+    question the correct and skipped counts, the sum of total scores of
+    candidates who got it right and a count per choice; per exam the number
+    of submissions and the sum and sum of squares of their scores. add()
+    folds in one submission; add_matrix() folds in a block of them with
+    vectorized NumPy. Facility, skip rate, distractor shares and the
+    point-biserial discrimination index all follow from the accumulators,
+    so nothing is ever rescanned.
+    """
+
+    def __init__(self, questions):
+        self.question_ids = tuple(q['id'] for q in questions)
+        self.keys = tuple(str(qid) for qid in self.question_ids)
+        self.options = tuple(tuple(q.get('options') or ()) for q in questions)
+        vocabularies = []
+        for options, q in zip(self.options, questions):
+            # Free-text answers are matched against the correct values themselves
+            vocabularies.append(options + tuple(c for c in q.get('correct') or () if c not in options))
+        self.vocabularies = tuple(vocabularies)
+        self._index = tuple({value: code for code, value in enumerate(vocab)} for vocab in vocabularies)
+
+        width = max((len(vocab) for vocab in vocabularies), default=0) + SHIFT
+        self._correct_table = np.zeros((len(questions), width), dtype=bool)
+        for row, (vocab, q) in enumerate(zip(vocabularies, questions)):
+            correct = set(q.get('correct') or ())
+            for code, value in enumerate(vocab):
+                self._correct_table[row, code + SHIFT] = value in correct
+        self._rows = np.arange(len(questions))
+        self.marks = np.asarray([q.get('marks') or 0 for q in questions], dtype=np.int64)
+        self.negative = np.asarray([q.get('negative') or 0 for q in questions], dtype=np.int64)
+
+        self.n = 0
+        self.sum_score = 0
+        self.sum_score_sq = 0
+        self.correct = np.zeros(len(questions), dtype=np.int64)
+        self.skipped = np.zeros(len(questions), dtype=np.int64)
+        self.sum_correct_score = np.zeros(len(questions), dtype=np.int64)
+        self.choices = np.zeros((len(questions), width), dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def encode(self, answers):
+        """Choice codes for an answers dict keyed by question id (int or str)"""
+        get = answers.get
+        values = [get(key) or get(qid) for qid, key in zip(self.question_ids, self.keys)]
+        return np.array([index.get(value, OTHER) if value else SKIPPED
+                         for value, index in zip(values, self._index)], dtype=np.int16)
+
+    def add(self, answers):
+        """Fold one graded submission in; O(questions), independent of how many came before"""
+        codes = self.encode(answers) + SHIFT
+        correct = self._correct_table[self._rows, codes]
+        skipped = codes == SKIPPED + SHIFT
+        score = int(correct @ self.marks - (~correct & ~skipped) @ self.negative)
+        with self._lock:
+            self.n += 1
+            self.sum_score += score
+            self.sum_score_sq += score * score
+            self.correct += correct
+            self.skipped += skipped
+            self.sum_correct_score += score * correct
+            self.choices[self._rows, codes] += 1
+
+    def add_matrix(self, codes):
+        """Fold in a (submissions x questions) block of choice codes with vectorized NumPy"""
+        if not len(codes):
+            return
+        shifted = codes.astype(np.intp) + SHIFT
+        correct = self._correct_table[self._rows, shifted]
+        skipped = shifted == SKIPPED + SHIFT
+        scores = correct @ self.marks - (~correct & ~skipped) @ self.negative
+        width = self.choices.shape[1]
+        # One bincount over (question, choice) pairs counts every column at once
+        flat = np.bincount((self._rows * width + shifted).ravel(), minlength=self.choices.size)
+        with self._lock:
+            self.n += len(codes)
+            self.sum_score += int(scores.sum())
+            self.sum_score_sq += int((scores * scores).sum())
+            self.correct += correct.sum(axis=0)
+            self.skipped += skipped.sum(axis=0)
+            self.sum_correct_score += scores @ correct
+            self.choices += flat.reshape(self.choices.shape)
+
+    def merge(self, other):
+        """Add another ItemStats over the same questions into this one"""
+        with other._lock:
+            parts = (other.n, other.sum_score, other.sum_score_sq, other.correct.copy(), other.skipped.copy(),
+                     other.sum_correct_score.copy(), other.choices.copy())
+        with self._lock:
+            self.n += parts[0]
+            self.sum_score += parts[1]
+            self.sum_score_sq += parts[2]
+            self.correct += parts[3]
+            self.skipped += parts[4]
+            self.sum_correct_score += parts[5]
+            self.choices += parts[6]
+
+    def report(self):
+        """Per-question statistics keyed by question id"""
+        with self._lock:
+            n = self.n
+            sum_score, sum_score_sq = float(self.sum_score), float(self.sum_score_sq)
+            correct, skipped = self.correct.copy(), self.skipped.copy()
+            sum_correct_score, choices = self.sum_correct_score.copy(), self.choices.copy()
+
+        score_var = n * sum_score_sq - sum_score * sum_score
+        report = {}
+        for row, qid in enumerate(self.question_ids):
+            right = int(correct[row])
+            facility = right / n if n else None
+            # Point-biserial correlation of "got it right" with the total score
+            item_var = n * right - right * right
+            if n and score_var > 0 and item_var > 0:
+                discrimination = ((n * float(sum_correct_score[row]) - right * sum_score)
+                                  / math.sqrt(item_var * score_var))
+            else:
+                discrimination = None
+            distractors = {}
+            if self.options[row] and n:
+                for code, option in enumerate(self.options[row]):
+                    distractors[option] = int(choices[row, code + SHIFT]) / n
+            report[qid] = {
+                'responses': n,
+                'p_value': facility,
+                'discrimination': discrimination,
+                'skip_rate': int(skipped[row]) / n if n else None,
+                'other_rate': int(choices[row, OTHER + SHIFT]) / n if n else None,
+                'distractors': distractors,
+                'suggested_difficulty': next(label for floor, label in DIFFICULTY_BANDS if facility >= floor)
+                if facility is not None else None,
+            }
+        return report
+
+
+def question_signature(questions):
+    """What the statistics depend on; a change means they must be rebuilt"""
+    return tuple((q['id'], tuple(q.get('options') or ()), tuple(q.get('correct') or ()),
+                  q.get('marks') or 0, q.get('negative') or 0) for q in questions)
+
+
+class ItemAnalysis:
+    """ItemStats per exam, built from storage on first use and kept current by record().
+
+    A backfill reads the submissions made before it started and merges them
+    into a tracker that was already collecting everything graded since, so
+    the two never overlap. Submissions still queued in the write-behind
+    writer when a backfill starts are the only ones it can miss.
+    """
+
+    def __init__(self, chunk_size=50000):
+        self.chunk_size = chunk_size
+        self._exams = {}
+        self._lock = threading.Lock()
+
+    def record(self, exam_id, answers, submitted_at):
+        """Fold a freshly graded submission (answers keyed by question id) into its exam's stats"""
+        with self._lock:
+            entry = self._exams.get(exam_id)
+        if entry is not None and submitted_at >= entry['cutoff']:
+            entry['stats'].add(answers)
+
+    def invalidate(self, exam_id):
+        """Forget an exam's stats (its questions changed); the next report() rebuilds them"""
+        with self._lock:
+            self._exams.pop(exam_id, None)
+
+    def report(self, exam_id, questions, recompute=False):
+        """Per-question statistics for an exam, backfilling from storage if needed; None on failure.
+
+        recompute=True discards the running totals and rebuilds them from storage.
+        """
+        signature = question_signature(questions)
+        with self._lock:
+            entry = self._exams.get(exam_id)
+            owner = recompute or entry is None or entry['signature'] != signature
+            if owner:
+                entry = {'stats': ItemStats(questions), 'cutoff': datetime.now(), 'signature': signature,
+                         'ready': threading.Event(), 'failed': False}
+                self._exams[exam_id] = entry
+
+        if owner:
+            try:
+                entry['stats'].merge(self.backfill(exam_id, questions, entry['cutoff']))
+            except (Error, RuntimeError) as e:
+                print(f"Error computing item statistics for exam {exam_id}: {e}")
+                entry['failed'] = True
+                with self._lock:
+                    if self._exams.get(exam_id) is entry:
+                        del self._exams[exam_id]
+            finally:
+                entry['ready'].set()
+        else:
+            # Another request is backfilling this exam; its totals are partial until it finishes
+            entry['ready'].wait()
+        return None if entry['failed'] else entry['stats'].report()
+
+    def backfill(self, exam_id, questions, before):
+        """ItemStats over every stored submission of the exam made before `before`.
+
+        Rows are read in keyset pages and decoded into a block of choice
+        codes, which is folded in with one vectorized add_matrix() per block.
+        """
+        stats = ItemStats(questions)
+        codes = np.empty((self.chunk_size, len(stats.keys)), dtype=np.int16)
+        filled = 0
+        last_id = 0
+        with DatabaseConfig.connection() as connection:
+            if not connection:
+                raise RuntimeError("Database connection failed")
+            while True:
+                cursor = connection.cursor()
+                try:
+                    cursor.execute(
+                        "SELECT id, answers FROM submissions "
+                        "WHERE exam_id = %s AND id > %s AND submitted_at < %s ORDER BY id LIMIT %s",
+                        (exam_id, last_id, before, self.chunk_size)
+                    )
+                    rows = cursor.fetchall()
+                finally:
+                    cursor.close()
+                if not rows:
+                    break
+                for last_id, answers in rows:
+                    codes[filled] = stats.encode(json.loads(answers) if answers else {})
+                    filled += 1
+                    if filled == self.chunk_size:
+                        stats.add_matrix(codes)
+                        filled = 0
+        stats.add_matrix(codes[:filled])
+        return stats
+
+    def stats(self):
+        with self._lock:
+            return {'exams': len(self._exams)}
+
+
+item_analysis = ItemAnalysis()
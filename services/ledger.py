@@ -0,0 +1,305 @@
+# services/ledger.py
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from array import array
+from config import LedgerConfig
+
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+HASH_SIZE = 32
+GENESIS_HASH = '0' * 64
+
+RECORDS_FILE = 'records.jsonl'
+LEAVES_FILE = 'leaves.bin'
+BLOCKS_FILE = 'blocks.jsonl'
+
+
+def canonical(data):
+    return json.dumps(data, sort_keys=True, separators=(',', ':'))
+
+
+def leaf_hash(record_line):
+    return hashlib.sha256(LEAF_PREFIX + record_line.encode()).digest()
+
+
+def node_hash(left, right):
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def answer_digest(answers):
+    """SHA-256 of a submission's answers in canonical JSON form"""
+    return hashlib.sha256(canonical(answers).encode()).hexdigest()
+
+
+def merkle_root(leaves):
+    """Root of a Merkle tree whose odd last node is carried up unchanged"""
+    level = list(leaves)
+    while len(level) > 1:
+        paired = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0]
+
+
+def merkle_path(leaves, index):
+    """Sibling hashes from leaf `index` up to the root, as (hex, side) pairs"""
+    path = []
+    level = list(leaves)
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            path.append((level[sibling].hex(), 'L' if sibling < index else 'R'))
+        paired = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+        index //= 2
+    return path
+
+
+def block_hash(header):
+    return hashlib.sha256(canonical(header).encode()).hexdigest()
+
+
+def verify_proof(proof):
+    """Check an inclusion proof produced by Ledger.proof() without touching the ledger"""
+    node = leaf_hash(canonical(proof['record']))
+    if node.hex() != proof['leaf_hash']:
+        return False
+    for sibling, side in proof['path']:
+        sibling = bytes.fromhex(sibling)
+        node = node_hash(sibling, node) if side == 'L' else node_hash(node, sibling)
+    header = proof['block']
+    return node.hex() == header['merkle_root'] and block_hash(header) == proof['block_hash']
+
+
+class Ledger:
+    """Append-only, hash-chained ledger of graded submissions.
+
+    Each append hashes one record into a leaf. Every `block_size` leaves are
+    sealed into a block whose header holds the Merkle root of its leaves and
+    the hash of the previous block, so a record can be proven with a
+    log2(block_size) path plus the block header. A partial block is sealed
+    once its oldest record has waited `seal_interval` seconds, so a record
+    becomes provable within that time even when traffic is light.
+
+    The files are owned by a single writer process.
+    """
+
+    def __init__(self, directory, block_size, seal_interval=60):
+        self.directory = directory
+        self.block_size = block_size
+        self.seal_interval = seal_interval
+        self._lock = threading.Lock()
+        self._opened = False
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def open(self):
+        """Load chain state from disk, repairing a torn tail left by a crash"""
+        with self._lock:
+            if self._opened:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            self._blocks = []
+            self._block_hashes = []
+            blocks_end = 0
+            if os.path.exists(self._path(BLOCKS_FILE)):
+                with open(self._path(BLOCKS_FILE), 'rb') as blocks:
+                    for line in blocks:
+                        if not line.endswith(b'\n'):
+                            break
+                        if line.strip():
+                            entry = json.loads(line)
+                            self._blocks.append(entry['header'])
+                            self._block_hashes.append(entry['hash'])
+                        blocks_end += len(line)
+
+            # Byte offset of every record line, for proofs
+            self._offsets = array('Q')
+            offset = 0
+            valid_end = 0
+            if os.path.exists(self._path(RECORDS_FILE)):
+                with open(self._path(RECORDS_FILE), 'rb') as records:
+                    for line in records:
+                        if not line.endswith(b'\n'):
+                            break
+                        self._offsets.append(offset)
+                        offset += len(line)
+                        valid_end = offset
+            self._records = open(self._path(RECORDS_FILE), 'ab')
+            self._records.truncate(valid_end)
+            self._records_size = valid_end
+
+            self._leaves = open(self._path(LEAVES_FILE), 'a+b')
+            self._leaves.truncate(min(os.path.getsize(self._path(LEAVES_FILE)), len(self._offsets) * HASH_SIZE))
+            stored_leaves = os.path.getsize(self._path(LEAVES_FILE)) // HASH_SIZE
+            for seq in range(stored_leaves, len(self._offsets)):
+                self._leaves.write(leaf_hash(self._read_record_line(seq)))
+            self._leaves.flush()
+
+            self._blocks_file = open(self._path(BLOCKS_FILE), 'a', encoding='utf-8')
+            # A block line torn by a crash is dropped; its records are still pending and get sealed again
+            self._blocks_file.truncate(blocks_end)
+            sealed = self._sealed_count()
+            self._pending = [self._read_leaf(seq) for seq in range(sealed, len(self._offsets))]
+            self._pending_since = time.monotonic()
+            self._opened = True
+
+    def _sealed_count(self):
+        if not self._blocks:
+            return 0
+        last = self._blocks[-1]
+        return last['first_seq'] + last['count']
+
+    def _read_record_line(self, seq):
+        with open(self._path(RECORDS_FILE), 'rb') as records:
+            records.seek(self._offsets[seq])
+            return records.readline().decode().rstrip('\n')
+
+    def _read_leaf(self, seq):
+        with open(self._path(LEAVES_FILE), 'rb') as leaves:
+            leaves.seek(seq * HASH_SIZE)
+            return leaves.read(HASH_SIZE)
+
+    def _read_leaves(self, first_seq, count):
+        with open(self._path(LEAVES_FILE), 'rb') as leaves:
+            leaves.seek(first_seq * HASH_SIZE)
+            data = leaves.read(count * HASH_SIZE)
+        return [data[i:i + HASH_SIZE] for i in range(0, len(data), HASH_SIZE)]
+
+    def append(self, submission_uuid, digital_id, exam_id, digest, score):
+        """Record one graded submission; returns a receipt with its sequence number and leaf hash.
+
+        digital_id is the candidate's digital id hash (None when the session
+        has none); it is hashed into the record so a result cannot be
+        reassigned by editing the submissions row.
+        """
+        self.open()
+        with self._lock:
+            seq = len(self._offsets)
+            line = canonical({
+                'seq': seq,
+                'submission_uuid': submission_uuid,
+                'digital_id': digital_id,
+                'exam_id': exam_id,
+                'answer_digest': digest,
+                'score': score,
+                'ts': round(time.time(), 3),
+            })
+            leaf = leaf_hash(line)
+            data = (line + '\n').encode()
+            self._offsets.append(self._records_size)
+            self._records.write(data)
+            self._records_size += len(data)
+            self._records.flush()
+            self._leaves.write(leaf)
+            self._leaves.flush()
+            if not self._pending:
+                self._pending_since = time.monotonic()
+            self._pending.append(leaf)
+            if len(self._pending) >= self.block_size or self._seal_due():
+                self._seal()
+            return {'seq': seq, 'leaf_hash': leaf.hex()}
+
+    def _seal_due(self):
+        return bool(self._pending) and time.monotonic() - self._pending_since >= self.seal_interval
+
+    def seal(self):
+        """Close the current block early (e.g. at the end of an exam session)"""
+        self.open()
+        with self._lock:
+            if self._pending:
+                self._seal()
+
+    def _seal(self):
+        header = {
+            'height': len(self._blocks),
+            'prev_hash': self._block_hashes[-1] if self._block_hashes else GENESIS_HASH,
+            'merkle_root': merkle_root(self._pending).hex(),
+            'first_seq': self._sealed_count(),
+            'count': len(self._pending),
+            'sealed_at': round(time.time(), 3),
+        }
+        digest = block_hash(header)
+        self._blocks_file.write(canonical({'header': header, 'hash': digest}) + '\n')
+        self._blocks_file.flush()
+        os.fsync(self._records.fileno())
+        os.fsync(self._blocks_file.fileno())
+        self._blocks.append(header)
+        self._block_hashes.append(digest)
+        self._pending = []
+
+    def proof(self, seq):
+        """Inclusion proof for record `seq`, or None if there is no such record.
+
+        A record whose block is still open gets {'pending': True, 'record',
+        'leaf_hash', 'retry_after'} instead. An open block is sealed when it
+        is full, or by the first append or proof request after it has been
+        open seal_interval seconds; a proof request never seals it earlier.
+        """
+        self.open()
+        with self._lock:
+            if seq < 0 or seq >= len(self._offsets):
+                return None
+            if seq >= self._sealed_count() and self._seal_due():
+                self._seal()
+            if seq >= self._sealed_count():
+                waited = time.monotonic() - self._pending_since
+                return {
+                    'pending': True,
+                    'record': json.loads(self._read_record_line(seq)),
+                    'leaf_hash': self._pending[seq - self._sealed_count()].hex(),
+                    'retry_after': max(int(self.seal_interval - waited) + 1, 1),
+                }
+            height = self._find_block(seq)
+            header = self._blocks[height]
+            leaves = self._read_leaves(header['first_seq'], header['count'])
+            return {
+                'record': json.loads(self._read_record_line(seq)),
+                'leaf_hash': leaves[seq - header['first_seq']].hex(),
+                'path': merkle_path(leaves, seq - header['first_seq']),
+                'block': header,
+                'block_hash': self._block_hashes[height],
+            }
+
+    def _find_block(self, seq):
+        low, high = 0, len(self._blocks) - 1
+        while low < high:
+            mid = (low + high + 1) // 2
+            if self._blocks[mid]['first_seq'] <= seq:
+                low = mid
+            else:
+                high = mid - 1
+        return low
+
+    def stats(self):
+        self.open()
+        with self._lock:
+            return {
+                'records': len(self._offsets),
+                'blocks': len(self._blocks),
+                'pending': len(self._pending),
+                'head': self._block_hashes[-1] if self._block_hashes else GENESIS_HASH,
+            }
+
+    def close(self):
+        with self._lock:
+            if not self._opened:
+                return
+            if self._pending:
+                self._seal()
+            self._records.close()
+            self._leaves.close()
+            self._blocks_file.close()
+            self._opened = False
+
+
+ledger = Ledger(LedgerConfig.LEDGER_DIR, LedgerConfig.LEDGER_BLOCK_SIZE, LedgerConfig.LEDGER_SEAL_INTERVAL)
+atexit.register(ledger.close)
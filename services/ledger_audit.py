@@ -0,0 +1,215 @@
+# services/ledger_audit.py
+import hashlib
+import hmac
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from services.ledger import (
+    BLOCKS_FILE, GENESIS_HASH, RECORDS_FILE, block_hash, canonical, leaf_hash, merkle_root
+)
+
+CHECKPOINT_FILE = 'checkpoint.json'
+
+
+def load_blocks(directory):
+    blocks = []
+    path = os.path.join(directory, BLOCKS_FILE)
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as blocks_file:
+            for line in blocks_file:
+                if line.strip():
+                    entry = json.loads(line)
+                    blocks.append((entry['header'], entry['hash']))
+    return blocks
+
+
+def record_offsets(directory, seqs, from_seq=0, from_offset=0):
+    """Byte offset of each record in `seqs`, from one sequential scan starting at a known
+    (from_seq, from_offset) line boundary. A seq one past the last record maps to the end of the file.
+    Seqs with no record (or no records file at all) are left out.
+    """
+    wanted = set(seqs)
+    offsets = {}
+    offset = from_offset
+    seq = from_seq
+    path = os.path.join(directory, RECORDS_FILE)
+    if not os.path.exists(path):
+        return offsets
+    with open(path, 'rb') as records:
+        records.seek(from_offset)
+        for line in records:
+            if seq in wanted:
+                offsets[seq] = offset
+                if len(offsets) == len(wanted):
+                    break
+            if not line.endswith(b'\n'):
+                break
+            offset += len(line)
+            seq += 1
+    if seq in wanted and seq not in offsets:
+        offsets[seq] = offset
+    return offsets
+
+
+def at_line_start(directory, offset):
+    """True if `offset` is 0 or directly follows a newline in the records file"""
+    if offset == 0:
+        return True
+    try:
+        with open(os.path.join(directory, RECORDS_FILE), 'rb') as records:
+            records.seek(offset - 1)
+            return records.read(1) == b'\n'
+    except FileNotFoundError:
+        return False
+
+
+def verify_blocks(records_path, tasks):
+    """Re-hash the records of each (header, stored_hash, offset) task.
+
+    Runs in a worker process; returns (height, error) for the first bad
+    block of the chunk, or None when the whole chunk is intact.
+    """
+    with open(records_path, 'rb') as records:
+        for header, stored_hash, offset in tasks:
+            if block_hash(header) != stored_hash:
+                return header['height'], "block header hash mismatch"
+            if offset is None:
+                return header['height'], "records missing"
+            records.seek(offset)
+            leaves = []
+            for _ in range(header['count']):
+                line = records.readline()
+                if not line.endswith(b'\n'):
+                    return header['height'], "records missing"
+                leaves.append(leaf_hash(line.decode().rstrip('\n')))
+            if merkle_root(leaves).hex() != header['merkle_root']:
+                return header['height'], "Merkle root mismatch"
+    return None
+
+
+def check_links(blocks):
+    """Stitch the chain: heights, prev-hash links and record ranges must follow on"""
+    prev_hash = GENESIS_HASH
+    next_seq = 0
+    for height, (header, stored_hash) in enumerate(blocks):
+        if header['height'] != height:
+            return height, "block height out of order"
+        if header['prev_hash'] != prev_hash:
+            return height, "previous block hash mismatch"
+        if header['first_seq'] != next_seq:
+            return height, "record range gap"
+        prev_hash = stored_hash
+        next_seq = header['first_seq'] + header['count']
+    return None
+
+
+def sign_checkpoint(payload, key):
+    return hmac.new(key.encode(), canonical(payload).encode(), hashlib.sha256).hexdigest()
+
+
+def load_checkpoint(directory, key):
+    """The last signed checkpoint, or None if missing or its signature does not match"""
+    path = os.path.join(directory, CHECKPOINT_FILE)
+    if not key or not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as checkpoint_file:
+        checkpoint = json.load(checkpoint_file)
+    expected = sign_checkpoint(checkpoint['payload'], key)
+    if not hmac.compare_digest(expected, checkpoint.get('signature', '')):
+        print("⚠️ Ledger checkpoint signature is invalid, running a full audit")
+        return None
+    return checkpoint['payload']
+
+
+def save_checkpoint(directory, key, height, stored_hash, records, records_offset):
+    payload = {
+        'height': height,
+        'block_hash': stored_hash,
+        'records': records,
+        # Byte offset in records.jsonl just past the last verified record
+        'records_offset': records_offset,
+        'verified_at': round(time.time(), 3),
+    }
+    path = os.path.join(directory, CHECKPOINT_FILE)
+    with open(path + '.tmp', 'w', encoding='utf-8') as checkpoint_file:
+        json.dump({'payload': payload, 'signature': sign_checkpoint(payload, key)}, checkpoint_file)
+    os.replace(path + '.tmp', path)
+    return payload
+
+
+def audit_ledger(directory, workers, key, full=False, chunk_size=None):
+    """Verify every block added since the last checkpoint (or all of them with full=True)"""
+    started = time.perf_counter()
+    blocks = load_blocks(directory)
+    report = {
+        'ok': True,
+        'blocks_total': len(blocks),
+        'blocks_verified': 0,
+        'records_verified': 0,
+        'first_corrupted': None,
+        'error': None,
+        'checkpoint': None,
+    }
+    if not blocks:
+        # Nothing sealed yet, e.g. a ledger directory that was never opened
+        report['elapsed'] = time.perf_counter() - started
+        report['blocks_per_second'] = 0.0
+        return report
+
+    failure = check_links(blocks)
+    start = 0
+    # Records before the checkpoint are not rescanned: offsets are found from its position onwards
+    scan_from = (0, 0)
+    checkpoint = None if full else load_checkpoint(directory, key)
+    if checkpoint is not None:
+        height = checkpoint['height']
+        if height < len(blocks) and blocks[height][1] == checkpoint['block_hash']:
+            start = height + 1
+            records_offset = checkpoint.get('records_offset')
+            if records_offset is not None and at_line_start(directory, records_offset):
+                scan_from = (checkpoint['records'], records_offset)
+        else:
+            print("⚠️ Ledger no longer matches its checkpoint, running a full audit")
+
+    # Blocks after a broken link cannot be trusted, so only re-hash up to it
+    end = failure[0] + 1 if failure else len(blocks)
+    pending = blocks[start:end]
+    records_end = blocks[end - 1][0]['first_seq'] + blocks[end - 1][0]['count']
+    offsets = record_offsets(directory, [header['first_seq'] for header, _ in pending] + [records_end],
+                             *scan_from)
+    tasks = [(header, stored_hash, offsets.get(header['first_seq'])) for header, stored_hash in pending]
+    chunk_size = chunk_size or max(1, len(tasks) // (workers * 8))
+    chunks = [tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+
+    records_path = os.path.join(directory, RECORDS_FILE)
+    bad_block = None
+    if tasks and not os.path.exists(records_path):
+        bad_block = tasks[0][0]['height'], "records missing"
+    elif chunks:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(verify_blocks, records_path, chunk) for chunk in chunks]
+            for chunk, future in zip(chunks, futures):
+                result = future.result()
+                if result is not None:
+                    bad_block = result
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    break
+                report['blocks_verified'] += len(chunk)
+                report['records_verified'] += sum(header['count'] for header, _, _ in chunk)
+
+    # Report whichever problem comes first in the chain
+    problems = [p for p in (failure, bad_block) if p is not None]
+    if problems:
+        report['ok'] = False
+        report['first_corrupted'], report['error'] = min(problems)
+    elif key:
+        header, stored_hash = blocks[-1]
+        report['checkpoint'] = save_checkpoint(
+            directory, key, header['height'], stored_hash, records_end, offsets[records_end]
+        )
+
+    elapsed = time.perf_counter() - started
+    report['elapsed'] = elapsed
+    report['blocks_per_second'] = report['blocks_verified'] / elapsed if elapsed else 0.0
+    return report
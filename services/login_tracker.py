@@ -0,0 +1,119 @@
+# services/login_tracker.py
+import atexit
+import os
+import threading
+from datetime import datetime
+from config import DatabaseConfig, LoginConfig
+from services.user_cache import user_cache
+
+
+class LastLoginRecorder:
+    """Coalesces users.last_login writes off the login path.
+
+    record() only stores the timestamp in a dict (repeat logins overwrite
+    it); a background thread writes everything pending every
+    `flush_interval` seconds with one UPDATE per `batch_size` users, and
+    shutdown() flushes what is left. A cached User gets the new time right
+    away, and pending() lets a fresh load see it before it is written.
+    """
+
+    def __init__(self, flush_interval, batch_size):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._stats = {'recorded': 0, 'written': 0, 'flushes': 0, 'errors': 0}
+
+    def start(self):
+        """Start the flush thread for this process (threads do not survive fork)"""
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='last-login-flusher', daemon=True)
+            self._thread.start()
+
+    def record(self, user_id, when=None):
+        """Note a login; returns its timestamp"""
+        self.start()
+        when = when or datetime.now()
+        with self._lock:
+            self._pending[user_id] = when
+            self._stats['recorded'] += 1
+        user_cache.update(user_id, last_login=when)
+        return when
+
+    def pending(self, user_id):
+        """The recorded login time not yet written for user_id, or None"""
+        with self._lock:
+            return self._pending.get(user_id)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write all pending timestamps; returns the number of users updated"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            items = list(pending.items())
+            written = 0
+            try:
+                with DatabaseConfig.connection() as connection:
+                    if not connection:
+                        raise RuntimeError("Database connection failed")
+                    cursor = connection.cursor()
+                    try:
+                        for start in range(0, len(items), self.batch_size):
+                            chunk = items[start:start + self.batch_size]
+                            params = [value for item in chunk for value in item]
+                            params.extend(user_id for user_id, _ in chunk)
+                            cursor.execute(
+                                "UPDATE users SET last_login = CASE user_id "
+                                + "WHEN %s THEN %s " * len(chunk)
+                                + f"END WHERE user_id IN ({', '.join(['%s'] * len(chunk))})",
+                                params
+                            )
+                            written += len(chunk)
+                        connection.commit()
+                    finally:
+                        cursor.close()
+            except Exception as e:
+                print(f"Error flushing last login times ({len(items)} users): {e}")
+                with self._lock:
+                    self._stats['errors'] += 1
+                    # Put them back for the next flush unless a newer login replaced them
+                    for user_id, when in items:
+                        self._pending.setdefault(user_id, when)
+                return 0
+            with self._lock:
+                self._stats['written'] += written
+                self._stats['flushes'] += 1
+            return written
+
+    def shutdown(self, timeout=None):
+        """Stop the flush thread and write whatever is still pending"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid() and thread.is_alive():
+            thread.join(timeout)
+        if self._pid == os.getpid():
+            self.flush()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._pending)
+        return stats
+
+
+last_login_recorder = LastLoginRecorder(LoginConfig.LAST_LOGIN_FLUSH_INTERVAL, LoginConfig.LAST_LOGIN_BATCH_SIZE)
+atexit.register(last_login_recorder.shutdown)
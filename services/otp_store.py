@@ -0,0 +1,161 @@
+# services/otp_store.py
+import heapq
+import hmac
+import threading
+import time
+from datetime import datetime, timedelta
+from config import DatabaseConfig, OTPConfig
+
+
+class OTPStore:
+    """Password reset OTPs held in memory with min-heap expiry.
+
+    Lookups are a dict access; expired entries are popped off the heap as
+    time passes. consume() checks and removes a token under one lock, so an
+    OTP can be used only once. With write_through, tokens are also written
+    to password_reset_tokens so they survive restarts, and consume() checks
+    them there; that costs a database round trip per issue and per check.
+    """
+
+    def __init__(self, ttl_seconds, write_through):
+        self.ttl_seconds = ttl_seconds
+        self.write_through = write_through
+        self._tokens = {}
+        self._expiry = []
+        self._version = 0
+        self._lock = threading.Lock()
+        self._stats = {'issued': 0, 'consumed': 0, 'rejected': 0, 'expired': 0, 'db_fallbacks': 0}
+
+    def _expire(self, now):
+        # Heap entries are (deadline, version, email); stale versions were replaced
+        while self._expiry and self._expiry[0][0] <= now:
+            _, version, email = heapq.heappop(self._expiry)
+            entry = self._tokens.get(email)
+            if entry is not None and entry[2] == version:
+                del self._tokens[email]
+                self._stats['expired'] += 1
+
+    def put(self, email, otp):
+        """Store a fresh OTP for email, replacing any earlier one; returns False if write-through failed"""
+        if self.write_through and not self._write(email, otp):
+            return False
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self._version += 1
+            deadline = now + self.ttl_seconds
+            self._tokens[email] = (otp, deadline, self._version)
+            heapq.heappush(self._expiry, (deadline, self._version, email))
+            self._stats['issued'] += 1
+        return True
+
+    def consume(self, email, otp):
+        """Atomically check and use up an OTP.
+
+        With write_through the database decides: an in-memory match still has
+        to be marked used there (it may have been replaced or used through
+        another process), and a miss or mismatch is checked there too. The
+        in-memory entry is dropped only once the database has used the token,
+        so a failed database call leaves the OTP usable for a retry.
+        """
+        if not email or not otp:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._tokens.get(email)
+            matched = entry is not None and hmac.compare_digest(entry[0].encode(), str(otp).encode())
+            if not self.write_through:
+                if matched:
+                    del self._tokens[email]
+                    self._stats['consumed'] += 1
+                else:
+                    self._stats['rejected'] += 1
+                return matched
+            if not matched:
+                # Issued by another process or before a restart
+                self._stats['db_fallbacks'] += 1
+
+        used = self._mark_used(email, otp)
+        with self._lock:
+            if used and entry is not None:
+                # Used up, or replaced by a newer token issued elsewhere
+                current = self._tokens.get(email)
+                if current is not None and current[2] == entry[2]:
+                    del self._tokens[email]
+            self._stats['consumed' if used else 'rejected'] += 1
+        return used
+
+    def _write(self, email, otp):
+        with DatabaseConfig.connection() as connection:
+            if not connection:
+                return False
+            cursor = None
+            try:
+                cursor = connection.cursor()
+                expires_at = datetime.now() + timedelta(seconds=self.ttl_seconds)
+                cursor.execute("DELETE FROM password_reset_tokens WHERE email = %s", (email,))
+                cursor.execute(
+                    "INSERT INTO password_reset_tokens (email, token, expires_at) VALUES (%s, %s, %s)",
+                    (email, otp, expires_at)
+                )
+                connection.commit()
+                return True
+            except Exception as e:
+                print(f"Reset token write error: {e}")
+                return False
+            finally:
+                if cursor:
+                    cursor.close()
+
+    def _mark_used(self, email, otp):
+        """Single-use check and update in one statement; True if a live token was consumed"""
+        with DatabaseConfig.connection() as connection:
+            if not connection:
+                return False
+            cursor = None
+            try:
+                cursor = connection.cursor()
+                cursor.execute("""
+                    UPDATE password_reset_tokens SET is_used = TRUE
+                    WHERE email = %s AND token = %s AND is_used = FALSE AND expires_at > NOW()
+                """, (email, otp))
+                connection.commit()
+                return cursor.rowcount > 0
+            except Exception as e:
+                print(f"Token verification error: {e}")
+                return False
+            finally:
+                if cursor:
+                    cursor.close()
+
+    def stats(self):
+        with self._lock:
+            self._expire(time.monotonic())
+            stats = dict(self._stats)
+            stats['live'] = len(self._tokens)
+        return stats
+
+
+def purge_expired_tokens(batch_size=OTPConfig.OTP_PURGE_BATCH):
+    """Delete expired and used rows from password_reset_tokens in small batches; returns rows removed"""
+    removed = 0
+    with DatabaseConfig.connection() as connection:
+        if not connection:
+            return removed
+        cursor = connection.cursor()
+        try:
+            while True:
+                cursor.execute(
+                    "DELETE FROM password_reset_tokens WHERE expires_at < NOW() OR is_used = TRUE LIMIT %s",
+                    (batch_size,)
+                )
+                connection.commit()
+                removed += cursor.rowcount
+                if cursor.rowcount < batch_size:
+                    return removed
+        finally:
+            cursor.close()
+
+
+otp_store = OTPStore(OTPConfig.OTP_TTL_MINUTES * 60, OTPConfig.OTP_WRITE_THROUGH)
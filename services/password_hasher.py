@@ -0,0 +1,213 @@
+# services/password_hasher.py
+import base64
+import hashlib
+import hmac
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from config import SecurityConfig
+
+
+class HasherBusyError(Exception):
+    """Raised when the hashing queue is full or a job does not finish in time"""
+
+
+def _b64(data):
+    return base64.b64encode(data).decode().rstrip('=')
+
+
+def _unb64(text):
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+
+class Sha256LegacyHasher:
+    """Unsalted SHA-256 hex digests, as written by earlier versions"""
+
+    name = 'sha256-legacy'
+
+    def identifies(self, encoded):
+        return len(encoded) == 64 and all(c in '0123456789abcdef' for c in encoded)
+
+    def hash(self, password):
+        return hashlib.sha256(password.encode()).hexdigest()
+
+    def verify(self, password, encoded):
+        return hmac.compare_digest(self.hash(password), encoded)
+
+    def needs_rehash(self, encoded):
+        return False
+
+
+class Pbkdf2Hasher:
+    """PBKDF2-HMAC-SHA256: $pbkdf2-sha256$<iterations>$<salt>$<hash>"""
+
+    name = 'pbkdf2'
+    prefix = '$pbkdf2-sha256$'
+
+    def __init__(self, iterations):
+        self.iterations = iterations
+
+    def identifies(self, encoded):
+        return encoded.startswith(self.prefix)
+
+    def hash(self, password):
+        salt = os.urandom(16)
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, self.iterations)
+        return f"{self.prefix}{self.iterations}${_b64(salt)}${_b64(digest)}"
+
+    def verify(self, password, encoded):
+        iterations, salt, digest = encoded[len(self.prefix):].split('$')
+        expected = _unb64(digest)
+        actual = hashlib.pbkdf2_hmac('sha256', password.encode(), _unb64(salt), int(iterations))
+        return hmac.compare_digest(actual, expected)
+
+    def needs_rehash(self, encoded):
+        return int(encoded[len(self.prefix):].split('$')[0]) != self.iterations
+
+
+class ScryptHasher:
+    """scrypt: $scrypt$n=<n>,r=<r>,p=<p>$<salt>$<hash>"""
+
+    name = 'scrypt'
+    prefix = '$scrypt$'
+
+    def __init__(self, n, r, p):
+        self.n = n
+        self.r = r
+        self.p = p
+
+    def identifies(self, encoded):
+        return encoded.startswith(self.prefix)
+
+    @staticmethod
+    def _derive(password, salt, n, r, p):
+        # Leave headroom above the 128*n*r bytes scrypt needs
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                              maxmem=256 * n * r + 1024 * 1024, dklen=32)
+
+    def hash(self, password):
+        salt = os.urandom(16)
+        digest = self._derive(password, salt, self.n, self.r, self.p)
+        return f"{self.prefix}n={self.n},r={self.r},p={self.p}${_b64(salt)}${_b64(digest)}"
+
+    @staticmethod
+    def _params(encoded):
+        params, salt, digest = encoded[len(ScryptHasher.prefix):].split('$')
+        values = dict(item.split('=') for item in params.split(','))
+        return int(values['n']), int(values['r']), int(values['p']), salt, digest
+
+    def verify(self, password, encoded):
+        n, r, p, salt, digest = self._params(encoded)
+        return hmac.compare_digest(self._derive(password, _unb64(salt), n, r, p), _unb64(digest))
+
+    def needs_rehash(self, encoded):
+        return self._params(encoded)[:3] != (self.n, self.r, self.p)
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords on a bounded worker pool.
+
+    The KDFs release the GIL, so `workers` threads hash in parallel while
+    request threads wait on their own result; at most `queue_limit` jobs
+    may be waiting before new ones are refused with HasherBusyError.
+    """
+
+    def __init__(self, default, hashers, workers, queue_limit, timeout):
+        self.default = default
+        self.hashers = hashers
+        self.timeout = timeout
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hasher')
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+
+    def identify(self, encoded):
+        for hasher in self.hashers:
+            if hasher.identifies(encoded):
+                return hasher
+        return None
+
+    def _submit(self, fn, *args, wait=False):
+        acquired = self._slots.acquire(timeout=self.timeout) if wait else self._slots.acquire(blocking=False)
+        if not acquired:
+            raise HasherBusyError("Too many password hashing jobs queued")
+        try:
+            future = self._pool.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _result(self, future):
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError as e:
+            raise HasherBusyError("Password hashing timed out") from e
+
+    def _run(self, fn, *args):
+        return self._result(self._submit(fn, *args))
+
+    def hash(self, password):
+        """Encode a password with the default KDF"""
+        return self._run(self.default.hash, password)
+
+    def hash_many(self, passwords):
+        """Encode passwords in parallel with the default KDF, for bulk jobs.
+
+        At most `workers` jobs are in flight at once, so the queue stays open
+        for logins. Returns a list in input order holding each hash, or the
+        HasherBusyError for a password that could not be hashed.
+        """
+        results = [None] * len(passwords)
+        in_flight = deque()
+
+        def collect():
+            index, future = in_flight.popleft()
+            try:
+                results[index] = self._result(future)
+            except HasherBusyError as e:
+                results[index] = e
+
+        for index, password in enumerate(passwords):
+            if len(in_flight) >= self.workers:
+                collect()
+            try:
+                in_flight.append((index, self._submit(self.default.hash, password, wait=True)))
+            except HasherBusyError as e:
+                results[index] = e
+        while in_flight:
+            collect()
+        return results
+
+    def verify(self, password, encoded):
+        """Return (matches, needs_rehash) for a stored hash of any supported scheme.
+
+        A malformed stored hash never matches.
+        """
+        hasher = self.identify(encoded or '')
+        if hasher is None:
+            return False, False
+        try:
+            matches = self._run(hasher.verify, password, encoded)
+        except (ValueError, KeyError) as e:
+            print(f"Malformed {hasher.name} password hash: {e}")
+            return False, False
+        return matches, matches and (hasher is not self.default or hasher.needs_rehash(encoded))
+
+
+def build_hasher(name=SecurityConfig.PASSWORD_HASHER, iterations=SecurityConfig.PBKDF2_ITERATIONS,
+                 n=SecurityConfig.SCRYPT_N, r=SecurityConfig.SCRYPT_R, p=SecurityConfig.SCRYPT_P,
+                 workers=SecurityConfig.HASH_WORKERS, queue_limit=SecurityConfig.HASH_QUEUE_LIMIT):
+    hashers = {
+        'scrypt': ScryptHasher(n, r, p),
+        'pbkdf2': Pbkdf2Hasher(iterations),
+        'sha256-legacy': Sha256LegacyHasher(),
+    }
+    if name not in hashers:
+        raise ValueError(f"Unknown PASSWORD_HASHER: {name}")
+    return PasswordHasher(hashers[name], list(hashers.values()), workers, queue_limit,
+                          SecurityConfig.HASH_TIMEOUT)
+
+
+password_hasher = build_hasher()
@@ -0,0 +1,440 @@
+# services/proctoring_events.py
+import atexit
+import json
+import os
+import re
+import struct
+import threading
+import time
+from array import array
+from config import ProctoringConfig
+
+EVENT_TYPES = (
+    'tab_hidden', 'tab_visible', 'window_blur', 'window_focus',
+    'copy', 'cut', 'paste', 'context_menu', 'fullscreen_exit', 'fullscreen_enter',
+)
+EVENT_CODES = {name: code for code, name in enumerate(EVENT_TYPES)}
+# Candidate leaves the exam with the first of these and is back with the first of the others
+AWAY_START = {EVENT_CODES['tab_hidden'], EVENT_CODES['window_blur']}
+AWAY_END = {EVENT_CODES['tab_visible'], EVENT_CODES['window_focus']}
+
+# Segment block: magic, event count, base timestamp (ms), then the columns
+# uint32 ms offsets from base and uint8 event codes
+BLOCK_MAGIC = b'PEV1'
+BLOCK_HEADER = struct.Struct('<4sIq')
+MAX_OFFSET = 2 ** 32 - 1
+
+ATTEMPT_ID = re.compile(r'^[0-9a-f]{32}$')
+# Client-chosen id of a posted batch, reused when the batch is retried
+BATCH_ID = re.compile(r'^[0-9a-f]{16,32}$')
+# Batch ids remembered per attempt for dropping retried duplicates
+RECENT_BATCHES = 256
+PRIVATE_KEYS = ('bytes', 'away_since', 'batches')
+
+
+class IngestBacklogError(Exception):
+    """Raised when more events are buffered than the writer has caught up with"""
+
+
+def new_summary():
+    return {'events': 0, 'counts': {}, 'first_ts': None, 'last_ts': None,
+            'away_ms': 0, 'away_since': None, 'bytes': 0, 'batches': []}
+
+
+def fold(summary, timestamps, codes):
+    """Add events (in time order, none earlier than summary['last_ts']) to a per-attempt summary in place"""
+    if not timestamps:
+        return
+    counts = summary['counts']
+    away_since = summary['away_since']
+    away_ms = summary['away_ms']
+    for ts, code in zip(timestamps, codes):
+        name = EVENT_TYPES[code]
+        counts[name] = counts.get(name, 0) + 1
+        if code in AWAY_START:
+            if away_since is None:
+                away_since = ts
+        elif code in AWAY_END and away_since is not None:
+            away_ms += max(ts - away_since, 0)
+            away_since = None
+    summary['away_ms'] = away_ms
+    summary['away_since'] = away_since
+    summary['events'] += len(timestamps)
+    if summary['first_ts'] is None:
+        summary['first_ts'] = timestamps[0]
+    summary['last_ts'] = timestamps[-1]
+
+
+def encode_block(timestamps, codes):
+    base = timestamps[0]
+    offsets = array('I', [ts - base for ts in timestamps])
+    return BLOCK_HEADER.pack(BLOCK_MAGIC, len(offsets), base) + offsets.tobytes() + array('B', codes).tobytes()
+
+
+def read_blocks(path):
+    """Yield (end offset, timestamps, codes) per complete block; stops at a torn tail"""
+    with open(path, 'rb') as segment:
+        data = segment.read()
+    position = 0
+    while position + BLOCK_HEADER.size <= len(data):
+        magic, count, base = BLOCK_HEADER.unpack_from(data, position)
+        end = position + BLOCK_HEADER.size + count * 5
+        if magic != BLOCK_MAGIC or end > len(data):
+            return
+        offsets = array('I')
+        offsets.frombytes(data[position + BLOCK_HEADER.size:end - count])
+        codes = array('B', data[end - count:end])
+        yield end, [base + offset for offset in offsets], list(codes)
+        position = end
+
+
+class AttemptEvents:
+    __slots__ = ('summary', 'seen', 'timestamps', 'codes', 'touched')
+
+    def __init__(self, summary):
+        summary.setdefault('batches', [])
+        self.summary = summary
+        self.seen = set(summary['batches'])
+        self.timestamps = []
+        self.codes = []
+        self.touched = time.monotonic()
+
+
+class EventStore:
+    """Append-only store of proctoring events, one segment file per attempt.
+
+    append() validates a batch, folds it into the attempt's running summary
+    and buffers it; a background thread writes every attempt's buffered
+    events each `flush_interval` seconds as one columnar block appended to
+    <directory>/exam_<id>/<attempt_id>.seg. Summaries are served from memory
+    and checkpointed to <attempt_id>.sum next to the segment when an attempt
+    goes idle; a checkpoint that does not match the segment's size (e.g.
+    after a crash) is rebuilt from the segment.
+
+    Each batch carries an id; a retried batch whose id was already accepted
+    is dropped. A batch older than events already summarized (batches can
+    arrive out of order) has the attempt's summary rebuilt from all of its
+    events in time order. Segment files are only read for a rebuild and
+    repaired under the writer's flush lock.
+
+    The files are owned by a single writer process.
+    """
+
+    def __init__(self, directory, flush_interval, max_batch, max_buffered, idle_ttl, max_skew):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_buffered = max_buffered
+        self.idle_ttl = idle_ttl
+        self.max_skew = max_skew
+        self._attempts = {}
+        self._buffered = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._stats = {'batches': 0, 'events': 0, 'duplicates': 0, 'rejected': 0, 'written': 0, 'blocks': 0,
+                       'flushes': 0, 'rebuilt': 0, 'resorted': 0, 'errors': 0}
+
+    def start(self):
+        """Start the writer thread for this process (threads do not survive fork)"""
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='proctoring-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def _path(self, exam_id, attempt_id, suffix):
+        return os.path.join(self.directory, f"exam_{int(exam_id)}", attempt_id + suffix)
+
+    def parse(self, base, events, now_ms=None):
+        """Validate a posted batch of [code, ms offset] pairs; returns (timestamps, codes) in time order"""
+        if not isinstance(base, int) or isinstance(base, bool):
+            raise ValueError("base must be a millisecond timestamp")
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        if abs(base - now_ms) > self.max_skew * 1000:
+            raise ValueError("base is too far from the server clock")
+        if not isinstance(events, list) or not events:
+            raise ValueError("events must be a non-empty list")
+        if len(events) > self.max_batch:
+            raise ValueError(f"At most {self.max_batch} events per batch")
+        kinds = len(EVENT_TYPES)
+        pairs = []
+        for event in events:
+            if not isinstance(event, list) or len(event) != 2:
+                raise ValueError("Each event must be [code, offset]")
+            code, offset = event
+            if type(code) is not int or not 0 <= code < kinds:
+                raise ValueError(f"Unknown event code {code!r}")
+            if type(offset) is not int or not 0 <= offset <= MAX_OFFSET:
+                raise ValueError(f"Invalid event offset {offset!r}")
+            pairs.append((base + offset, code))
+        pairs.sort()
+        return [ts for ts, _ in pairs], [code for _, code in pairs]
+
+    def append(self, exam_id, attempt_id, batch_id, base, events):
+        """Validate and buffer one batch; returns the number of events accepted (0 for a retried batch)"""
+        if not ATTEMPT_ID.match(attempt_id):
+            raise ValueError("Invalid attempt id")
+        if not isinstance(batch_id, str) or not BATCH_ID.match(batch_id):
+            raise ValueError("batch must be a 16-32 character hex id")
+        timestamps, codes = self.parse(base, events)
+        with self._lock:
+            if self._buffered + len(codes) > self.max_buffered:
+                self._stats['rejected'] += len(codes)
+                raise IngestBacklogError("Too many events waiting to be written")
+        self.start()
+        attempt = self._get(exam_id, attempt_id)
+        with self._lock:
+            if batch_id in attempt.seen:
+                self._stats['duplicates'] += 1
+                return 0
+            summary = attempt.summary
+            in_order = summary['last_ts'] is None or timestamps[0] >= summary['last_ts']
+            self._buffer(attempt, batch_id, timestamps, codes)
+            if in_order:
+                fold(summary, timestamps, codes)
+                return len(codes)
+        # An earlier stretch of the timeline: away time has to be recomputed in order
+        self._resort(exam_id, attempt_id, attempt)
+        return len(codes)
+
+    def _buffer(self, attempt, batch_id, timestamps, codes):
+        """Queue a batch for writing and remember its id; caller holds _lock"""
+        if attempt.timestamps and timestamps[0] < attempt.timestamps[-1]:
+            # Keep each written block in time order
+            merged = sorted(zip(attempt.timestamps + timestamps, attempt.codes + codes))
+            attempt.timestamps = [ts for ts, _ in merged]
+            attempt.codes = [code for _, code in merged]
+        else:
+            attempt.timestamps.extend(timestamps)
+            attempt.codes.extend(codes)
+        batches = attempt.summary['batches']
+        batches.append(batch_id)
+        attempt.seen.add(batch_id)
+        if len(batches) > RECENT_BATCHES:
+            attempt.seen.discard(batches.pop(0))
+        attempt.touched = time.monotonic()
+        self._buffered += len(codes)
+        self._stats['batches'] += 1
+        self._stats['events'] += len(codes)
+
+    def _resort(self, exam_id, attempt_id, attempt):
+        """Rebuild an attempt's summary from its written and buffered events in time order"""
+        with self._flush_lock:
+            # The writer is idle, so the segment holds exactly summary['bytes'] worth of events
+            segment = self._path(exam_id, attempt_id, '.seg')
+            pairs = []
+            if os.path.exists(segment):
+                for _, timestamps, codes in read_blocks(segment):
+                    pairs.extend(zip(timestamps, codes))
+            with self._lock:
+                pairs.extend(zip(attempt.timestamps, attempt.codes))
+                pairs.sort()
+                summary = new_summary()
+                fold(summary, [ts for ts, _ in pairs], [code for _, code in pairs])
+                summary['bytes'] = attempt.summary['bytes']
+                summary['batches'] = attempt.summary['batches']
+                attempt.summary = summary
+                self._stats['resorted'] += 1
+
+    def _get(self, exam_id, attempt_id):
+        key = (exam_id, attempt_id)
+        with self._lock:
+            attempt = self._attempts.get(key)
+        if attempt is not None:
+            return attempt
+        summary = self._load_summary(exam_id, attempt_id)
+        with self._lock:
+            attempt = self._attempts.get(key)
+            if attempt is None:
+                attempt = self._attempts[key] = AttemptEvents(summary)
+            return attempt
+
+    def _load_summary(self, exam_id, attempt_id):
+        """The checkpointed summary, rebuilt from the segment (truncating a torn tail) if stale.
+
+        Runs under the flush lock so the writer cannot append to the segment meanwhile.
+        """
+        segment = self._path(exam_id, attempt_id, '.seg')
+        with self._flush_lock:
+            size = os.path.getsize(segment) if os.path.exists(segment) else 0
+            try:
+                with open(self._path(exam_id, attempt_id, '.sum'), encoding='utf-8') as checkpoint:
+                    summary = json.load(checkpoint)
+                if summary.get('bytes') == size:
+                    return summary
+            except (OSError, ValueError):
+                pass
+            summary = new_summary()
+            if size:
+                pairs = []
+                for end, timestamps, codes in read_blocks(segment):
+                    pairs.extend(zip(timestamps, codes))
+                    summary['bytes'] = end
+                # Blocks are each in time order, but a late batch can be written after newer ones
+                pairs.sort()
+                fold(summary, [ts for ts, _ in pairs], [code for _, code in pairs])
+                if summary['bytes'] != size:
+                    with open(segment, 'r+b') as torn:
+                        torn.truncate(summary['bytes'])
+                with self._lock:
+                    self._stats['rebuilt'] += 1
+            return summary
+
+    def summary(self, exam_id, attempt_id):
+        """Aggregates for one attempt (counts per event type, away time, first/last event), or None"""
+        if not ATTEMPT_ID.match(attempt_id):
+            return None
+        with self._lock:
+            attempt = self._attempts.get((exam_id, attempt_id))
+            if attempt is not None:
+                return self._public(attempt.summary)
+        if not os.path.exists(self._path(exam_id, attempt_id, '.seg')):
+            return None
+        return self._public(self._load_summary(exam_id, attempt_id))
+
+    def exam_summaries(self, exam_id):
+        """{attempt_id: summary} for every attempt of an exam with recorded events"""
+        folder = os.path.join(self.directory, f"exam_{int(exam_id)}")
+        attempt_ids = set()
+        if os.path.isdir(folder):
+            attempt_ids.update(name[:-4] for name in os.listdir(folder) if name.endswith('.seg'))
+        with self._lock:
+            attempt_ids.update(attempt_id for exam, attempt_id in self._attempts if exam == exam_id)
+        summaries = {}
+        for attempt_id in sorted(attempt_ids):
+            summary = self.summary(exam_id, attempt_id)
+            if summary is not None:
+                summaries[attempt_id] = summary
+        return summaries
+
+    @staticmethod
+    def _public(summary):
+        public = {key: value for key, value in summary.items() if key not in PRIVATE_KEYS}
+        public['counts'] = dict(summary['counts'])
+        public['away_now'] = summary['away_since'] is not None
+        return public
+
+    def events(self, exam_id, attempt_id):
+        """Yield (timestamp ms, event type) for every written event of an attempt"""
+        segment = self._path(exam_id, attempt_id, '.seg')
+        if not ATTEMPT_ID.match(attempt_id) or not os.path.exists(segment):
+            return
+        for _, timestamps, codes in read_blocks(segment):
+            for ts, code in zip(timestamps, codes):
+                yield ts, EVENT_TYPES[code]
+
+    def flush(self):
+        """Append every attempt's buffered events to its segment; returns the number of events written"""
+        with self._flush_lock:
+            with self._lock:
+                batches = []
+                for (exam_id, attempt_id), attempt in self._attempts.items():
+                    if attempt.timestamps:
+                        batches.append((exam_id, attempt_id, attempt, attempt.timestamps, attempt.codes))
+                        attempt.timestamps = []
+                        attempt.codes = []
+            written = 0
+            for exam_id, attempt_id, attempt, timestamps, codes in batches:
+                try:
+                    size = self._write(exam_id, attempt_id, timestamps, codes)
+                except Exception as e:
+                    print(f"Error writing proctoring events for attempt {attempt_id}: {e}")
+                    with self._lock:
+                        self._stats['errors'] += 1
+                        # Put them back in front of anything that arrived meanwhile
+                        attempt.timestamps = timestamps + attempt.timestamps
+                        attempt.codes = codes + attempt.codes
+                    continue
+                with self._lock:
+                    attempt.summary['bytes'] = size
+                    self._buffered -= len(codes)
+                written += len(codes)
+            self._evict()
+            with self._lock:
+                self._stats['written'] += written
+                self._stats['blocks'] += len(batches)
+                self._stats['flushes'] += 1 if batches else 0
+            return written
+
+    def _write(self, exam_id, attempt_id, timestamps, codes):
+        """Append one block per 2**32 ms span; returns the segment size"""
+        path = self._path(exam_id, attempt_id, '.seg')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'ab') as segment:
+            size = segment.tell()
+            try:
+                start = 0
+                for index in range(1, len(timestamps) + 1):
+                    if index == len(timestamps) or timestamps[index] - timestamps[start] > MAX_OFFSET:
+                        segment.write(encode_block(timestamps[start:index], codes[start:index]))
+                        start = index
+                segment.flush()
+            except OSError:
+                # Never leave a partial block in front of the retried one
+                segment.truncate(size)
+                raise
+            return segment.tell()
+
+    def _checkpoint(self, exam_id, attempt_id, summary):
+        path = self._path(exam_id, attempt_id, '.sum')
+        with open(path + '.tmp', 'w', encoding='utf-8') as checkpoint:
+            json.dump(summary, checkpoint, separators=(',', ':'))
+        os.replace(path + '.tmp', path)
+
+    def _evict(self, everything=False):
+        """Checkpoint and drop written attempts that have gone idle"""
+        cutoff = time.monotonic() - self.idle_ttl
+        with self._lock:
+            idle = [(key, attempt) for key, attempt in self._attempts.items()
+                    if not attempt.timestamps and (everything or attempt.touched < cutoff)]
+        for (exam_id, attempt_id), attempt in idle:
+            with self._lock:
+                summary = dict(attempt.summary, counts=dict(attempt.summary['counts']),
+                               batches=list(attempt.summary['batches']))
+            if not summary['bytes']:
+                continue
+            try:
+                self._checkpoint(exam_id, attempt_id, summary)
+            except OSError as e:
+                print(f"Error checkpointing proctoring summary for attempt {attempt_id}: {e}")
+                continue
+            with self._lock:
+                if not attempt.timestamps and summary['events'] == attempt.summary['events']:
+                    self._attempts.pop((exam_id, attempt_id), None)
+
+    def shutdown(self, timeout=None):
+        """Stop the writer thread, write what is buffered and checkpoint every summary"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid() and thread.is_alive():
+            thread.join(timeout)
+        if self._pid == os.getpid():
+            self.flush()
+            self._evict(everything=True)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['attempts'] = len(self._attempts)
+            stats['buffered'] = self._buffered
+        return stats
+
+
+event_store = EventStore(
+    ProctoringConfig.PROCTORING_DIR,
+    ProctoringConfig.PROCTORING_FLUSH_INTERVAL,
+    ProctoringConfig.PROCTORING_MAX_BATCH,
+    ProctoringConfig.PROCTORING_MAX_BUFFERED,
+    ProctoringConfig.PROCTORING_IDLE_TTL,
+    ProctoringConfig.PROCTORING_MAX_SKEW,
+)
+atexit.register(event_store.shutdown)
@@ -0,0 +1,231 @@
+# services/ranking.py
+import os
+import threading
+import time
+from datetime import datetime
+from config import DatabaseConfig
+
+
+class ScoreRanking:
+    """Counts of integer scores in a Fenwick (binary indexed) tree.
+
+    Bucket i holds the number of submissions that scored low + i, so adding
+    a score and counting the scores below one are both O(log range), and
+    rank, percentile and the k-th lowest score follow from those counts. A
+    score outside the current range grows it, rebuilding the tree in O(range).
+    """
+
+    def __init__(self, low=0, high=0):
+        self.low = low
+        self.n = 0
+        self._counts = [0] * (high - low + 1)
+        self._tree = [0] * (len(self._counts) + 1)
+
+    def _build(self):
+        tree = [0] + self._counts
+        for index in range(1, len(tree)):
+            parent = index + (index & -index)
+            if parent < len(tree):
+                tree[parent] += tree[index]
+        self._tree = tree
+
+    def _grow(self, score):
+        low = min(self.low, score)
+        high = max(self.low + len(self._counts) - 1, score)
+        self._counts = [0] * (self.low - low) + self._counts + [0] * (high - self.low - len(self._counts) + 1)
+        self.low = low
+        self._build()
+
+    def add(self, score, count=1):
+        index = score - self.low
+        if index < 0 or index >= len(self._counts):
+            self._grow(score)
+            index = score - self.low
+        self._counts[index] += count
+        self.n += count
+        index += 1
+        tree = self._tree
+        while index < len(tree):
+            tree[index] += count
+            index += index & -index
+
+    def count_below(self, score):
+        """Number of scores strictly lower than `score`"""
+        index = min(max(score - self.low, 0), len(self._counts))
+        total = 0
+        tree = self._tree
+        while index > 0:
+            total += tree[index]
+            index -= index & -index
+        return total
+
+    def count_at(self, score):
+        index = score - self.low
+        return self._counts[index] if 0 <= index < len(self._counts) else 0
+
+    def rank(self, score):
+        """1 + number of scores strictly higher (ties share a rank)"""
+        return self.n - self.count_below(score + 1) + 1
+
+    def percentile(self, score):
+        """Percentile rank: share of scores below, counting ties as half, in percent"""
+        if not self.n:
+            return None
+        return 100.0 * (self.count_below(score) + 0.5 * self.count_at(score)) / self.n
+
+    def kth(self, k):
+        """The k-th lowest score (1-based), by descending the tree"""
+        if not 1 <= k <= self.n:
+            return None
+        position = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        tree = self._tree
+        while step:
+            following = position + step
+            if following < len(tree) and tree[following] < k:
+                position = following
+                k -= tree[following]
+            step >>= 1
+        return self.low + position
+
+
+class Rankings:
+    """A ScoreRanking per exam, rebuilt from stored submissions and fed by record().
+
+    load() reads score counts for submissions made before it started; record()
+    only adds submissions graded after that, so none is counted twice.
+    Submissions still queued in the write-behind writer at load time are the
+    only ones it can miss.
+
+    Requests never run load(): start() runs it on a background thread,
+    retrying with exponential backoff while storage is unavailable, and
+    standing()/distribution() return None until it has succeeded.
+    """
+
+    def __init__(self, retry_delay=1.0, max_retry_delay=60.0):
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._exams = {}
+        self._lock = threading.Lock()
+        self._cutoff = None
+        self._loaded = threading.Event()
+        self._load_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._load_errors = 0
+
+    def start(self):
+        """Load the rankings on a background thread for this process, unless already loaded"""
+        if self._loaded.is_set():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='rankings-loader', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        delay = self.retry_delay
+        while not self.load():
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_retry_delay)
+
+    def ready(self):
+        """Whether the stored scores have been loaded"""
+        return self._loaded.is_set()
+
+    def load(self):
+        """Rebuild every exam's ranking from storage, once per process; False if storage is unavailable"""
+        if self._loaded.is_set():
+            return True
+        with self._load_lock:
+            if self._loaded.is_set():
+                return True
+            with self._lock:
+                self._cutoff = datetime.now()
+            return self._load()
+
+    def _load(self):
+        try:
+            with DatabaseConfig.connection() as connection:
+                if not connection:
+                    raise RuntimeError("Database connection failed")
+                cursor = connection.cursor()
+                try:
+                    cursor.execute(
+                        "SELECT exam_id, score, COUNT(*) FROM submissions "
+                        "WHERE submitted_at < %s GROUP BY exam_id, score",
+                        (self._cutoff,)
+                    )
+                    rows = cursor.fetchall()
+                finally:
+                    cursor.close()
+        except Exception as e:
+            print(f"Error loading exam rankings: {e}")
+            with self._lock:
+                self._cutoff = None
+                self._exams.clear()
+                self._load_errors += 1
+            return False
+
+        with self._lock:
+            for exam_id, score, count in rows:
+                self._ranking(exam_id).add(int(score), int(count))
+        self._loaded.set()
+        return True
+
+    def _ranking(self, exam_id):
+        ranking = self._exams.get(exam_id)
+        if ranking is None:
+            ranking = self._exams[exam_id] = ScoreRanking()
+        return ranking
+
+    def record(self, exam_id, score, submitted_at):
+        """Count a freshly graded submission"""
+        with self._lock:
+            if self._cutoff is not None and submitted_at >= self._cutoff:
+                self._ranking(exam_id).add(score)
+
+    def forget(self, exam_id):
+        with self._lock:
+            self._exams.pop(exam_id, None)
+
+    def standing(self, exam_id, score):
+        """{'rank', 'of', 'percentile'} of `score` among the exam's submissions, or None"""
+        if not self._loaded.is_set():
+            self.start()
+            return None
+        with self._lock:
+            ranking = self._exams.get(exam_id)
+            if ranking is None or not ranking.n:
+                return None
+            return {'rank': ranking.rank(score), 'of': ranking.n, 'percentile': ranking.percentile(score)}
+
+    def distribution(self, exam_id):
+        """Submission count and score quartiles/top of an exam, or None"""
+        if not self._loaded.is_set():
+            self.start()
+            return None
+        with self._lock:
+            ranking = self._exams.get(exam_id)
+            if ranking is None or not ranking.n:
+                return None
+            n = ranking.n
+            return {
+                'submissions': n,
+                'lowest': ranking.kth(1),
+                'lower_quartile': ranking.kth((n + 3) // 4),
+                'median': ranking.kth((n + 1) // 2),
+                'upper_quartile': ranking.kth((3 * n + 3) // 4),
+                'highest': ranking.kth(n),
+            }
+
+    def stats(self):
+        with self._lock:
+            return {'loaded': self._loaded.is_set(), 'load_errors': self._load_errors, 'exams': len(self._exams),
+                    'submissions': sum(ranking.n for ranking in self._exams.values())}
+
+
+rankings = Rankings()
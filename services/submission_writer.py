@@ -0,0 +1,250 @@
+# services/submission_writer.py
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from mysql.connector import errors
+from config import DatabaseConfig, SubmissionConfig
+
+# A retried or replayed row is a no-op (submission_uuid is unique); bad data still raises
+INSERT_SUBMISSIONS = (
+    "INSERT INTO submissions "
+    "(submission_uuid, exam_id, digital_id_hash, answers, score, total, submitted_at) "
+    "VALUES (%s, %s, %s, %s, %s, %s, %s) "
+    "ON DUPLICATE KEY UPDATE id = id"
+)
+
+_STOP = object()
+
+# Errors a retry cannot fix: the rows themselves are bad (e.g. an exam deleted under them)
+PERMANENT_ERRORS = (errors.IntegrityError, errors.DataError, errors.ProgrammingError, errors.NotSupportedError,
+                    TypeError, ValueError)
+
+
+class SubmissionWriter:
+    """Write-behind queue for graded submissions.
+
+    Requests enqueue a row and return; a background thread collects rows for
+    up to `flush_interval` seconds (or `batch_size` rows) and writes each
+    batch with one multi-row INSERT and one commit (group commit).
+
+    Transient failures (lost connection, lock timeouts) are retried until
+    they clear. A batch that keeps failing with a permanent error is split
+    in halves until the bad rows are isolated; those go to the spool file
+    and the rest are written. Rows spooled on shutdown or dead-lettered are
+    replayed when the writer next starts; rows that fail again are spooled
+    again, so nothing is dropped.
+    """
+
+    def __init__(self, batch_size, flush_interval, max_queue, enqueue_timeout, spool_file, max_attempts=3):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.spool_file = spool_file
+        self.max_attempts = max_attempts
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stopping = False
+        self._stats = {
+            'enqueued': 0,
+            'written': 0,
+            'batches': 0,
+            'retries': 0,
+            'spooled': 0,
+            'dead_lettered': 0,
+            'replayed': 0,
+            'rejected': 0,
+        }
+
+    def start(self):
+        """Start the writer thread for this process (threads do not survive fork)"""
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='submission-writer', daemon=True)
+            self._thread.start()
+
+    def submit(self, row):
+        """Queue one submission row; blocks while the queue is full and raises queue.Full on timeout"""
+        if self._stopping:
+            raise queue.Full("Submission writer is shutting down")
+        self.start()
+        try:
+            self._queue.put(row, timeout=self.enqueue_timeout)
+        except queue.Full:
+            with self._lock:
+                self._stats['rejected'] += 1
+            raise
+        with self._lock:
+            self._stats['enqueued'] += 1
+
+    def _run(self):
+        self.replay_spool()
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect()
+            if batch:
+                self._write(batch, final=stopping)
+
+    def _collect(self):
+        """Block for the first row, then gather more until the batch is full or the interval ends"""
+        first = self._queue.get()
+        if first is _STOP:
+            return self._drain_nowait(), True
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                row = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if row is _STOP:
+                batch.extend(self._drain_nowait())
+                return batch, True
+            batch.append(row)
+        return batch, False
+
+    def _drain_nowait(self):
+        rows = []
+        while True:
+            try:
+                row = self._queue.get_nowait()
+            except queue.Empty:
+                return rows
+            if row is not _STOP:
+                rows.append(row)
+
+    def _write(self, batch, final=False):
+        for start in range(0, len(batch), self.batch_size):
+            self._write_chunk(batch[start:start + self.batch_size], final)
+
+    def _write_chunk(self, rows, final, max_attempts=None):
+        max_attempts = max_attempts or self.max_attempts
+        delay = 0.1
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                with DatabaseConfig.connection() as connection:
+                    if not connection:
+                        raise RuntimeError("Database connection failed")
+                    cursor = connection.cursor()
+                    try:
+                        cursor.executemany(INSERT_SUBMISSIONS, rows)
+                        connection.commit()
+                    finally:
+                        cursor.close()
+                with self._lock:
+                    self._stats['written'] += len(rows)
+                    self._stats['batches'] += 1
+                return
+            except Exception as e:
+                print(f"Error writing submission batch ({len(rows)} rows): {e}")
+                with self._lock:
+                    self._stats['retries'] += 1
+                if isinstance(e, PERMANENT_ERRORS) and attempts >= max_attempts:
+                    self._isolate(rows, final)
+                    return
+                # Never drop rows: keep retrying while running, spool to disk when shutting down
+                if final and attempts >= 3:
+                    self._spool(rows)
+                    return
+                time.sleep(delay)
+                delay = min(delay * 2, 5.0)
+
+    def _isolate(self, rows, final):
+        """Split a batch that fails permanently until the offending rows are found and spooled"""
+        if len(rows) == 1:
+            self._spool(rows)
+            with self._lock:
+                self._stats['dead_lettered'] += 1
+            return
+        middle = len(rows) // 2
+        # The error is already known to be permanent, so halves get a single attempt
+        self._write_chunk(rows[:middle], final, max_attempts=1)
+        self._write_chunk(rows[middle:], final, max_attempts=1)
+
+    def replay_spool(self):
+        """Write back the rows in the spool file; returns how many were read from it"""
+        replay_file = self.spool_file + '.replay'
+        replayed = 0
+        # A replay file left behind by a crash mid-replay goes first; the inserts are idempotent
+        if os.path.exists(replay_file):
+            replayed += self._replay(replay_file)
+        try:
+            # Rows spooled from here on land in a fresh spool file
+            os.replace(self.spool_file, replay_file)
+        except FileNotFoundError:
+            pass
+        else:
+            replayed += self._replay(replay_file)
+        with self._lock:
+            self._stats['replayed'] += replayed
+        return replayed
+
+    def _replay(self, path):
+        rows = []
+        with open(path, encoding='utf-8') as spool:
+            for line in spool:
+                try:
+                    row = json.loads(line)
+                    row[6] = datetime.fromisoformat(row[6])
+                except (ValueError, IndexError, TypeError) as e:
+                    print(f"Skipping unreadable spooled submission: {e}")
+                    continue
+                rows.append(tuple(row))
+        if rows:
+            print(f"Replaying {len(rows)} spooled submissions from {self.spool_file}")
+            # As on shutdown: a few attempts, then whatever still fails is spooled again
+            self._write(rows, final=True)
+        os.remove(path)
+        return len(rows)
+
+    def _spool(self, rows):
+        with open(self.spool_file, 'a', encoding='utf-8') as spool:
+            for row in rows:
+                spool.write(json.dumps(row, default=str) + "\n")
+        with self._lock:
+            self._stats['spooled'] += len(rows)
+        print(f"⚠️ Spooled {len(rows)} unwritten submissions to {self.spool_file}")
+
+    def shutdown(self, timeout=None):
+        """Stop accepting rows, flush everything queued and wait for the writer thread"""
+        with self._lock:
+            self._stopping = True
+            thread = self._thread
+        if thread is None or self._pid != os.getpid() or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        # Rows that raced in behind the stop marker
+        leftover = self._drain_nowait()
+        if leftover:
+            self._write(leftover, final=True)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['queued'] = self._queue.qsize()
+        return stats
+
+
+submission_writer = SubmissionWriter(
+    SubmissionConfig.SUBMISSION_BATCH_SIZE,
+    SubmissionConfig.SUBMISSION_FLUSH_INTERVAL,
+    SubmissionConfig.SUBMISSION_QUEUE_SIZE,
+    SubmissionConfig.SUBMISSION_ENQUEUE_TIMEOUT,
+    SubmissionConfig.SUBMISSION_SPOOL_FILE,
+    SubmissionConfig.SUBMISSION_MAX_ATTEMPTS,
+)
+atexit.register(submission_writer.shutdown)
@@ -0,0 +1,91 @@
+# services/timing_wheel.py
+import math
+
+
+class TimingWheel:
+    """Hierarchical timing wheel: O(1) schedule and cancel, and per-tick work
+    that depends only on the timers due (or cascading) in that tick, never on
+    how many timers are pending.
+
+    Level l has 2**bits slots of 2**(bits*l) ticks each. A timer lives in the
+    lowest level whose span covers its distance from now and moves down a
+    level each time that level's slot comes round, so it is touched at most
+    `levels` times before it fires. Time is counted in whole ticks of `tick`
+    seconds; timers fire on the first tick at or after their deadline.
+    """
+
+    def __init__(self, now, tick=1.0, bits=6, levels=4):
+        self.tick = tick
+        self.bits = bits
+        self.size = 1 << bits
+        self.mask = self.size - 1
+        self.levels = levels
+        self._wheels = [[{} for _ in range(self.size)] for _ in range(levels)]
+        self._overflow = {}
+        self._ready = {}
+        self._where = {}
+        self._current = int(now // tick)
+
+    def __len__(self):
+        return len(self._where)
+
+    def __contains__(self, key):
+        return key in self._where
+
+    def _place(self, key, due):
+        delta = due - self._current
+        if delta <= 0:
+            self._ready[key] = due
+            self._where[key] = self._ready
+            return
+        for level in range(self.levels):
+            if delta < 1 << (self.bits * (level + 1)):
+                bucket = self._wheels[level][(due >> (self.bits * level)) & self.mask]
+                bucket[key] = due
+                self._where[key] = bucket
+                return
+        self._overflow[key] = due
+        self._where[key] = self._overflow
+
+    def schedule(self, key, deadline):
+        """Fire `key` at `deadline` (seconds, same clock as advance()); replaces an earlier schedule"""
+        self.cancel(key)
+        self._place(key, math.ceil(deadline / self.tick))
+
+    def cancel(self, key):
+        bucket = self._where.pop(key, None)
+        if bucket is not None:
+            del bucket[key]
+            return True
+        return False
+
+    def _cascade(self, bucket):
+        entries = list(bucket.items())
+        bucket.clear()
+        for key, due in entries:
+            self._place(key, due)
+
+    def advance(self, now):
+        """Move the wheel up to `now` and return the keys that fell due, in deadline order"""
+        target = int(now // self.tick)
+        expired = sorted(self._ready.items(), key=lambda item: item[1])
+        self._ready.clear()
+        while self._current < target:
+            self._current += 1
+            current = self._current
+            if current & ((1 << (self.bits * self.levels)) - 1) == 0 and self._overflow:
+                self._cascade(self._overflow)
+            # Higher levels first: their timers may drop into a lower slot due this tick
+            for level in range(self.levels - 1, 0, -1):
+                if current & ((1 << (self.bits * level)) - 1) == 0:
+                    self._cascade(self._wheels[level][(current >> (self.bits * level)) & self.mask])
+            bucket = self._wheels[0][current & self.mask]
+            if self._ready:
+                bucket.update(self._ready)
+                self._ready.clear()
+            if bucket:
+                expired.extend(bucket.items())
+                bucket.clear()
+        for key, _ in expired:
+            del self._where[key]
+        return [key for key, _ in expired]
@@ -0,0 +1,119 @@
+# services/user_cache.py
+import threading
+import time
+from collections import OrderedDict
+from config import CacheConfig
+
+
+class UserCache:
+    """LRU/TTL identity map of User objects, reachable by id, email or digital id.
+
+    Each user is stored once; the email and digital-id indexes point at its
+    user_id, so one invalidation drops every way of reaching it. Cached
+    users are shared between requests and must be treated as read-only.
+    """
+
+    KEYS = ('user_id', 'email', 'digital_id_hash')
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._index = {'email': {}, 'digital_id_hash': {}}
+        self._lock = threading.Lock()
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _drop(self, user_id):
+        entry = self._entries.pop(user_id, None)
+        if entry is None:
+            return
+        user = entry[0]
+        for key, index in self._index.items():
+            value = getattr(user, key)
+            if value is not None and index.get(value) == user_id:
+                del index[value]
+
+    def _resolve(self, key, value):
+        return value if key == 'user_id' else self._index[key].get(value)
+
+    def get(self, key, value, loader):
+        """Return the user whose `key` column equals value, calling loader(value) on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            user_id = self._resolve(key, value)
+            entry = self._entries.get(user_id) if user_id is not None else None
+            if entry is not None and entry[1] <= now:
+                self._drop(user_id)
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            epoch = self._epoch
+
+        user = loader(value)
+        if user is not None:
+            self.put(user, epoch)
+        return user
+
+    def put(self, user, epoch=None):
+        with self._lock:
+            # Skip the store if an invalidation raced with the load
+            if epoch is not None and epoch != self._epoch:
+                return
+            self._drop(user.user_id)
+            self._entries[user.user_id] = (user, time.monotonic() + self.ttl)
+            for key, index in self._index.items():
+                value = getattr(user, key)
+                if value is not None:
+                    index[value] = user.user_id
+            while len(self._entries) > self.max_size:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def update(self, user_id, **fields):
+        """Set non-key fields of a cached user in place, for writes that reach storage later"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                for name, value in fields.items():
+                    setattr(entry[0], name, value)
+
+    def invalidate(self, user_id=None, email=None):
+        """Forget a user, identified by id or by email"""
+        with self._lock:
+            if user_id is None and email is not None:
+                user_id = self._index['email'].get(email)
+            if user_id is not None:
+                self._drop(user_id)
+            self._epoch += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            for index in self._index.values():
+                index.clear()
+            self._epoch += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+user_cache = UserCache(CacheConfig.USER_CACHE_SIZE, CacheConfig.USER_CACHE_TTL)
@@ -1,17 +1,26 @@
 # services/user_service.py
 from config import DatabaseConfig
-from models.user import User
+from models.user import User, USER_COLUMNS, PUBLIC_COLUMNS, user_record_type
+from services.password_hasher import password_hasher, HasherBusyError
+from services.user_cache import user_cache
+from services.login_tracker import last_login_recorder
 import hashlib
 import mysql.connector
 from mysql.connector import Error
+import time
 import uuid
 
 class UserService:
+
+    ROLES = ('Student', 'Examiner', 'Admin')
+    # Matches no hash scheme: roster accounts imported without a password
+    # cannot log in until the student sets one through password reset
+    UNUSABLE_PASSWORD = '!'
     
     @staticmethod
     def hash_password(password):
-        """Hash password using SHA-256"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Hash password with the configured KDF (runs on the hashing worker pool)"""
+        return password_hasher.hash(password)
     
     @staticmethod
     def generate_digital_id(email, enrollment_number):
@@ -22,380 +31,603 @@ class UserService:
     @staticmethod
     def create_user(user_data):
         """Create new user with blockchain digital ID"""
-        connection = DatabaseConfig.get_connection()
-        if not connection:
-            return {"error": "Database connection failed"}
-        
-        cursor = None
+        # Hash password before borrowing a connection: the KDF is deliberately slow
         try:
-            cursor = connection.cursor(dictionary=True)
-            
-            # Check if email already exists
-            cursor.execute("SELECT email FROM users WHERE email = %s", (user_data['email'],))
-            if cursor.fetchone():
-                return {"error": "Email already exists"}
-            
-            # Generate digital ID hash
-            digital_id_hash = UserService.generate_digital_id(
-                user_data['email'], 
-                user_data.get('enrollment_number', '')
-            )
-            
-            # Hash password
             hashed_password = UserService.hash_password(user_data['password'])
+        except HasherBusyError as e:
+            print(f"Error creating user: {e}")
+            return {"error": "Server busy, please try again"}
+
+        with DatabaseConfig.connection() as connection:
+            if not connection:
+                return {"error": "Database connection failed"}
+        
+            cursor = None
+            try:
+                cursor = connection.cursor(dictionary=True)
+            
+                # Check if email already exists
+                cursor.execute("SELECT email FROM users WHERE email = %s", (user_data['email'],))
+                if cursor.fetchone():
+                    return {"error": "Email already exists"}
+            
+                # Generate digital ID hash
+                digital_id_hash = UserService.generate_digital_id(
+                    user_data['email'], 
+                    user_data.get('enrollment_number', '')
+                )
             
-            # Insert user
-            insert_query = """
-            INSERT INTO users (
-                name, email, password, role, branch, enrollment_number, 
-                computer_code, wallet_address, digital_id_hash
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            
-            cursor.execute(insert_query, (
-                user_data['name'],
-                user_data['email'],
-                hashed_password,
-                user_data['role'],
-                user_data.get('branch'),
-                user_data.get('enrollment_number'),
-                user_data.get('computer_code'),
-                user_data.get('wallet_address'),
-                digital_id_hash
-            ))
-            
-            connection.commit()
-            user_id = cursor.lastrowid
+                # Insert user
+                insert_query = """
+                INSERT INTO users (
+                    name, email, password, role, branch, enrollment_number, 
+                    computer_code, wallet_address, digital_id_hash
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """
+            
+                cursor.execute(insert_query, (
+                    user_data['name'],
+                    user_data['email'],
+                    hashed_password,
+                    user_data['role'],
+                    user_data.get('branch'),
+                    user_data.get('enrollment_number'),
+                    user_data.get('computer_code'),
+                    user_data.get('wallet_address'),
+                    digital_id_hash
+                ))
             
-            # Get the created user
-            cursor.execute("SELECT * FROM users WHERE user_id = %s", (user_id,))
-            user_record = cursor.fetchone()
-            
-            if user_record:
-                return User(user_record)
+                connection.commit()
+                user_id = cursor.lastrowid
+            
+                # Get the created user
+                cursor.execute("SELECT * FROM users WHERE user_id = %s", (user_id,))
+                user_record = cursor.fetchone()
+            
+                if user_record:
+                    user = User(user_record)
+                    user_cache.put(user)
+                    return user
+                else:
+                    return {"error": "Failed to create user"}
+            
+            except Error as e:
+                print(f"Error creating user: {e}")
+                return {"error": f"Database error: {str(e)}"}
+            finally:
+                if cursor:
+                    cursor.close()
+    
+    @staticmethod
+    def _import_row(row, default_role):
+        """Validate and normalise one roster row; raises ValueError"""
+        name = (row.get('name') or '').strip()
+        email = (row.get('email') or '').strip().lower()
+        if not name:
+            raise ValueError("missing name")
+        if '@' not in email:
+            raise ValueError("invalid email")
+        role = (row.get('role') or default_role).strip().capitalize()
+        if role not in UserService.ROLES:
+            raise ValueError(f"unknown role {role}")
+        optional = {}
+        for field in ('branch', 'enrollment_number', 'computer_code', 'wallet_address'):
+            value = (row.get(field) or '').strip()
+            optional[field] = value or None
+        if optional['wallet_address'] and len(optional['wallet_address']) > 42:
+            raise ValueError("wallet address too long")
+        return {'name': name, 'email': email, 'role': role, 'password': row.get('password') or None, **optional}
+
+    @staticmethod
+    def _existing_keys(cursor, candidates):
+        """Emails, wallets and enrollment numbers of `candidates` already in users, in one query"""
+        conditions = []
+        params = []
+        for column in ('email', 'wallet_address', 'enrollment_number'):
+            values = list({user[column] for user in candidates if user[column]})
+            if values:
+                conditions.append(f"{column} IN ({', '.join(['%s'] * len(values))})")
+                params.extend(values)
+        taken = {'email': set(), 'wallet_address': set(), 'enrollment_number': set()}
+        if conditions:
+            cursor.execute(
+                f"SELECT email, wallet_address, enrollment_number FROM users WHERE {' OR '.join(conditions)}",
+                params
+            )
+            for email, wallet_address, enrollment_number in cursor.fetchall():
+                taken['email'].add(email.lower())
+                taken['wallet_address'].add(wallet_address)
+                taken['enrollment_number'].add(enrollment_number)
+        return taken
+
+    @staticmethod
+    def _import_chunk(chunk, default_role, seen, report):
+        def fail(number, email, reason):
+            report['failed'] += 1
+            report['errors'].append({'row': number, 'email': email, 'error': reason})
+
+        candidates = []
+        for number, row in chunk:
+            try:
+                user = UserService._import_row(row, default_role)
+            except ValueError as e:
+                fail(number, row.get('email'), str(e))
+                continue
+            duplicate = next((column for column in seen if user[column] and user[column] in seen[column]), None)
+            if duplicate:
+                fail(number, user['email'], f"duplicate {duplicate} in file")
+                continue
+            for column in seen:
+                if user[column]:
+                    seen[column].add(user[column])
+            candidates.append((number, user))
+        if not candidates:
+            return
+
+        # Drop rows that clash with existing users before spending KDF time on them
+        with DatabaseConfig.connection() as connection:
+            if not connection:
+                for number, user in candidates:
+                    fail(number, user['email'], "Database connection failed")
+                return
+            cursor = None
+            try:
+                cursor = connection.cursor()
+                taken = UserService._existing_keys(cursor, [user for _, user in candidates])
+            except Error as e:
+                print(f"Error importing users: {e}")
+                for number, user in candidates:
+                    fail(number, user['email'], f"Database error: {e}")
+                return
+            finally:
+                if cursor:
+                    cursor.close()
+
+        fresh = []
+        for number, user in candidates:
+            clash = next((column for column in taken if user[column] and user[column] in taken[column]), None)
+            if clash:
+                fail(number, user['email'], f"{clash} already registered")
             else:
-                return {"error": "Failed to create user"}
-            
-        except Error as e:
-            print(f"Error creating user: {e}")
-            return {"error": f"Database error: {str(e)}"}
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
+                fresh.append((number, user))
+
+        # Hash the whole chunk on the worker pool without holding a connection
+        hashes = iter(password_hasher.hash_many([user['password'] for _, user in fresh if user['password']]))
+        values = []
+        for number, user in fresh:
+            password = next(hashes) if user['password'] else UserService.UNUSABLE_PASSWORD
+            if isinstance(password, HasherBusyError):
+                fail(number, user['email'], str(password))
+                continue
+            values.append((number, user['email'], (
+                user['name'], user['email'], password, user['role'], user['branch'],
+                user['enrollment_number'], user['computer_code'], user['wallet_address'],
+                UserService.generate_digital_id(user['email'], user['enrollment_number'] or '')
+            )))
+        if not values:
+            return
+
+        with DatabaseConfig.connection() as connection:
+            if not connection:
+                for number, email, _ in values:
+                    fail(number, email, "Database connection failed")
+                return
+
+            cursor = None
+            try:
+                cursor = connection.cursor()
+                insert_query = """
+                INSERT INTO users (
+                    name, email, password, role, branch, enrollment_number,
+                    computer_code, wallet_address, digital_id_hash
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """
+                try:
+                    # executemany sends one multi-row INSERT for the whole chunk
+                    cursor.executemany(insert_query, [params for _, _, params in values])
+                    connection.commit()
+                    report['imported'] += len(values)
+                except Error:
+                    # Something raced us (or a constraint we don't pre-check); redo row by row
+                    connection.rollback()
+                    for number, email, params in values:
+                        try:
+                            cursor.execute(insert_query, params)
+                            report['imported'] += 1
+                        except Error as e:
+                            fail(number, email, f"Database error: {e}")
+                    connection.commit()
+            except Error as e:
+                print(f"Error importing users: {e}")
+                connection.rollback()
+                for number, email, _ in values:
+                    fail(number, email, f"Database error: {e}")
+            finally:
+                if cursor:
+                    cursor.close()
+
+    @staticmethod
+    def bulk_import(rows, chunk_size=1000, default_role='Student'):
+        """Create users from roster dicts in chunked multi-row transactions.
+
+        Each chunk is checked against existing emails, wallet addresses and
+        enrollment numbers with one query. Returns counts, per-row errors
+        (1-based row numbers) and throughput.
+        """
+        started = time.perf_counter()
+        report = {'imported': 0, 'failed': 0, 'errors': []}
+        seen = {'email': set(), 'wallet_address': set(), 'enrollment_number': set()}
+        chunk = []
+        for number, row in enumerate(rows, 1):
+            chunk.append((number, row))
+            if len(chunk) >= chunk_size:
+                UserService._import_chunk(chunk, default_role, seen, report)
+                chunk = []
+        if chunk:
+            UserService._import_chunk(chunk, default_role, seen, report)
+
+        report['rows'] = report['imported'] + report['failed']
+        report['elapsed'] = time.perf_counter() - started
+        report['rows_per_second'] = report['rows'] / report['elapsed'] if report['elapsed'] else 0.0
+        return report
     
     @staticmethod
     def authenticate_user(email, password):
-        """Authenticate user and update last login"""
-        connection = DatabaseConfig.get_connection()
-        if not connection:
-            return None
+        """Authenticate user and record the login time"""
+        # Only the lookup borrows a connection; the KDF runs with none held
+        with DatabaseConfig.connection() as connection:
+            if not connection:
+                return None
         
-        cursor = None
-        try:
-            cursor = connection.cursor(dictionary=True)
+            cursor = None
+            try:
+                cursor = connection.cursor(dictionary=True)
             
-            hashed_password = UserService.hash_password(password)
-            
-            # Check user credentials
-            cursor.execute(
-                "SELECT * FROM users WHERE email = %s AND password = %s AND is_active = TRUE",
-                (email, hashed_password)
-            )
-            
-            user_record = cursor.fetchone()
-            
-            if user_record:
-                # Update last login
+                # Check user credentials
                 cursor.execute(
-                    "UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE user_id = %s",
-                    (user_record['user_id'],)
+                    "SELECT * FROM users WHERE email = %s AND is_active = TRUE",
+                    (email,)
                 )
-                connection.commit()
-                return User(user_record)
-            
+                user_record = cursor.fetchone()
+            
+            except Error as e:
+                print(f"Error authenticating user: {e}")
+                return None
+            finally:
+                if cursor:
+                    cursor.close()
+
+        if not user_record:
             return None
-            
-        except Error as e:
+
+        try:
+            matches, needs_rehash = password_hasher.verify(password, user_record['password'])
+        except HasherBusyError as e:
             print(f"Error authenticating user: {e}")
             return None
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
-    
+        if not matches:
+            return None
+
+        if needs_rehash:
+            # Upgrade legacy/outdated hashes now that we know the password
+            rehashed = UserService._rehash_password(user_record['user_id'], user_record['password'], password)
+            if rehashed:
+                user_record['password'] = rehashed
+
+        # Written later in one batched UPDATE, off the login path
+        user_record['last_login'] = last_login_recorder.record(user_record['user_id'])
+        return User(user_record)
+
     @staticmethod
-    def get_user_by_id(user_id):
-        """Get user by ID"""
-        connection = DatabaseConfig.get_connection()
-        if not connection:
+    def _rehash_password(user_id, old_hash, password):
+        """Best-effort upgrade of a verified password's hash; returns the new hash, or None if skipped"""
+        try:
+            new_hash = UserService.hash_password(password)
+        except HasherBusyError as e:
+            print(f"Skipping password rehash: {e}")
             return None
+
+        with DatabaseConfig.connection() as connection:
+            if not connection:
+                return None
+
+            cursor = None
+            try:
+                cursor = connection.cursor()
+                # Leaves a password changed since the lookup alone
+                cursor.execute(
+                    "UPDATE users SET password = %s WHERE user_id = %s AND password = %s",
+                    (new_hash, user_id, old_hash)
+                )
+                connection.commit()
+                user_cache.invalidate(user_id)
+                return new_hash if cursor.rowcount > 0 else None
+
+            except Error as e:
+                print(f"Skipping password rehash: {e}")
+                return None
+            finally:
+                if cursor:
+                    cursor.close()
+    
+    @staticmethod
+    def _fetch_user(column, value):
+        """Load one user by a unique column: user_id, email or digital_id_hash"""
+        with DatabaseConfig.connection() as connection:
+            if not connection:
+                return None
         
-        cursor = None
-        try:
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("SELECT * FROM users WHERE user_id = %s", (user_id,))
-            user_record = cursor.fetchone()
-            
-            return User(user_record) if user_record else None
+            cursor = None
+            try:
+                cursor = connection.cursor(dictionary=True)
+                cursor.execute(f"SELECT * FROM users WHERE {column} = %s", (value,))
+                user_record = cursor.fetchone()
+                if not user_record:
+                    return None
+                # A login recorded but not flushed yet is newer than the stored one
+                user_record['last_login'] = (last_login_recorder.pending(user_record['user_id'])
+                                             or user_record['last_login'])
+                return User(user_record)
             
-        except Error as e:
-            print(f"Error getting user: {e}")
-            return None
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
+            except Error as e:
+                print(f"Error getting user by {column}: {e}")
+                return None
+            finally:
+                if cursor:
+                    cursor.close()
+    
+    @staticmethod
+    def get_user_by_id(user_id):
+        """Get user by ID"""
+        return user_cache.get('user_id', user_id, lambda value: UserService._fetch_user('user_id', value))
+    
+    @staticmethod
+    def iter_users(role=None, columns=PUBLIC_COLUMNS, after_id=0, page_size=1000, limit=None):
+        """Stream users in user_id order as compact UserRecord tuples.
+
+        Rows come off an unbuffered (server-side) cursor one keyset page
+        (user_id > last seen) at a time, so memory stays flat however large
+        the table is. Consume or close() the generator to return its
+        connection to the pool.
+        """
+        columns = tuple(columns)
+        if 'user_id' not in columns:
+            columns = ('user_id',) + columns
+        record = user_record_type(columns)
+        key = columns.index('user_id')
+
+        query = f"SELECT {', '.join(columns)} FROM users WHERE user_id > %s"
+        if role:
+            query += " AND role = %s"
+        query += " ORDER BY user_id LIMIT %s"
+
+        remaining = limit
+        with DatabaseConfig.connection() as connection:
+            if not connection:
+                return
+            while remaining is None or remaining > 0:
+                size = page_size if remaining is None else min(page_size, remaining)
+                params = (after_id, role, size) if role else (after_id, size)
+                cursor = connection.cursor()
+                rows = 0
+                exhausted = False
+                try:
+                    cursor.execute(query, params)
+                    while True:
+                        batch = cursor.fetchmany(256)
+                        if not batch:
+                            exhausted = True
+                            break
+                        for row in batch:
+                            rows += 1
+                            after_id = row[key]
+                            yield record._make(row)
+                except Error as e:
+                    print(f"Error getting users: {e}")
+                    return
+                finally:
+                    if not exhausted:
+                        # Abandoned mid-page: read off the rest so the connection stays usable
+                        try:
+                            cursor.fetchall()
+                        except Error:
+                            pass
+                    cursor.close()
+                if rows < size:
+                    return
+                if remaining is not None:
+                    remaining -= rows
+
+    @staticmethod
+    def get_users_page(role=None, after_id=0, page_size=100, columns=PUBLIC_COLUMNS):
+        """One keyset page of users; pass the returned next_after_id to fetch the next"""
+        users = list(UserService.iter_users(role, columns, after_id, page_size, limit=page_size))
+        next_after_id = users[-1].user_id if len(users) == page_size else None
+        return users, next_after_id
     
     @staticmethod
     def get_all_users(role=None):
         """Get all users, optionally filtered by role"""
-        connection = DatabaseConfig.get_connection()
-        if not connection:
-            return None
-        
-        cursor = None
-        try:
-            cursor = connection.cursor(dictionary=True)
-            
-            if role:
-                cursor.execute("SELECT * FROM users WHERE role = %s", (role,))
-            else:
-                cursor.execute("SELECT * FROM users")
-            
-            users = cursor.fetchall()
-            return [User(user) for user in users]
-            
-        except Error as e:
-            print(f"Error getting users: {e}")
-            return None
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
+        return [User(record._asdict()) for record in UserService.iter_users(role, USER_COLUMNS)]
     
     @staticmethod
     def update_user(user_id, update_data):
         """Update user information"""
-        connection = DatabaseConfig.get_connection()
-        if not connection:
-            return False
+        with DatabaseConfig.connection() as connection:
+            if not connection:
+                return False
         
-        cursor = None
-        try:
-            cursor = connection.cursor(dictionary=True)
+            cursor = None
+            try:
+                cursor = connection.cursor(dictionary=True)
             
-            # Build dynamic update query
-            set_clause = []
-            values = []
+                # Build dynamic update query
+                set_clause = []
+                values = []
             
-            allowed_fields = ['name', 'branch', 'enrollment_number', 'computer_code', 'wallet_address']
+                allowed_fields = ['name', 'branch', 'enrollment_number', 'computer_code', 'wallet_address']
             
-            for field in allowed_fields:
-                if field in update_data and update_data[field] is not None:
-                    set_clause.append(f"{field} = %s")
-                    values.append(update_data[field])
+                for field in allowed_fields:
+                    if field in update_data and update_data[field] is not None:
+                        set_clause.append(f"{field} = %s")
+                        values.append(update_data[field])
             
-            if not set_clause:
-                return False
+                if not set_clause:
+                    return False
             
-            values.append(user_id)
-            update_query = f"UPDATE users SET {', '.join(set_clause)} WHERE user_id = %s"
+                values.append(user_id)
+                update_query = f"UPDATE users SET {', '.join(set_clause)} WHERE user_id = %s"
             
-            cursor.execute(update_query, values)
-            connection.commit()
+                cursor.execute(update_query, values)
+                connection.commit()
+                user_cache.invalidate(user_id)
             
-            return cursor.rowcount > 0
+                return cursor.rowcount > 0
             
-        except Error as e:
-            print(f"Error updating user: {e}")
-            return False
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
+            except Error as e:
+                print(f"Error updating user: {e}")
+                return False
+            finally:
+                if cursor:
+                    cursor.close()
     
     @staticmethod
     def deactivate_user(user_id):
         """Deactivate user account"""
-        connection = DatabaseConfig.get_connection()
-        if not connection:
-            return False
+        with DatabaseConfig.connection() as connection:
+            if not connection:
+                return False
         
-        cursor = None
-        try:
-            cursor = connection.cursor()
-            cursor.execute(
-                "UPDATE users SET is_active = FALSE WHERE user_id = %s",
-                (user_id,)
-            )
-            connection.commit()
-            return cursor.rowcount > 0
+            cursor = None
+            try:
+                cursor = connection.cursor()
+                cursor.execute(
+                    "UPDATE users SET is_active = FALSE WHERE user_id = %s",
+                    (user_id,)
+                )
+                connection.commit()
+                user_cache.invalidate(user_id)
+                return cursor.rowcount > 0
             
-        except Error as e:
-            print(f"Error deactivating user: {e}")
-            return False
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
+            except Error as e:
+                print(f"Error deactivating user: {e}")
+                return False
+            finally:
+                if cursor:
+                    cursor.close()
     
     @staticmethod
     def get_user_by_email(email):
         """Get user by email"""
-        connection = DatabaseConfig.get_connection()
-        if not connection:
-            return None
-        
-        cursor = None
-        try:
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("SELECT * FROM users WHERE email = %s", (email,))
-            user_record = cursor.fetchone()
-            
-            return User(user_record) if user_record else None
-            
-        except Error as e:
-            print(f"Error getting user by email: {e}")
-            return None
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
+        return user_cache.get('email', email, lambda value: UserService._fetch_user('email', value))
     
     @staticmethod
     def get_user_by_digital_id(digital_id_hash):
         """Get user by blockchain digital ID"""
-        connection = DatabaseConfig.get_connection()
+        return user_cache.get('digital_id_hash', digital_id_hash,
+                              lambda value: UserService._fetch_user('digital_id_hash', value))
+    
+    @staticmethod
+    def activate_user(user_id):
+        """Activate user account"""
+        with DatabaseConfig.connection() as connection:
+            if not connection:
+                return False
+        
+            cursor = None
+            try:
+                cursor = connection.cursor()
+                cursor.execute(
+                    "UPDATE users SET is_active = TRUE WHERE user_id = %s",
+                    (user_id,)
+                )
+                connection.commit()
+                user_cache.invalidate(user_id)
+                return cursor.rowcount > 0
+            
+            except Error as e:
+                print(f"Error activating user: {e}")
+                return False
+            finally:
+                if cursor:
+                    cursor.close()
+    
+    @staticmethod
+    def update_password(user_id, new_password):
+        """Update user password"""
+        try:
+            hashed_password = UserService.hash_password(new_password)
+        except HasherBusyError as e:
+            print(f"Error updating password: {e}")
+            return False
+
+        with DatabaseConfig.connection() as connection:
+            if not connection:
+                return False
+        
+            cursor = None
+            try:
+                cursor = connection.cursor()
+            
+                cursor.execute(
+                    "UPDATE users SET password = %s WHERE user_id = %s",
+                    (hashed_password, user_id)
+                )
+                connection.commit()
+                user_cache.invalidate(user_id)
+                return cursor.rowcount > 0
+            
+            except Error as e:
+                print(f"Error updating password: {e}")
+                return False
+            finally:
+                if cursor:
+                    cursor.close()
+
+@staticmethod
+def get_user_by_email(email):
+    """Get user by email"""
+    with DatabaseConfig.connection() as connection:
         if not connection:
             return None
-        
+    
         cursor = None
         try:
             cursor = connection.cursor(dictionary=True)
-            cursor.execute("SELECT * FROM users WHERE digital_id_hash = %s", (digital_id_hash,))
+            cursor.execute("SELECT * FROM users WHERE email = %s", (email,))
             user_record = cursor.fetchone()
-            
+        
             return User(user_record) if user_record else None
-            
+        
         except Error as e:
-            print(f"Error getting user by digital ID: {e}")
+            print(f"Error getting user by email: {e}")
             return None
         finally:
             if cursor:
                 cursor.close()
-            if connection:
-                connection.close()
-    
-    @staticmethod
-    def activate_user(user_id):
-        """Activate user account"""
-        connection = DatabaseConfig.get_connection()
+
+@staticmethod
+def update_password(user_id, new_password):
+    """Update user password"""
+    with DatabaseConfig.connection() as connection:
         if not connection:
             return False
-        
-        cursor = None
-        try:
-            cursor = connection.cursor()
-            cursor.execute(
-                "UPDATE users SET is_active = TRUE WHERE user_id = %s",
-                (user_id,)
-            )
-            connection.commit()
-            return cursor.rowcount > 0
-            
-        except Error as e:
-            print(f"Error activating user: {e}")
-            return False
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
     
-    @staticmethod
-    def update_password(user_id, new_password):
-        """Update user password"""
-        connection = DatabaseConfig.get_connection()
-        if not connection:
-            return False
-        
         cursor = None
         try:
             cursor = connection.cursor()
             hashed_password = UserService.hash_password(new_password)
-            
+        
             cursor.execute(
                 "UPDATE users SET password = %s WHERE user_id = %s",
                 (hashed_password, user_id)
             )
             connection.commit()
             return cursor.rowcount > 0
-            
+        
         except Error as e:
             print(f"Error updating password: {e}")
             return False
         finally:
             if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
-
-@staticmethod
-def get_user_by_email(email):
-    """Get user by email"""
-    connection = DatabaseConfig.get_connection()
-    if not connection:
-        return None
-    
-    cursor = None
-    try:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM users WHERE email = %s", (email,))
-        user_record = cursor.fetchone()
-        
-        return User(user_record) if user_record else None
-        
-    except Error as e:
-        print(f"Error getting user by email: {e}")
-        return None
-    finally:
-        if cursor:
-            cursor.close()
-        if connection:
-            connection.close()
-
-@staticmethod
-def update_password(user_id, new_password):
-    """Update user password"""
-    connection = DatabaseConfig.get_connection()
-    if not connection:
-        return False
-    
-    cursor = None
-    try:
-        cursor = connection.cursor()
-        hashed_password = UserService.hash_password(new_password)
-        
-        cursor.execute(
-            "UPDATE users SET password = %s WHERE user_id = %s",
-            (hashed_password, user_id)
-        )
-        connection.commit()
-        return cursor.rowcount > 0
-        
-    except Error as e:
-        print(f"Error updating password: {e}")
-        return False
-    finally:
-        if cursor:
-            cursor.close()
-        if connection:
-            connection.close()
\ No newline at end of file
+                cursor.close()
\ No newline at end of file
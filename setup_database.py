@@ -2,6 +2,7 @@
 from config import DatabaseConfig
 import mysql.connector
 from mysql.connector import Error
+from services.password_hasher import password_hasher
 import hashlib
 import uuid
 
@@ -13,7 +14,7 @@ def setup_database():
         print("Setting up default Admin and Examiner accounts...")
         
         # Default Admin Account
-        admin_password = hashlib.sha256("admin123".encode()).hexdigest()
+        admin_password = password_hasher.hash("admin123")
         admin_digital_id = hashlib.sha256(f"admin@examsystem.comADMIN001{uuid.uuid4()}".encode()).hexdigest()
         
         cursor.execute("""
@@ -29,7 +30,7 @@ def setup_database():
         ))
         
         # Default Examiner Account
-        examiner_password = hashlib.sha256("examiner123".encode()).hexdigest()
+        examiner_password = password_hasher.hash("examiner123")
         examiner_digital_id = hashlib.sha256(f"examiner@examsystem.comEXAM001{uuid.uuid4()}".encode()).hexdigest()
         
         cursor.execute("""
@@ -0,0 +1,103 @@
+# test_attempt_clock.py
+# Deadlines fire in order off the timing wheel, a failed expiry is retried,
+# and attempts open before a restart are re-armed even if storage was down at start.
+import random
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.attempt_clock import AttemptClock
+from services.autosave import autosave
+from services.timing_wheel import TimingWheel
+
+
+def test_timing_wheel_fires_like_a_sorted_schedule():
+    rng = random.Random(3)
+    wheel = TimingWheel(0.0, tick=1.0, bits=3, levels=3)
+    schedule = {}
+    for key in range(300):
+        schedule[key] = rng.uniform(0, 600)
+        wheel.schedule(key, schedule[key])
+    for key in range(0, 300, 7):
+        wheel.cancel(key)
+        del schedule[key]
+    wheel.schedule(1, 5000.0)  # rescheduling replaces the earlier deadline
+    schedule[1] = 5000.0
+
+    fired = []
+    for now in range(0, 5010, 13):
+        due = wheel.advance(float(now))
+        assert all(schedule[key] <= now for key in due)
+        fired.extend(due)
+    assert sorted(fired) == sorted(schedule)
+    assert len(wheel) == 0
+
+
+@pytest.fixture
+def clock(database):
+    """An attempt clock whose handler only records the attempts it expires; yields (clock, expired ids)"""
+    clock = AttemptClock(tick=0.01, grace=0, retry=0.01, max_restore_delay=0.02)
+    expired = []
+    clock.on_expire(lambda attempt_id, exam_id, digital_id: expired.append(attempt_id))
+    yield clock, expired
+    clock.shutdown(timeout=5)
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_attempt_states_follow_its_deadline(clock):
+    clock, expired = clock
+    assert clock.check('unknown', 1, None) == 'unstarted'
+    deadline, sealed = clock.start_attempt('t1', 1, None, 3600)
+    assert not sealed and clock.check('t1', 1, None) == 'open'
+    # Reloading the page keeps the original deadline
+    assert clock.start_attempt('t1', 1, None, 7200)[0] == deadline
+
+    clock.advance(deadline.timestamp() + 1)
+    assert expired == ['t1']
+    assert clock.remaining('t1') is None
+
+
+def test_failed_expiry_is_retried(database):
+    calls = []
+
+    def submit_once_busy(attempt_id, exam_id, digital_id):
+        calls.append(attempt_id)
+        return len(calls) > 1  # the first try finds the submission queue full
+
+    clock = AttemptClock(tick=0.01, grace=0, retry=0.05)
+    clock.on_expire(submit_once_busy)
+    deadline, _ = clock.start_attempt('t2', 1, None, 60)
+
+    clock.advance(deadline.timestamp() + 1)
+    assert clock.stats()['retries'] == 1 and clock.remaining('t2') is not None
+    clock.advance(time.time() + 1)
+    assert clock.stats()['expired'] == 1 and clock.remaining('t2') is None
+    assert calls == ['t2', 't2']
+    clock.shutdown(timeout=5)
+
+
+def test_restore_is_retried_until_storage_answers(clock, monkeypatch):
+    clock, expired = clock
+    overdue = datetime.now() - timedelta(minutes=1)
+    failures = []
+
+    def open_deadlines():
+        if len(failures) < 2:
+            failures.append(1)
+            raise RuntimeError("Database connection failed")
+        return [('t3', 1, None, overdue), ('t4', 1, None, datetime.now() + timedelta(hours=1))]
+
+    monkeypatch.setattr(autosave, 'open_deadlines', open_deadlines)
+    clock.start()
+
+    assert wait_for(lambda: expired == ['t3'])
+    stats = clock.stats()
+    assert (stats['restore_errors'], stats['restored'], stats['restore_pending']) == (2, 2, False)
+    assert clock.check('t4', 1, None) == 'open'
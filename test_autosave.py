@@ -0,0 +1,105 @@
+# test_autosave.py
+# Autosaved attempts: deltas merge in order, a seal reaches storage only once
+# its submission is queued, and a submission that fails before that reopens it.
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import app as app_module
+from services.autosave import AttemptSealedError, AutosaveBuffer, autosave
+
+DIGITAL_ID = 'c' * 64
+
+
+@pytest.fixture
+def buffer(database):
+    buffer = AutosaveBuffer(flush_interval=3600, batch_size=10, idle_ttl=3600)
+    yield buffer
+    buffer.shutdown(timeout=5)
+
+
+def stored(database, attempt_id):
+    return database.execute("SELECT answers, seq, sealed FROM attempt_snapshots WHERE attempt_id = ?",
+                            (attempt_id,)).fetchone()
+
+
+def test_deltas_merge_and_stale_ones_are_ignored(buffer, database):
+    assert buffer.save('a1', 1, DIGITAL_ID, {'question_1': 'A', 'question_2': 'B'}, 1) == (True, 1)
+    assert buffer.save('a1', 1, DIGITAL_ID, {'question_2': '', 'question_3': 'C'}, 3) == (True, 3)
+    assert buffer.save('a1', 1, DIGITAL_ID, {'question_1': 'stale'}, 2) == (False, 3)
+    assert buffer.flush() == 1
+    answers, seq, sealed = stored(database, 'a1')
+    assert (json.loads(answers), seq, sealed) == ({'question_1': 'A', 'question_3': 'C'}, 3, 0)
+
+
+def test_seal_is_stored_only_after_confirm(buffer, database):
+    buffer.save('a2', 1, DIGITAL_ID, {'question_1': 'A'}, 1)
+    assert buffer.seal('a2', 1, DIGITAL_ID, {'question_1': 'B'}) == {'question_1': 'B'}
+    assert buffer.seal('a2', 1, DIGITAL_ID) is None
+    with pytest.raises(AttemptSealedError):
+        buffer.save('a2', 1, DIGITAL_ID, {'question_1': 'C'}, 5)
+
+    buffer.flush()
+    assert stored(database, 'a2')[2] == 0
+    buffer.confirm('a2')
+    buffer.flush()
+    assert stored(database, 'a2')[2] == 1
+    # A confirmed seal cannot be undone
+    buffer.reopen('a2')
+    assert buffer.seal('a2', 1, DIGITAL_ID) is None
+
+
+def test_reopen_undoes_an_unconfirmed_seal(buffer, database):
+    buffer.save('a3', 1, DIGITAL_ID, {'question_1': 'A'}, 1)
+    buffer.seal('a3', 1, DIGITAL_ID)
+    buffer.reopen('a3')
+    buffer.flush()
+    assert stored(database, 'a3')[2] == 0
+    assert buffer.save('a3', 1, DIGITAL_ID, {'question_1': 'D'}, 10) == (True, 10)
+
+
+@pytest.fixture
+def attempt(client, database):
+    """A live exam and an attempt started on it by the client's session; yields (exam_id, attempt_id)"""
+    now = datetime.now()
+    exam_id = database.execute("INSERT INTO exams (title, start_time, end_time, duration) VALUES (?, ?, ?, ?)",
+                               ('Live', now - timedelta(hours=1), now + timedelta(hours=1), 30)).lastrowid
+    database.execute("INSERT INTO questions (exam_id, q_text, q_type, marks, negative, difficulty, options, correct) "
+                     "VALUES (?, 'Pick A', 'mcq', 1, 0, NULL, '[\"A\", \"B\"]', '[\"A\"]')", (exam_id,))
+    database.commit()
+    assert client.get(f'/take_exam/{exam_id}?stream=0').status_code == 200
+    with client.session_transaction() as session:
+        return exam_id, session['attempts'][str(exam_id)]
+
+
+def test_failure_before_queueing_reopens_the_attempt(client, attempt, monkeypatch):
+    exam_id, attempt_id = attempt
+
+    def broken(row):
+        raise RuntimeError("writer unavailable")
+
+    monkeypatch.setattr(app_module.submission_writer, 'submit', broken)
+    with pytest.raises(RuntimeError):
+        client.post(f'/take_exam/{exam_id}', data={'question_1': 'A'})
+    assert autosave.snapshot(attempt_id, exam_id, None)['sealed'] is False
+
+    monkeypatch.undo()
+    response = client.post(f'/take_exam/{exam_id}', data={'question_1': 'A'})
+    assert response.status_code == 200
+    assert autosave.snapshot(attempt_id, exam_id, None)['sealed'] is True
+
+
+def test_failure_after_queueing_keeps_the_seal(client, attempt, monkeypatch):
+    exam_id, attempt_id = attempt
+
+    def broken(*args):
+        raise OSError("ledger disk full")
+
+    monkeypatch.setattr(app_module.ledger, 'append', broken)
+    with pytest.raises(OSError):
+        client.post(f'/take_exam/{exam_id}', data={'question_1': 'A'})
+
+    monkeypatch.undo()
+    response = client.post(f'/take_exam/{exam_id}', data={'question_1': 'A'}, follow_redirects=True)
+    assert 'already been submitted' in response.get_data(as_text=True)
@@ -0,0 +1,94 @@
+# test_edit_exam.py
+# edit_exam applies only what changed: a form posted back unchanged writes nothing.
+import json
+from datetime import datetime, timedelta
+from html.parser import HTMLParser
+
+import app as app_module
+
+
+class FormFields(HTMLParser):
+    """The fields a browser would post for the first <form> of a page"""
+
+    def __init__(self):
+        super().__init__()
+        self.fields = {}
+        self._select = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        name = attrs.get('name')
+        if tag == 'input' and name:
+            if attrs.get('type') == 'checkbox':
+                if 'checked' in attrs:
+                    self.fields[name] = 'on'
+            else:
+                self.fields[name] = attrs.get('value') or ''
+        elif tag == 'select':
+            self._select = name
+        elif tag == 'option' and self._select and (self._select not in self.fields or 'selected' in attrs):
+            self.fields[self._select] = attrs.get('value')
+
+    def handle_endtag(self, tag):
+        if tag == 'select':
+            self._select = None
+
+
+def seed_exam(database):
+    start = (datetime.now() + timedelta(days=1)).replace(second=0, microsecond=0)
+    cursor = database.execute("INSERT INTO exams (title, start_time, end_time, duration) VALUES (?, ?, ?, ?)",
+                              ('Unchanged', start, start + timedelta(hours=2), 120))
+    exam_id = cursor.lastrowid
+    database.executemany(
+        "INSERT INTO questions (exam_id, q_text, q_type, marks, negative, difficulty, options, correct) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [(exam_id, 'Pick B', 'mcq', 2, 1, None, json.dumps(['A', 'B', 'C']), json.dumps(['B'])),
+         (exam_id, 'Sky is blue', 'truefalse', 1, 0, 'easy', json.dumps(['True', 'False']), json.dumps(['True'])),
+         (exam_id, 'Explain', 'descriptive', 5, 0, None, json.dumps([]), json.dumps([]))])
+    database.commit()
+    return exam_id
+
+
+def rendered_form(client, exam_id):
+    parser = FormFields()
+    parser.feed(client.get(f'/edit_exam/{exam_id}').get_data(as_text=True))
+    form = parser.fields
+    # Browsers post datetime-local values without the seconds
+    for key in ('start_time', 'end_time'):
+        form[key] = form[key][:16]
+    return form
+
+
+def test_unchanged_form_writes_nothing(client, database, writes):
+    exam_id = seed_exam(database)
+    form = rendered_form(client, exam_id)
+    assert form['q1_difficulty'] == ''
+
+    writes.clear()
+    response = client.post(f'/edit_exam/{exam_id}', data=form, follow_redirects=True)
+
+    assert 'No changes to save.' in response.get_data(as_text=True)
+    assert writes == []
+    assert database.execute("SELECT difficulty FROM questions WHERE exam_id=? ORDER BY id",
+                            (exam_id,)).fetchall() == [(None,), ('easy',), (None,)]
+
+
+def test_edited_question_is_the_only_write(client, database, writes):
+    exam_id = seed_exam(database)
+    form = rendered_form(client, exam_id)
+    form['q2_difficulty'] = 'hard'
+
+    writes.clear()
+    response = client.post(f'/edit_exam/{exam_id}', data=form, follow_redirects=True)
+
+    assert 'Exam updated successfully' in response.get_data(as_text=True)
+    assert len(writes) == 1 and writes[0].startswith('INSERT INTO questions (id,')
+    assert database.execute("SELECT difficulty FROM questions WHERE exam_id=? ORDER BY id",
+                            (exam_id,)).fetchall() == [(None,), ('hard',), (None,)]
+
+
+def test_blank_and_none_difficulty_parse_as_null():
+    form = {'q1_text': 'a', 'q1_type': 'descriptive', 'q1_difficulty': 'None',
+            'q2_text': 'b', 'q2_type': 'descriptive', 'q2_difficulty': ' ',
+            'q3_text': 'c', 'q3_type': 'descriptive', 'q3_difficulty': 'medium'}
+    assert [q['difficulty'] for q in app_module.parse_questions(form)] == [None, None, 'medium']
@@ -0,0 +1,55 @@
+# test_grading.py
+# Batch grading agrees with grading one form at a time, for every kind of answer.
+import random
+
+import numpy as np
+
+from services.grading import CORRECT, SKIPPED, WRONG, AnswerKey
+
+QUESTIONS = [
+    {'id': 1, 'q_text': 'single', 'marks': 2, 'negative': 1, 'correct': ['B']},
+    {'id': 2, 'q_text': 'several right', 'marks': 3, 'negative': 0, 'correct': ['A', 'C']},
+    {'id': 3, 'q_text': 'no key', 'marks': 1, 'negative': 1, 'correct': []},
+    {'id': 4, 'q_text': 'true/false', 'marks': 1, 'negative': None, 'correct': ['True']},
+    {'id': 5, 'q_text': 'no marks', 'marks': None, 'negative': 2, 'correct': ['x']},
+]
+CHOICES = [None, '', 'A', 'B', 'C', 'D', 'True', 'False', 'x', 'answer text']
+
+
+def random_forms(count, seed=11):
+    rng = random.Random(seed)
+    forms = []
+    for _ in range(count):
+        form = {}
+        for q in QUESTIONS:
+            choice = rng.choice(CHOICES)
+            if choice is not None:
+                form[f"question_{q['id']}"] = choice
+        form['unrelated_field'] = 'ignored'
+        forms.append(form)
+    return forms
+
+
+def test_score_batch_matches_score():
+    key = AnswerKey.compile(QUESTIONS)
+    forms = random_forms(500)
+    assert key.score_batch(forms).tolist() == [key.score(form)[0] for form in forms]
+    assert key.total == 7
+
+
+def test_outcome_matrix_matches_outcomes():
+    key = AnswerKey.compile(QUESTIONS)
+    forms = random_forms(200, seed=5)
+    matrix = key.outcome_matrix(forms)
+    assert matrix.dtype == np.int8
+    assert matrix.tolist() == [key.outcomes(form) for form in forms]
+
+
+def test_outcomes_of_one_form():
+    key = AnswerKey.compile(QUESTIONS)
+    form = {'question_1': 'B', 'question_2': 'C', 'question_3': 'A', 'question_4': ''}
+    assert key.outcomes(form) == [CORRECT, CORRECT, WRONG, SKIPPED, SKIPPED]
+    score, total, results = key.score(form)
+    assert (score, total) == (4, 7)
+    assert results[3]['your_answer'] == "Not answered"
+    assert key.score_batch([]).tolist() == []
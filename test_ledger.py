@@ -0,0 +1,62 @@
+# test_ledger.py
+# Ledger records are provable once sealed, name their candidate, and survive
+# a crash that tore the last line of blocks.jsonl.
+import json
+import os
+
+from services.ledger import BLOCKS_FILE, Ledger, answer_digest, verify_proof
+
+DIGITAL_ID = 'a' * 64
+
+
+def fill(ledger, count):
+    return [ledger.append(f"{n:032x}", DIGITAL_ID, 1, answer_digest({'1': 'A', '2': str(n)}), n)
+            for n in range(count)]
+
+
+def test_sealed_record_proves_its_candidate(tmp_path):
+    ledger = Ledger(str(tmp_path), block_size=4)
+    receipts = fill(ledger, 8)
+
+    proof = ledger.proof(5)
+    assert verify_proof(proof)
+    assert proof['leaf_hash'] == receipts[5]['leaf_hash']
+    assert proof['record']['digital_id'] == DIGITAL_ID
+    assert proof['record']['submission_uuid'] == f"{5:032x}"
+
+    # Reassigning the result to someone else breaks the proof
+    proof['record']['digital_id'] = 'b' * 64
+    assert not verify_proof(proof)
+    ledger.close()
+
+
+def test_open_block_is_pending_until_seal_interval(tmp_path):
+    ledger = Ledger(str(tmp_path), block_size=100, seal_interval=3600)
+    fill(ledger, 3)
+
+    proof = ledger.proof(1)
+    assert proof['pending'] and proof['retry_after'] > 0
+    assert ledger.stats()['blocks'] == 0
+
+    # Once the block has been open long enough, the next proof request seals it
+    ledger.seal_interval = 0
+    assert verify_proof(ledger.proof(1))
+    assert (ledger.stats()['blocks'], ledger.stats()['pending']) == (1, 0)
+    assert ledger.proof(3) is None
+    ledger.close()
+
+
+def test_torn_block_line_is_dropped_and_resealed(tmp_path):
+    ledger = Ledger(str(tmp_path), block_size=2)
+    fill(ledger, 4)
+    ledger.close()
+    with open(os.path.join(tmp_path, BLOCKS_FILE), 'rb+') as blocks:
+        blocks.truncate(os.path.getsize(blocks.name) - 10)
+
+    reopened = Ledger(str(tmp_path), block_size=2)
+    assert reopened.stats()['blocks'] == 1 and reopened.stats()['pending'] == 2
+    reopened.seal()
+    assert all(verify_proof(reopened.proof(seq)) for seq in range(4))
+    reopened.close()
+    with open(os.path.join(tmp_path, BLOCKS_FILE)) as blocks:
+        assert [json.loads(line)['header']['height'] for line in blocks] == [0, 1]
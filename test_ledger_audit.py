@@ -0,0 +1,56 @@
+# test_ledger_audit.py
+# The audit finds any edited record, resumes from its signed checkpoint, and
+# treats a ledger with nothing sealed yet as intact.
+import os
+
+from services.ledger import RECORDS_FILE, Ledger, answer_digest
+from services.ledger_audit import CHECKPOINT_FILE, audit_ledger
+
+KEY = 'test-checkpoint-key'
+
+
+def build(directory, records, block_size=4):
+    ledger = Ledger(str(directory), block_size)
+    for n in range(records):
+        ledger.append(f"{n:032x}", 'e' * 64, 1, answer_digest({'1': str(n)}), n)
+    ledger.close()
+
+
+def test_missing_or_empty_ledger_is_intact(tmp_path):
+    for directory in (tmp_path / 'never-created', tmp_path):
+        report = audit_ledger(str(directory), 2, KEY)
+        assert report['ok'] and report['blocks_total'] == 0 and report['checkpoint'] is None
+
+
+def test_incremental_audit_checks_only_new_blocks(tmp_path):
+    build(tmp_path, 10)
+    first = audit_ledger(str(tmp_path), 2, KEY)
+    assert first['ok'] and first['blocks_verified'] == 3 and first['records_verified'] == 10
+
+    ledger = Ledger(str(tmp_path), 4)
+    for n in range(10, 18):
+        ledger.append(f"{n:032x}", 'e' * 64, 1, answer_digest({'1': str(n)}), n)
+    ledger.close()
+    second = audit_ledger(str(tmp_path), 2, KEY)
+    assert second['ok'] and second['blocks_verified'] == 2 and second['records_verified'] == 8
+    assert second['checkpoint']['records'] == 18
+    assert second['checkpoint']['records_offset'] == os.path.getsize(tmp_path / RECORDS_FILE)
+
+
+def test_edited_record_is_reported(tmp_path):
+    build(tmp_path, 12)
+    path = tmp_path / RECORDS_FILE
+    data = path.read_bytes()
+    path.write_bytes(data.replace(b'"score":5', b'"score":9'))
+
+    report = audit_ledger(str(tmp_path), 2, KEY, full=True)
+    assert not report['ok']
+    assert (report['first_corrupted'], report['error']) == (1, "Merkle root mismatch")
+    assert not os.path.exists(tmp_path / CHECKPOINT_FILE)
+
+
+def test_missing_records_file_is_reported(tmp_path):
+    build(tmp_path, 4)
+    os.remove(tmp_path / RECORDS_FILE)
+    report = audit_ledger(str(tmp_path), 2, KEY)
+    assert not report['ok'] and report['error'] == "records missing"
@@ -0,0 +1,58 @@
+# test_otp_store.py
+# An OTP is accepted once and only before it expires; with write-through the
+# database decides, and a failed database call never uses up the OTP.
+import contextlib
+import time
+
+from config import DatabaseConfig
+from services.otp_store import OTPStore
+
+EMAIL = 'reset@test.example'
+
+
+def test_memory_only_token_is_single_use():
+    store = OTPStore(ttl_seconds=60, write_through=False)
+    assert store.put(EMAIL, '123456')
+    assert not store.consume(EMAIL, '654321')
+    assert store.consume(EMAIL, '123456')
+    assert not store.consume(EMAIL, '123456')
+
+    store.put(EMAIL, '111111')
+    store.put(EMAIL, '222222')  # a new OTP replaces the earlier one
+    assert not store.consume(EMAIL, '111111')
+    assert store.consume(EMAIL, '222222')
+    assert store.stats() == {'issued': 3, 'consumed': 2, 'rejected': 3, 'expired': 0, 'db_fallbacks': 0,
+                             'live': 0}
+
+
+def test_memory_only_token_expires():
+    store = OTPStore(ttl_seconds=0.05, write_through=False)
+    store.put(EMAIL, '123456')
+    time.sleep(0.1)
+    assert not store.consume(EMAIL, '123456')
+    assert store.stats()['expired'] == 1
+
+
+def test_write_through_token_survives_a_failed_database_call(database, monkeypatch):
+    store = OTPStore(ttl_seconds=60, write_through=True)
+    assert store.put(EMAIL, '123456')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(DatabaseConfig, 'connection', staticmethod(lambda: contextlib.nullcontext(None)))
+        assert not store.consume(EMAIL, '123456')
+    assert store.stats()['live'] == 1
+
+    assert store.consume(EMAIL, '123456')
+    assert not store.consume(EMAIL, '123456')
+    assert store.stats()['live'] == 0
+    assert database.execute("SELECT is_used FROM password_reset_tokens WHERE email = ?", (EMAIL,)).fetchone() == (1,)
+
+
+def test_write_through_accepts_a_token_issued_elsewhere(database):
+    OTPStore(ttl_seconds=60, write_through=True).put(EMAIL, '123456')  # another process, or before a restart
+    store = OTPStore(ttl_seconds=60, write_through=True)
+    assert not store.consume(EMAIL, '000000')
+    assert store.consume(EMAIL, '123456')
+    assert not store.consume(EMAIL, '123456')
+    stats = store.stats()
+    assert (stats['db_fallbacks'], stats['consumed'], stats['rejected']) == (3, 1, 2)
@@ -0,0 +1,70 @@
+# test_proctoring_events.py
+# A retried batch is counted once, batches arriving out of order give the
+# same summary as in-order ones, and a restarted store picks up where it was.
+import time
+
+import pytest
+
+from services.proctoring_events import EVENT_CODES, EventStore
+
+ATTEMPT = 'a' * 32
+HIDDEN, VISIBLE, COPY = EVENT_CODES['tab_hidden'], EVENT_CODES['tab_visible'], EVENT_CODES['copy']
+
+
+def new_store(directory):
+    return EventStore(str(directory), flush_interval=3600, max_batch=100, max_buffered=1000, idle_ttl=3600,
+                      max_skew=3600)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = new_store(tmp_path)
+    yield store
+    store.shutdown(timeout=5)
+
+
+def test_retried_batch_is_dropped(store):
+    base = int(time.time() * 1000)
+    assert store.append(1, ATTEMPT, '0' * 16, base, [[HIDDEN, 0], [VISIBLE, 500]]) == 2
+    assert store.append(1, ATTEMPT, '0' * 16, base, [[HIDDEN, 0], [VISIBLE, 500]]) == 0
+    assert store.append(1, ATTEMPT, '1' * 16, base, [[COPY, 600]]) == 1
+    assert store.stats()['duplicates'] == 1
+
+    summary = store.summary(1, ATTEMPT)
+    assert summary['events'] == 3 and summary['counts'] == {'tab_hidden': 1, 'tab_visible': 1, 'copy': 1}
+    with pytest.raises(ValueError):
+        store.append(1, ATTEMPT, 'not-hex', base, [[COPY, 0]])
+
+
+def test_out_of_order_batches_match_in_order_ones(tmp_path):
+    base = int(time.time() * 1000)
+    batches = [('0' * 16, [[HIDDEN, 0], [VISIBLE, 1000]]),
+               ('1' * 16, [[HIDDEN, 5000], [VISIBLE, 5500]]),
+               ('2' * 16, [[COPY, 6000], [HIDDEN, 7000]])]
+    summaries = []
+    for order, directory in ((batches, tmp_path / 'sorted'), (batches[::-1], tmp_path / 'reversed')):
+        store = new_store(directory)
+        for position, (batch_id, events) in enumerate(order):
+            store.append(1, ATTEMPT, batch_id, base, events)
+            if position == 0:
+                store.flush()  # the late batches are folded with events already on disk
+        summaries.append(store.summary(1, ATTEMPT))
+        store.shutdown(timeout=5)
+
+    assert summaries[0] == summaries[1]
+    assert summaries[0]['away_ms'] == 1500 and summaries[0]['away_now']
+    assert summaries[0]['first_ts'] == base and summaries[0]['last_ts'] == base + 7000
+
+
+def test_restarted_store_keeps_summary_and_batch_ids(tmp_path):
+    base = int(time.time() * 1000)
+    store = new_store(tmp_path)
+    store.append(1, ATTEMPT, '0' * 16, base, [[HIDDEN, 0], [VISIBLE, 250]])
+    store.shutdown(timeout=5)
+    before = store.summary(1, ATTEMPT)
+
+    restarted = new_store(tmp_path)
+    assert restarted.summary(1, ATTEMPT) == before
+    assert restarted.append(1, ATTEMPT, '0' * 16, base, [[HIDDEN, 0], [VISIBLE, 250]]) == 0
+    assert [event for _, event in restarted.events(1, ATTEMPT)] == ['tab_hidden', 'tab_visible']
+    restarted.shutdown(timeout=5)
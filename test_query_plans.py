@@ -0,0 +1,106 @@
+# test_query_plans.py
+# Runs EXPLAIN on every hot-path query against the configured MySQL database
+# and fails if any of them reads a whole table or a whole index. The exam
+# listing queries are built by app.exam_list_query, exactly as / runs them.
+#   python test_query_plans.py      report every plan; exit status 1 on a full scan
+#   pytest test_query_plans.py      one test per query; skipped without a MySQL server
+import sys
+from datetime import datetime
+
+import mysql.connector
+import pytest
+
+from config import DatabaseConfig
+from app import EXAM_FILTERS, exam_list_query
+
+NOW = datetime.now().replace(microsecond=0)
+# Exam listing: the first page and a later (keyset) page of every filter, 'all' being the default /
+EXAM_LISTING_QUERIES = [
+    (f"{status} exams page{' after cursor' if after else ''}",) + exam_list_query(status, after, NOW)
+    for status in EXAM_FILTERS
+    for after in (None, (NOW, 1))
+]
+
+HOT_QUERIES = EXAM_LISTING_QUERIES + [
+    ("exam by id", "SELECT * FROM exams WHERE id=%s", (1,)),
+    ("questions of exam", "SELECT * FROM questions WHERE exam_id=%s", (1,)),
+    ("delete questions of exam", "DELETE FROM questions WHERE exam_id=%s", (1,)),
+    ("login", "SELECT * FROM users WHERE email = %s AND is_active = TRUE", ("a@example.com",)),
+    ("user by id", "SELECT * FROM users WHERE user_id = %s", (1,)),
+    ("user by digital id", "SELECT * FROM users WHERE digital_id_hash = %s", ("0" * 64,)),
+    ("users by role (keyset page)",
+     "SELECT user_id, name, email FROM users WHERE user_id > %s AND role = %s ORDER BY user_id LIMIT %s",
+     (0, "Student", 100)),
+    ("roster duplicate check",
+     "SELECT email, wallet_address, enrollment_number FROM users "
+     "WHERE email IN (%s, %s) OR wallet_address IN (%s) OR enrollment_number IN (%s)",
+     ("a@example.com", "b@example.com", "0x0", "EN1")),
+    ("consume reset token",
+     "UPDATE password_reset_tokens SET is_used = TRUE "
+     "WHERE email = %s AND token = %s AND is_used = FALSE AND expires_at > NOW()",
+     ("a@example.com", "123456")),
+    ("replace reset token", "DELETE FROM password_reset_tokens WHERE email = %s", ("a@example.com",)),
+    ("submissions of exam", "SELECT * FROM submissions WHERE exam_id = %s", (1,)),
+]
+
+# EXPLAIN access types that scan everything: ALL = full table, index = full index
+FULL_SCANS = {'ALL', 'index'}
+
+
+def explain(cursor, query, params):
+    cursor.execute("EXPLAIN " + query, params)
+    return cursor.fetchall()
+
+
+def full_scans(plan):
+    return [row for row in plan if row.get('type') in FULL_SCANS]
+
+
+def check_query_plans():
+    connection = DatabaseConfig.get_connection()
+    if not connection:
+        return False
+    cursor = connection.cursor(dictionary=True)
+    failures = 0
+    try:
+        for label, query, params in HOT_QUERIES:
+            plan = explain(cursor, query, params)
+            scans = full_scans(plan)
+            if scans:
+                failures += 1
+                tables = ', '.join(f"{row['table']} ({row['type']})" for row in scans)
+                print(f"✗ {label}: full scan of {tables}")
+            else:
+                access = ', '.join(f"{row['table']}:{row.get('type')}/{row.get('key')}" for row in plan)
+                print(f"✓ {label}: {access}")
+    finally:
+        connection.rollback()
+        cursor.close()
+        connection.close()
+    print(f"\n{len(HOT_QUERIES) - failures}/{len(HOT_QUERIES)} hot-path queries use an index")
+    return failures == 0
+
+
+@pytest.fixture(scope='module')
+def mysql_cursor():
+    try:
+        # Not DatabaseConfig.connection(): other tests point that at the SQLite stand-in
+        connection = mysql.connector.connect(host=DatabaseConfig.DB_HOST, user=DatabaseConfig.DB_USER,
+                                             password=DatabaseConfig.DB_PASSWORD, database=DatabaseConfig.DB_NAME,
+                                             connection_timeout=5)
+    except mysql.connector.Error as e:
+        pytest.skip(f"No MySQL server to EXPLAIN against: {e}")
+    cursor = connection.cursor(dictionary=True)
+    yield cursor
+    connection.rollback()
+    cursor.close()
+    connection.close()
+
+
+@pytest.mark.parametrize('label, query, params', HOT_QUERIES, ids=[entry[0] for entry in HOT_QUERIES])
+def test_hot_query_uses_an_index(mysql_cursor, label, query, params):
+    assert full_scans(explain(mysql_cursor, query, params)) == []
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_query_plans() else 1)
@@ -0,0 +1,68 @@
+# test_ranking.py
+# Fenwick-tree rankings agree with counting by hand, and loading them from
+# storage happens off the request path, retrying while the database is down.
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+from services.ranking import Rankings, ScoreRanking
+
+
+def test_score_ranking_matches_a_sorted_list():
+    rng = random.Random(7)
+    ranking = ScoreRanking()
+    scores = []
+    for _ in range(500):
+        score = rng.randint(-20, 120)
+        ranking.add(score)
+        scores.append(score)
+    scores.sort()
+
+    for score in range(-25, 126, 5):
+        below = sum(1 for s in scores if s < score)
+        ties = scores.count(score)
+        assert ranking.count_below(score) == below
+        assert ranking.rank(score) == sum(1 for s in scores if s > score) + 1
+        assert ranking.percentile(score) == 100.0 * (below + 0.5 * ties) / len(scores)
+    assert [ranking.kth(k) for k in (1, 250, 500)] == [scores[0], scores[249], scores[499]]
+    assert ranking.kth(0) is None and ranking.kth(501) is None
+
+
+def test_load_counts_stored_scores_once(database):
+    past = datetime.now() - timedelta(hours=1)
+    database.executemany("INSERT INTO submissions (submission_uuid, exam_id, answers, score, total, submitted_at) "
+                         "VALUES (?, 1, '{}', ?, 10, ?)", [(f"{n:032x}", n % 5, past) for n in range(20)])
+    database.commit()
+    rankings = Rankings()
+    assert rankings.standing(1, 4) is None  # not loaded yet: no query on the caller's thread
+    assert rankings.load()
+
+    rankings.record(1, 9, past)  # already counted by load()
+    rankings.record(1, 9, datetime.now())
+    assert rankings.standing(1, 9) == {'rank': 1, 'of': 21, 'percentile': 100.0 * 20.5 / 21}
+    assert rankings.distribution(1)['median'] == 2
+
+
+def test_background_load_retries_until_the_database_is_back(database, monkeypatch):
+    rankings = Rankings(retry_delay=0.01, max_retry_delay=0.05)
+    load = rankings._load
+    attempts = []
+
+    def flaky():
+        attempts.append(threading.current_thread().name)
+        if len(attempts) < 3:
+            print("Error loading exam rankings: database down")
+            return False
+        return load()
+
+    monkeypatch.setattr(rankings, '_load', flaky)
+    rankings.start()
+    rankings.start()  # already loading: no second loader
+    for _ in range(200):
+        if rankings.ready():
+            break
+        time.sleep(0.01)
+
+    assert rankings.ready()
+    assert attempts == ['rankings-loader'] * 3
@@ -0,0 +1,71 @@
+# test_user_service.py
+# Logins verify passwords without holding a pooled connection, and upgrading
+# an outdated hash never decides whether a correct password is accepted.
+import hashlib
+import os
+
+import pytest
+
+from config import ConnectionPool, DatabaseConfig
+from services.password_hasher import HasherBusyError, password_hasher
+from services.user_cache import user_cache
+from services.user_service import UserService
+
+PASSWORD = 'Correct-horse-1'
+
+
+@pytest.fixture
+def users(database):
+    user_cache.clear()
+    database.execute(
+        "INSERT INTO users (name, email, password, role, digital_id_hash, is_active) VALUES (?, ?, ?, ?, ?, 1)",
+        ('Legacy', 'legacy@test.example', hashlib.sha256(PASSWORD.encode()).hexdigest(), 'Student', 'd' * 64))
+    database.commit()
+    return database
+
+
+def stored_hash(database):
+    return database.execute("SELECT password FROM users WHERE email = 'legacy@test.example'").fetchone()[0]
+
+
+def test_verify_runs_without_a_borrowed_connection(users, monkeypatch):
+    # One connection and no patience: verify can only borrow it if login gave it back
+    DatabaseConfig._pool = ConnectionPool(1, 0.05, DatabaseConfig._connect)
+    DatabaseConfig._pool_pid = os.getpid()
+    verify = password_hasher.verify
+    borrowed = []
+
+    def checking_verify(password, encoded):
+        with DatabaseConfig.connection() as connection:
+            borrowed.append(connection is not None)
+        return verify(password, encoded)
+
+    monkeypatch.setattr(password_hasher, 'verify', checking_verify)
+    assert UserService.authenticate_user('legacy@test.example', PASSWORD) is not None
+    assert borrowed == [True]
+
+
+def test_legacy_hash_is_upgraded_on_login(users):
+    user = UserService.authenticate_user('legacy@test.example', PASSWORD)
+    assert user is not None
+    assert stored_hash(users).startswith('$scrypt$')
+    assert UserService.authenticate_user('legacy@test.example', PASSWORD) is not None
+
+
+def test_busy_hasher_during_rehash_still_logs_in(users, monkeypatch):
+    def busy(password):
+        raise HasherBusyError("Password hashing queue is full")
+
+    monkeypatch.setattr(UserService, 'hash_password', staticmethod(busy))
+    assert UserService.authenticate_user('legacy@test.example', PASSWORD) is not None
+    assert stored_hash(users) == hashlib.sha256(PASSWORD.encode()).hexdigest()
+
+
+def test_wrong_password_and_busy_verify_are_rejected(users, monkeypatch):
+    assert UserService.authenticate_user('legacy@test.example', 'wrong') is None
+
+    def busy(password, encoded):
+        raise HasherBusyError("Password hashing queue is full")
+
+    monkeypatch.setattr(password_hasher, 'verify', busy)
+    assert UserService.authenticate_user('legacy@test.example', PASSWORD) is None
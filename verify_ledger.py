@@ -0,0 +1,32 @@
+# verify_ledger.py
+import argparse
+from config import LedgerConfig
+from services.ledger_audit import audit_ledger
+
+
+def verify_ledger(directory, workers, full):
+    if not LedgerConfig.LEDGER_CHECKPOINT_KEY:
+        print("⚠️ No LEDGER_CHECKPOINT_KEY/SECRET_KEY set: checkpoints will not be saved")
+
+    report = audit_ledger(directory, workers, LedgerConfig.LEDGER_CHECKPOINT_KEY, full=full)
+
+    print(f"Blocks in ledger:   {report['blocks_total']}")
+    print(f"Blocks verified:    {report['blocks_verified']} ({report['records_verified']} records)")
+    print(f"Throughput:         {report['blocks_per_second']:,.0f} blocks/s in {report['elapsed']:.2f}s")
+    if report['ok']:
+        if report['checkpoint']:
+            print(f"✅ Ledger intact; checkpoint saved at block {report['checkpoint']['height']}")
+        else:
+            print("✅ Ledger intact")
+    else:
+        print(f"❌ Corrupted block {report['first_corrupted']}: {report['error']}")
+    return report['ok']
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audit the submission ledger")
+    parser.add_argument("--dir", default=LedgerConfig.LEDGER_DIR)
+    parser.add_argument("--workers", type=int, default=LedgerConfig.LEDGER_AUDIT_WORKERS)
+    parser.add_argument("--full", action="store_true", help="ignore the last checkpoint")
+    args = parser.parse_args()
+    raise SystemExit(0 if verify_ledger(args.dir, args.workers, args.full) else 1)